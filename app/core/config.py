@@ -1,26 +1,101 @@
 # app/core/config.py
 import os
+from collections import namedtuple
 
-BASE_URL = "https://api.radheexch.xyz"
+from app.core.settings import settings
 
-HEADERS = {
-    "accept": "*/*",
-    "user-agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                  "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/141 Safari/537.36",
-}
+BASE_URL = settings.BASE_URL.rstrip("/")
+
+# Browser-like headers for upstream requests, one set per user agent. They are
+# built once; each egress (proxy or direct connection) keeps one of them.
+USER_AGENTS = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/130.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:132.0) Gecko/20100101 Firefox/132.0",
+)
+
+BROWSER_HEADERS = tuple(
+    {
+        'User-Agent': user_agent,
+        'Accept': 'application/json, text/plain, */*',
+        'Accept-Language': 'en-US,en;q=0.9',
+        'Accept-Encoding': 'gzip, deflate',
+        'Connection': 'keep-alive',
+        'Referer': f'{BASE_URL}/',
+        'Origin': BASE_URL,
+        'Sec-Fetch-Dest': 'empty',
+        'Sec-Fetch-Mode': 'cors',
+        'Sec-Fetch-Site': 'same-origin',
+        'sec-ch-ua': '"Google Chrome";v="131", "Chromium";v="131", "Not_A Brand";v="24"',
+        'sec-ch-ua-mobile': '?0',
+        'sec-ch-ua-platform': '"Windows"',
+        'DNT': '1',
+    }
+    for user_agent in USER_AGENTS
+)
 
 ROOT_DIR = os.path.dirname(os.path.dirname(__file__))
-DATA_DIR = os.path.join(ROOT_DIR, "data")
-os.makedirs(DATA_DIR, exist_ok=True)
+DATA_DIR = settings.DATA_DIR or os.path.join(ROOT_DIR, "data")
 ALL_MATCHES_FILE = os.path.join(DATA_DIR, "all_matches.json")
 LIVE_MATCHES_FILE = os.path.join(DATA_DIR, "live_matches.json")
+LIVE_JOURNAL_FILE = os.path.join(DATA_DIR, "live_matches.ndjson")
+HISTORY_DIR = os.path.join(DATA_DIR, "history")
+METRICS_FILE = os.path.join(DATA_DIR, "metrics.prom")
+
+
+def ensure_data_dir():
+    """Create ``DATA_DIR``; done at app startup rather than on import"""
+    os.makedirs(DATA_DIR, exist_ok=True)
+
 
-MATCH_LIST_URL = f"{BASE_URL}/delaymarkets/markets/eventtype/4"
 MATCH_DETAIL_URL = f"{BASE_URL}/delaymarkets/events/detail"
 
 # How often the scheduler should force refresh live matches (seconds)
 SCRAPE_INTERVAL = 5
 
+# One scrape shard per sport: upstream event type, base refresh interval
+# (seconds) and upstream rate budget (requests/second per host; None = SCRAPE_RATE_LIMIT)
+Sport = namedtuple("Sport", ["name", "event_type", "interval", "rate"])
+
+
+def parse_sports(value):
+    sports = []
+    for item in value.split(","):
+        parts = [p.strip() for p in item.split(":")]
+        if not parts[0]:
+            continue
+        if len(parts) < 2 or len(parts) > 4 or not parts[1]:
+            raise ValueError(f"Invalid SPORTS entry {item!r}: expected name:eventtype[:interval[:rate]]")
+        interval = float(parts[2]) if len(parts) > 2 and parts[2] else SCRAPE_INTERVAL
+        rate = float(parts[3]) if len(parts) > 3 and parts[3] else None
+        sports.append(Sport(parts[0].lower(), parts[1], interval, rate))
+    if not sports:
+        raise ValueError("SPORTS must name at least one sport")
+    if len({s.name for s in sports}) != len(sports):
+        raise ValueError("SPORTS names must be unique")
+    return tuple(sports)
+
+
+SPORTS = parse_sports(settings.SPORTS)
+DEFAULT_SPORT = SPORTS[0].name
+
+
+def match_list_url(event_type):
+    return f"{BASE_URL}/delaymarkets/markets/eventtype/{event_type}"
+
+
+def sport_path(path, sport):
+    """Data file of a sport: ``path`` itself for the default sport, else ``<name>.<sport><ext>``"""
+    if sport == DEFAULT_SPORT:
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}.{sport}{ext}"
+
+
+MATCH_LIST_URL = match_list_url(SPORTS[0].event_type)
+
 # Optional external endpoint to POST each live match JSON to after scraping.
 # Set to None or an empty string to disable pushing.
 LIVE_MATCH_ODDS_PUSH_URL = None
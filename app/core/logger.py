@@ -1,42 +1,230 @@
 # app/core/logger.py
+"""Process-wide logging that never blocks the scrape threads.
+
+Loggers from ``get_logger`` only put records on a bounded in-memory queue;
+one ``QueueListener`` thread per process, started by the first record,
+formats them and writes stdout and ``logs/<name>.log``:
+
+- ``LOG_LEVEL`` applies to every logger, so records below it are never built
+- messages are formatted on the listener thread: pass %-style arguments
+  (``logger.info("Fetched event %s", event_id)``) rather than f-strings
+- the same message with the same arguments is written at most once per
+  ``LOG_DEDUP_WINDOW`` seconds per logger; the next one after the window
+  says how many were suppressed
+- ``LOG_FORMAT=json`` writes one JSON object per line
+- when the queue is full, records are dropped and counted instead of waiting
+- each worker process takes the first free slot under ``logs/`` with a file
+  lock; slot 0 writes ``<name>.log`` and slot N ``<name>.N.log``, so workers
+  never interleave writes in one file
+"""
+import atexit
+import json
 import logging
 import os
+import queue
 import sys
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from app.core.settings import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
 
 LOG_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "..", "logs")
 LOG_DIR = os.path.abspath(LOG_DIR)
-os.makedirs(LOG_DIR, exist_ok=True)
 
-def get_logger(name):
-    logger = logging.getLogger(name)
-    if logger.handlers:
-        return logger
-    logger.setLevel(logging.INFO)
-
-    # File handler with UTF-8 encoding
-    file_handler = logging.FileHandler(
-        os.path.join(LOG_DIR, f"{name}.log"),
-        encoding='utf-8'
-    )
-    
-    # Stream handler with UTF-8 encoding for Windows compatibility
-    stream_handler = logging.StreamHandler(sys.stdout)
-    
+MAX_WORKER_SLOTS = 64
+TEXT_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+
+
+class TextFormatter(logging.Formatter):
+    def format(self, record):
+        text = super().format(record)
+        repeated = getattr(record, "repeated", 0)
+        return f"{text} (repeated {repeated} more times)" if repeated else text
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "pid": record.process,
+            "thread": record.threadName,
+        }
+        if getattr(record, "repeated", 0):
+            entry["repeated"] = record.repeated
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def _arg_key(arg):
+    # Exceptions and containers compare by identity or are unhashable: key them by their text
+    return arg if isinstance(arg, (str, int, float, type(None))) else repr(arg)
+
+
+class RepeatFilter(logging.Filter):
+    """Let an identical (logger, level, message, args) record through at most once per ``window`` seconds"""
+
+    def __init__(self, window):
+        super().__init__()
+        self.window = window
+        # key -> [last written (monotonic), suppressed since]
+        self._seen = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if self.window <= 0:
+            return True
+        args = record.args
+        if isinstance(args, tuple):
+            args = tuple(map(_arg_key, args))
+        try:
+            key = (record.name, record.levelno, record.msg, args)
+            hash(key)
+        except TypeError:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            entry = self._seen.get(key)
+            if entry is not None and now - entry[0] < self.window:
+                entry[1] += 1
+                return False
+            if entry is not None and entry[1]:
+                record.repeated = entry[1]
+            self._seen[key] = [now, 0]
+            if len(self._seen) > 10000:
+                self._seen = {k: v for k, v in self._seen.items() if now - v[0] < self.window}
+        return True
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # The listener lives in this process: hand the record over unformatted
+        return record
+
+    def enqueue(self, record):
+        if not _listener_started:
+            _start_listener(self.queue)
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class FileRouter(logging.Handler):
+    """Writes each record to ``<LOG_DIR>/<logger name>[.<slot>].log`` (listener thread only)"""
+
+    def __init__(self, slot):
+        super().__init__()
+        self.suffix = f".{slot}.log" if slot else ".log"
+        self._files = {}
+
+    def emit(self, record):
+        handler = self._files.get(record.name)
+        if handler is None:
+            handler = logging.FileHandler(os.path.join(LOG_DIR, record.name + self.suffix), encoding="utf-8")
+            handler.setFormatter(self.formatter)
+            self._files[record.name] = handler
+        handler.emit(record)
+
+    def close(self):
+        for handler in self._files.values():
+            handler.close()
+        super().close()
+
+
+def _worker_slot():
+    """First log slot no other live process holds; the lock lasts for the life of the process"""
+    for slot in range(MAX_WORKER_SLOTS):
+        fd = os.open(os.path.join(LOG_DIR, f".worker-{slot}.lock"), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        except OSError:
+            os.close(fd)
+            continue
+        return slot
+    return os.getpid()
+
+
+def _log_level():
+    level = logging.getLevelName(settings.LOG_LEVEL.upper())
+    return level if isinstance(level, int) else logging.INFO
+
+
+def _stdout_handler():
     # For Windows, reconfigure stdout to handle UTF-8
     if sys.platform == 'win32':
         try:
-            # Try to reconfigure stdout to UTF-8
             if hasattr(sys.stdout, 'reconfigure'):
                 sys.stdout.reconfigure(encoding='utf-8', errors='replace')  # type: ignore
         except Exception:
             # If reconfiguration fails, stream handler will use 'replace' error handling
             pass
-    
-    fmt = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
-    file_handler.setFormatter(fmt)
-    stream_handler.setFormatter(fmt)
+    return logging.StreamHandler(sys.stdout)
+
+
+_setup_lock = threading.Lock()
+_queue_handler = None
+_listener = None
+_listener_started = False
 
-    logger.addHandler(file_handler)
-    logger.addHandler(stream_handler)
 
+def _start_listener(log_queue):
+    """Start the writer thread on the first record, so importing a module that logs costs nothing"""
+    global _listener, _listener_started
+    with _setup_lock:
+        if _listener_started:
+            return
+        os.makedirs(LOG_DIR, exist_ok=True)
+        formatter = JsonFormatter() if settings.LOG_FORMAT == "json" else TextFormatter(TEXT_FORMAT)
+        handlers = [_stdout_handler(), FileRouter(_worker_slot())]
+        for handler in handlers:
+            handler.setFormatter(formatter)
+        _listener = QueueListener(log_queue, *handlers)
+        _listener.start()
+        _listener_started = True
+        atexit.register(shutdown_logging)
+
+
+def get_logger(name):
+    global _queue_handler
+    logger = logging.getLogger(name)
+    with _setup_lock:
+        if logger.handlers:
+            return logger
+        if _queue_handler is None:
+            _queue_handler = NonBlockingQueueHandler(queue.Queue(settings.LOG_QUEUE_SIZE))
+            _queue_handler.addFilter(RepeatFilter(settings.LOG_DEDUP_WINDOW))
+        logger.setLevel(_log_level())
+        logger.addHandler(_queue_handler)
     return logger
+
+
+def shutdown_logging():
+    """Write out the queued records and stop the writer thread"""
+    global _listener
+    listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
+
+
+def dropped_records():
+    """Records dropped because the log queue was full"""
+    return _queue_handler.dropped if _queue_handler is not None else 0
@@ -29,12 +29,188 @@ class Settings(BaseSettings):
         default=3,
         description="How often to refresh live match data (in seconds)"
     )
-    
+    SPORTS: str = Field(
+        default="cricket:4",
+        description="Sports to scrape, comma-separated name:eventtype[:interval[:rate]]; the first one is "
+                    "served when no ?sport= is given (e.g. cricket:4,tennis:2:10,football:1:5:2)"
+    )
+    SCRAPE_CONCURRENCY: int = Field(
+        default=8,
+        description="Maximum number of in-flight upstream requests"
+    )
+    SCRAPE_RATE_LIMIT: float = Field(
+        default=4.0,
+        description="Upstream requests per second allowed per host (0 disables the limit)"
+    )
+    SCRAPE_RATE_BURST: int = Field(
+        default=4,
+        description="Burst size of the per-host rate limiter"
+    )
+    SCRAPE_TIMEOUT: float = Field(
+        default=20.0,
+        description="Timeout for a single upstream request (in seconds)"
+    )
+    PARSE_WORKERS: int = Field(
+        default=0,
+        description="Worker processes that decode and organize large event detail payloads (0 = always inline)"
+    )
+    PARSE_OFFLOAD_SECONDS: float = Field(
+        default=0.005,
+        description="Estimated inline parse time from which an event detail payload goes to a parse worker (in seconds)"
+    )
+    LIVE_MIN_INTERVAL: float = Field(
+        default=1.0,
+        description="Fastest per-event refresh interval for in-play events with moving odds (in seconds)"
+    )
+    LIVE_MAX_INTERVAL: float = Field(
+        default=30.0,
+        description="Slowest per-event refresh interval for suspended or unchanged events (in seconds)"
+    )
+    SCHEDULER_TICK: float = Field(
+        default=1.0,
+        description="How often the per-event scheduler checks for due events (in seconds)"
+    )
+    CIRCUIT_WINDOW: float = Field(
+        default=30.0,
+        description="Window over which each upstream host's failure rate is measured (in seconds)"
+    )
+    CIRCUIT_FAILURE_RATE: float = Field(
+        default=0.5,
+        description="Failure rate within the window that opens a host's circuit breaker"
+    )
+    CIRCUIT_MIN_REQUESTS: int = Field(
+        default=5,
+        description="Requests needed within the window before a host's circuit breaker may open"
+    )
+    CIRCUIT_COOLDOWN: float = Field(
+        default=15.0,
+        description="How long an open circuit fails fast before a probe request (doubles on failed probes, in seconds)"
+    )
+    CIRCUIT_MAX_COOLDOWN: float = Field(
+        default=300.0,
+        description="Upper bound for the circuit breaker cooldown (in seconds)"
+    )
+    EVENT_QUARANTINE: float = Field(
+        default=300.0,
+        description="How long events answering 404 / no data are skipped unless the match list changes (in seconds)"
+    )
+    DELTA_BUFFER_SIZE: int = Field(
+        default=1000,
+        description="Number of snapshot versions kept for GET /live/odds/changes"
+    )
+    STREAM_QUEUE_SIZE: int = Field(
+        default=100,
+        description="Pending updates per stream subscriber before it is evicted as too slow"
+    )
+    MATCH_LIST_TTL: float = Field(
+        default=30.0,
+        description="How long the cached match list is fresh; older lists are served while refreshing (in seconds)"
+    )
+    PERSIST_INTERVAL: float = Field(
+        default=1.0,
+        description="How often the leader appends changed matches to the snapshot journal (in seconds)"
+    )
+    PERSIST_COMPACT_BYTES: int = Field(
+        default=8_000_000,
+        description="Journal size after which it is rewritten with only the current matches (in bytes)"
+    )
+    WARM_START_MAX_AGE: float = Field(
+        default=900.0,
+        description="Newest journal age still used to warm-start the live snapshot on boot (in seconds)"
+    )
+    HISTORY_ENABLED: bool = Field(
+        default=True,
+        description="Record runner price ticks for GET /live/history"
+    )
+    HISTORY_FLUSH_INTERVAL: float = Field(
+        default=5.0,
+        description="How often queued price ticks are written to the history store (in seconds)"
+    )
+    HISTORY_SEGMENT_BYTES: int = Field(
+        default=4_000_000,
+        description="Size after which a match's history segment rolls over (in bytes)"
+    )
+    HISTORY_SEGMENT_SECONDS: float = Field(
+        default=3600.0,
+        description="Age after which a match's history segment rolls over (in seconds)"
+    )
+    HISTORY_MAX_PENDING: int = Field(
+        default=100_000,
+        description="Changed matches queued for the history job at most; the oldest are dropped if it falls behind"
+    )
+    HISTORY_RETENTION: float = Field(
+        default=3 * 24 * 3600.0,
+        description="How long history segments are kept after their last write (in seconds)"
+    )
+    METRICS_EXPORT_INTERVAL: float = Field(
+        default=5.0,
+        description="How often the leader worker shares its metrics for GET /metrics on the other workers (in seconds)"
+    )
+    DATA_DIR: Optional[str] = Field(
+        default=None,
+        description="Directory for the match files, snapshot journal and odds history (defaults to app/data)"
+    )
+    RECORD_DIR: Optional[str] = Field(
+        default=None,
+        description="Save every raw upstream response body here as replay fixtures (disabled when unset)"
+    )
+    SHARED_SNAPSHOT_INTERVAL: float = Field(
+        default=0.5,
+        description="How often the leader worker shares its snapshot and followers check for it (in seconds)"
+    )
+
+    # Cluster mode: several scraper nodes split the live events between them
+    CLUSTER_BACKEND: Optional[str] = Field(
+        default=None,
+        description="Coordination backend of the scraper cluster: 'sqlite' (file shared by the nodes) or "
+                    "'memory' (one process, for tests); single node when unset"
+    )
+    CLUSTER_DB: Optional[str] = Field(
+        default=None,
+        description="SQLite file of the 'sqlite' cluster backend (defaults to DATA_DIR/cluster.db)"
+    )
+    CLUSTER_NODE_ID: Optional[str] = Field(
+        default=None,
+        description="Name of this node in the cluster (defaults to <hostname>-<pid>)"
+    )
+    CLUSTER_HEARTBEAT: float = Field(
+        default=2.0,
+        description="How often a node heartbeats, publishes its matches and merges the others' (in seconds)"
+    )
+    CLUSTER_NODE_TTL: float = Field(
+        default=10.0,
+        description="How long without a heartbeat before a node's events move to the others (in seconds)"
+    )
+    CLUSTER_VNODES: int = Field(
+        default=64,
+        description="Points per node on the consistent hash ring"
+    )
+
     # Optional external integration
     LIVE_MATCH_ODDS_PUSH_URL: Optional[str] = Field(
         default=None,
         description="External webhook URL to push live match data"
     )
+    WEBHOOK_QUEUE_SIZE: int = Field(
+        default=1000,
+        description="Pending webhook updates kept before the oldest are dropped"
+    )
+    WEBHOOK_BATCH_SIZE: int = Field(
+        default=1,
+        description="Updates per webhook POST; 1 sends a single JSON object, more send a JSON array"
+    )
+    WEBHOOK_PAYLOAD: str = Field(
+        default="full",
+        description="Webhook payload: 'full' match data or 'delta' (changes since the previous version)"
+    )
+    WEBHOOK_TIMEOUT: float = Field(
+        default=5.0,
+        description="Timeout for a single webhook POST (in seconds)"
+    )
+    WEBHOOK_MAX_RETRIES: int = Field(
+        default=3,
+        description="Retries with exponential backoff for a failed webhook POST"
+    )
     
     # Proxy configuration (for cloud deployments to bypass IP blocking)
     USE_PROXY: bool = Field(
@@ -49,9 +225,26 @@ class Settings(BaseSettings):
         default=None,
         description="ScraperAPI key for proxy service (alternative to PROXY_URL)"
     )
+    PROXY_URLS: Optional[str] = Field(
+        default=None,
+        description="More proxy URLs (comma-separated); requests go to the fastest healthy one"
+    )
+    PROXY_INCLUDE_DIRECT: bool = Field(
+        default=False,
+        description="With USE_PROXY, also send requests over the direct connection"
+    )
     
     # Logging
     LOG_LEVEL: str = Field(default="INFO", description="Logging level")
+    LOG_FORMAT: str = Field(default="text", description="Log line format: 'text' or 'json' (one object per line)")
+    LOG_DEDUP_WINDOW: float = Field(
+        default=60.0,
+        description="Identical messages from a logger are written once per window; 0 disables (in seconds)"
+    )
+    LOG_QUEUE_SIZE: int = Field(
+        default=10000,
+        description="Log records buffered for the writer thread before new ones are dropped"
+    )
     
     @property
     def allowed_domains_list(self) -> List[str]:
@@ -1,13 +1,28 @@
 # app/main.py
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.routers import matches, live
+from fastapi.responses import JSONResponse
+from app.routers import matches, live, metrics
 from app.core.settings import settings
+from app.core.config import DEFAULT_SPORT, ensure_data_dir
+from app.core.logger import get_logger
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.executors.pool import ThreadPoolExecutor
-from app.services.live_match_service import force_refresh_live_matches
-from app.core.config import SCRAPE_INTERVAL
+from apscheduler.events import EVENT_JOB_MAX_INSTANCES, EVENT_JOB_MISSED
+from app.services.live_match_service import (
+    publish_shared_snapshot, sync_shared_snapshot, persist_live_snapshot, engine, shards, sync_cluster,
+)
+from app.services.cluster import cluster
+from app.services.odds_history import odds_history
+from app.services.parse_pool import parse_pool
+from app.services.leader_election import leader_lock
+from app.services.webhook_push import webhook_pusher
+from app.services.metrics import SCHEDULER_MISSED_RUNS, registry
 import atexit
+import concurrent.futures
+import threading
+import time
+from datetime import datetime
 
 app = FastAPI(title=settings.APP_NAME, version=settings.VERSION)
 
@@ -17,36 +32,190 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
 
 app.include_router(matches.router)
 app.include_router(live.router)
+app.include_router(metrics.router)
+
+logger = get_logger('scheduler')
+
+# APScheduler setup. Only the worker holding the leader lock scrapes upstream;
+# the other workers mirror its snapshot from the shared file.
+scheduler = BackgroundScheduler(executors={"default": ThreadPoolExecutor(max(10, 6 + 2 * len(shards)))})
+
+
+def _on_job_missed(event):
+    SCHEDULER_MISSED_RUNS.labels(event.job_id).inc()
+
+
+scheduler.add_listener(_on_job_missed, EVENT_JOB_MISSED | EVENT_JOB_MAX_INSTANCES)
+
+def _scheduled_update(shard):
+    try:
+        shard.tick()
+    except Exception as e:
+        logger.error("Scheduled %s update failed: %s", shard.name, e)
+
+
+def _refresh_match_list(shard):
+    try:
+        shard.match_list.refresh()
+    except Exception as e:
+        logger.error("%s match list refresh failed: %s", shard.name, e)
+
+
+def _publish_shared():
+    try:
+        publish_shared_snapshot()
+    except Exception as e:
+        logger.error("Sharing live snapshot failed: %s", e)
 
-# APScheduler setup: force refresh live matches at configured interval
-scheduler = BackgroundScheduler(executors={"default": ThreadPoolExecutor(10)})
 
-def _scheduled_update():
+def _persist():
     try:
-        force_refresh_live_matches()
+        persist_live_snapshot()
     except Exception as e:
-        from app.core.logger import get_logger
-        get_logger('scheduler').error(f"Scheduled update failed: {e}")
+        logger.error("Persisting live snapshot failed: %s", e)
+
+
+def _flush_history():
+    try:
+        odds_history.flush()
+    except Exception as e:
+        logger.error("Writing odds history failed: %s", e)
+
+
+def _export_metrics():
+    try:
+        registry.export()
+    except Exception as e:
+        logger.error("Exporting metrics failed: %s", e)
+
+
+def _sync_cluster():
+    try:
+        sync_cluster()
+    except Exception as e:
+        logger.error("Cluster sync failed: %s", e)
+
+
+def _follower_sync():
+    try:
+        # Take over if the leader process went away
+        if leader_lock.try_acquire():
+            scheduler.remove_job('follower_sync_job')
+            _start_leader_jobs()
+            return
+        sync_shared_snapshot()
+    except Exception as e:
+        logger.error("Follower sync failed: %s", e)
+
+
+def _start_leader_jobs():
+    if cluster is not None:
+        # Join before the first tick so it only scrapes this node's share
+        try:
+            cluster.join()
+        except Exception as e:
+            logger.error("Joining the scraper cluster failed, scraping every event until it succeeds: %s", e)
+        scheduler.add_job(_sync_cluster, 'interval', seconds=settings.CLUSTER_HEARTBEAT, id='cluster_job',
+                          replace_existing=True)
+    # One job per sport, so each shard runs on its own pool thread and a slow
+    # match list refresh of one sport never delays another
+    for name, shard in shards.items():
+        suffix = "" if name == DEFAULT_SPORT else f"_{name}"
+        scheduler.add_job(_refresh_match_list, 'interval', seconds=settings.MATCH_LIST_TTL, args=(shard,),
+                          id=f'match_list_job{suffix}', replace_existing=True, next_run_time=datetime.now())
+        # First run fires immediately so the snapshot is populated without waiting a full interval
+        scheduler.add_job(_scheduled_update, 'interval', seconds=settings.SCHEDULER_TICK, args=(shard,),
+                          id=f'live_update_job{suffix}', replace_existing=True, next_run_time=datetime.now())
+    scheduler.add_job(_publish_shared, 'interval', seconds=settings.SHARED_SNAPSHOT_INTERVAL,
+                      id='shared_snapshot_job', replace_existing=True)
+    scheduler.add_job(_persist, 'interval', seconds=settings.PERSIST_INTERVAL, id='persist_job',
+                      replace_existing=True)
+    if settings.HISTORY_ENABLED:
+        odds_history.start()
+        scheduler.add_job(_flush_history, 'interval', seconds=settings.HISTORY_FLUSH_INTERVAL, id='history_job',
+                          replace_existing=True)
+    scheduler.add_job(_export_metrics, 'interval', seconds=settings.METRICS_EXPORT_INTERVAL, id='metrics_job',
+                      replace_existing=True)
+    webhook_pusher.start()
+
+
+# Set once the warm-up thread restored the journals and loaded the match lists
+warmed_up = threading.Event()
+
+
+def _prime_match_list(shard, leader):
+    shard.match_list.load_file()
+    # The leader fetches a missing or stale list right away, while the journals are still being read
+    if leader and (shard.match_list.peek_live() is None or shard.match_list.age > settings.MATCH_LIST_TTL):
+        shard.match_list.refresh_in_background()
+
+
+def _warm_up(leader):
+    """Restore every sport's journaled snapshot and load its saved match list concurrently, then start scraping.
+
+    Scraping waits for the restore, so an older journal version never replaces fresh data.
+    """
+    start = time.perf_counter()
+    tasks = [shard.warm_start for shard in shards.values()]
+    tasks += [lambda shard=shard: _prime_match_list(shard, leader) for shard in shards.values()]
+    try:
+        with concurrent.futures.ThreadPoolExecutor(len(tasks), thread_name_prefix="warm-up") as pool:
+            for future in [pool.submit(task) for task in tasks]:
+                future.result()
+    except Exception as e:
+        logger.error("Warm-up failed, starting without the saved data: %s", e)
+    if not scheduler.running:
+        return
+    if leader:
+        _start_leader_jobs()
+    else:
+        logger.info("Another worker is the scraping leader, following its snapshot")
+        scheduler.add_job(_follower_sync, 'interval', seconds=settings.SHARED_SNAPSHOT_INTERVAL,
+                          id='follower_sync_job', replace_existing=True, next_run_time=datetime.now())
+    warmed_up.set()
+    logger.info("Warm-up finished in %.3fs", time.perf_counter() - start)
 
 
 @app.on_event('startup')
 def start_scheduler():
     if not scheduler.running:
-        scheduler.add_job(_scheduled_update, 'interval', seconds=SCRAPE_INTERVAL, id='live_update_job', replace_existing=True)
+        ensure_data_dir()
         scheduler.start()
+        # Serve requests right away; GET /ready reports when there is data
+        threading.Thread(target=_warm_up, args=(leader_lock.try_acquire(),), name="warm-up", daemon=True).start()
 
 
 @app.on_event('shutdown')
 def shutdown_scheduler():
     if scheduler.running:
         scheduler.shutdown(wait=False)
+    webhook_pusher.stop()
+    engine.close()
+    parse_pool.close()
+    for shard in shards.values():
+        shard.journal.close()
+    _flush_history()
+    if cluster is not None:
+        try:
+            cluster.leave()
+        except Exception as e:
+            logger.error("Leaving the scraper cluster failed: %s", e)
+    leader_lock.release()
 
 atexit.register(lambda: scheduler.shutdown(wait=False) if scheduler.running else None)
 
 @app.get("/")
 def root():
     return {"message": f"{settings.APP_NAME} is running", "version": settings.VERSION}
+
+@app.get("/ready")
+def ready():
+    """Readiness probe: 200 once every sport has data to serve, 503 until then"""
+    sports = {name: shard.readiness() for name, shard in shards.items()}
+    is_ready = warmed_up.is_set() and all(s["ready"] for s in sports.values())
+    return JSONResponse({"ready": is_ready, "sports": sports}, status_code=200 if is_ready else 503)
@@ -1,19 +1,181 @@
 # app/routers/live.py
-from fastapi import APIRouter, HTTPException
-from app.services.live_match_service import update_live_matches
+import asyncio
+import time
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query, Request, WebSocket
+from fastapi.responses import StreamingResponse
+from app.services.live_match_service import get_live_changes, get_shard
+from app.services.odds_history import downsample_ohlc, odds_history
+from app.services.response_cache import EncodedBody, encoded_response
+from app.services.snapshot_query import MAX_PAGE_SIZE, QueryError, query_live
+from app.services.stream_hub import hub
+from app.utils.common import split_param
 
 router = APIRouter(prefix="/live", tags=["Live Matches"])
 
+# Idle SSE connections get a comment line this often so proxies keep them open
+SSE_KEEPALIVE_SECONDS = 15
+
+def _sport_shard(sport):
+    shard = get_shard(sport)
+    if shard is None:
+        raise HTTPException(status_code=404, detail=f"Unknown sport: {sport}")
+    return shard
+
+def _sport_snapshot(sport):
+    return _sport_shard(sport).store.current()
+
 @router.get("/odds")
-def live_match_odds_api_url():
-    """Live match odds API - continuously updates for all live matches"""
+async def live_match_odds_api_url(
+    request: Request,
+    sport: Optional[str] = Query(None, description="Sport from SPORTS (default: the first configured one)"),
+    match_id: Optional[str] = Query(None, description="Comma-separated match ids"),
+    event_id: Optional[str] = Query(None, description="Alias of match_id"),
+    competition: Optional[str] = Query(None, description="Comma-separated competition names (case-insensitive)"),
+    category: Optional[str] = Query(None, description="Comma-separated categories: bookmaker, fancy, sessions, other"),
+    market_status: Optional[str] = Query(None, description="Comma-separated market statuses to keep, e.g. OPEN"),
+    fields: Optional[str] = Query(None, description="Comma-separated top-level fields to return (default: all)"),
+    exclude: Optional[str] = Query(None, description="Comma-separated top-level fields to leave out, e.g. odds"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size (pages are ordered by match_id)")
+):
+    """Live match odds API - serves the latest snapshot published by the scheduler (ETag / gzip / br aware)
+
+    With filters, only the selected matches, categories, markets and fields are returned; a
+    category or market_status filter also drops matches left without markets. Paged responses
+    carry the cursor of the next page in the ``X-Next-Cursor`` header.
+    """
+    snapshot = _sport_snapshot(sport)
+    if not any((match_id, event_id, competition, category, market_status, fields, exclude, cursor, limit)):
+        return encoded_response(request, snapshot.encoded())
+    match_ids = (split_param(match_id) or []) + (split_param(event_id) or [])
+    try:
+        encoded, next_cursor = query_live(
+            snapshot, match_ids=match_ids, competitions=split_param(competition),
+            categories=split_param(category), statuses=split_param(market_status),
+            fields=split_param(fields), exclude=split_param(exclude), cursor=cursor, limit=limit,
+        )
+    except QueryError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return encoded_response(request, encoded, {"X-Next-Cursor": next_cursor} if next_cursor else None)
+
+@router.get("/odds/changes")
+async def live_match_odds_changes(
+    request: Request,
+    since: int = Query(0, ge=0, description="Last snapshot version the client has"),
+    sport: Optional[str] = Query(None, description="Sport from SPORTS (default: the first configured one)")
+):
+    """Odds changes since a snapshot version - falls back to a full snapshot when the client is too far behind"""
+    _sport_snapshot(sport)
+    snapshot, changes = get_live_changes(since, sport)
+    if changes is None:
+        # Encoded once per version, like /live/odds
+        return encoded_response(request, snapshot.resync())
+    return {
+        "version": snapshot.version,
+        "updated_at": snapshot.updated_at,
+        "full": False,
+        "changes": changes
+    }
+
+@router.get("/history/{match_id}")
+def live_match_odds_history(
+    request: Request,
+    match_id: str,
+    market_id: Optional[str] = Query(None, description="Only this market"),
+    runner_id: Optional[str] = Query(None, description="Only this runner"),
+    start: Optional[float] = Query(None, alias="from", description="Start time, epoch seconds (default: one hour ago)"),
+    end: Optional[float] = Query(None, alias="to", description="End time, epoch seconds (default: now)"),
+    interval: Optional[float] = Query(None, gt=0, description="OHLC candle size in seconds (raw ticks if omitted)")
+):
+    """Recorded back/lay price ticks per runner, or OHLC candles of them"""
+    end_ms = int((end if end is not None else time.time()) * 1000)
+    start_ms = int(start * 1000) if start is not None else end_ms - 3600 * 1000
     try:
-        results = update_live_matches()
-        return {
-            "count": len(results),
-            "live_matches": results
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error fetching live odds: {str(e)}")
+        series = odds_history.query(match_id, market_id, runner_id, start_ms, end_ms)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
+    if interval:
+        interval_ms = max(1, int(interval * 1000))
+        series = [
+            {
+                "category": s["category"],
+                "market_id": s["market_id"],
+                "runner_id": s["runner_id"],
+                "back": downsample_ohlc(s["t"], s["back"], interval_ms),
+                "lay": downsample_ohlc(s["t"], s["lay"], interval_ms),
+            }
+            for s in series
+        ]
+    payload = {"match_id": match_id, "from": start_ms, "to": end_ms, "interval": interval, "series": series}
+    return encoded_response(request, EncodedBody.from_payload(payload))
 
+@router.get("/stream")
+async def live_match_odds_stream(
+    sport: Optional[str] = Query(None, description="Sport from SPORTS (default: the first configured one)"),
+    match_ids: Optional[str] = Query(None, description="Comma-separated match ids to follow (default: all)"),
+    categories: Optional[str] = Query(None, description="Comma-separated categories: bookmaker, fancy, sessions, other")
+):
+    """Server-Sent Events stream of live odds changes (full snapshot first, then deltas)"""
+    shard = _sport_shard(sport)
+    subscriber = hub.subscribe(split_param(match_ids), split_param(categories), shard.name)
+
+    async def events():
+        try:
+            yield hub.initial_message(subscriber, shard.store.current()).sse
+            while True:
+                try:
+                    message = await asyncio.wait_for(subscriber.queue.get(), SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"
+                    continue
+                if message is None:
+                    break
+                yield message.sse
+        finally:
+            hub.unsubscribe(subscriber)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@router.websocket("/ws")
+async def live_match_odds_ws(
+    websocket: WebSocket,
+    sport: Optional[str] = None,
+    match_ids: Optional[str] = None,
+    categories: Optional[str] = None
+):
+    """WebSocket stream of live odds changes (full snapshot first, then deltas)"""
+    shard = get_shard(sport)
+    if shard is None:
+        # Policy violation: there is no stream for an unknown sport
+        await websocket.close(code=1008)
+        return
+    await websocket.accept()
+    subscriber = hub.subscribe(split_param(match_ids), split_param(categories), shard.name)
+
+    async def sender():
+        await websocket.send_text(hub.initial_message(subscriber, shard.store.current()).text)
+        while True:
+            message = await subscriber.queue.get()
+            if message is None:
+                await websocket.close(code=1013)
+                return
+            await websocket.send_text(message.text)
+
+    async def receiver():
+        # Only used to notice client disconnects
+        while True:
+            await websocket.receive_text()
+
+    tasks = [asyncio.create_task(sender()), asyncio.create_task(receiver())]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            if task.done() and not task.cancelled():
+                # Retrieve WebSocketDisconnect and friends so they are not logged as unhandled
+                task.exception()
+            else:
+                task.cancel()
+        hub.unsubscribe(subscriber)
@@ -1,10 +1,41 @@
 # app/routers/matches.py
-from fastapi import APIRouter
-from app.services.match_list_service import fetch_all_matches
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query, Request
+from app.core.config import DEFAULT_SPORT
+from app.services.match_list_service import match_lists
+from app.services.response_cache import encoded_response
+from app.services.snapshot_query import MAX_PAGE_SIZE, QueryError
+from app.utils.common import split_param
 
 router = APIRouter(prefix="/matches", tags=["Matches"])
 
 @router.get("/all")
-def all_cricket_matches_api_url():
-    """All cricket matches API - returns all cricket match details"""
-    return fetch_all_matches()
+def all_cricket_matches_api_url(
+    request: Request,
+    sport: Optional[str] = Query(None, description="Sport from SPORTS (default: the first configured one)"),
+    event_id: Optional[str] = Query(None, description="Comma-separated event ids"),
+    competition: Optional[str] = Query(None, description="Comma-separated competition names (case-insensitive)"),
+    status: Optional[str] = Query(None, description="Comma-separated statuses, e.g. OPEN"),
+    live: Optional[bool] = Query(None, description="Only live (true) or not live (false) matches"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (default: all)"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size (pages are ordered by event_id)")
+):
+    """All cricket matches API - serves the cached match list (ETag / gzip / br aware)
+
+    Paged responses carry the cursor of the next page in the ``X-Next-Cursor`` header.
+    """
+    match_list = match_lists.get(sport.lower() if sport else DEFAULT_SPORT)
+    if match_list is None:
+        raise HTTPException(status_code=404, detail=f"Unknown sport: {sport}")
+    if event_id is None and competition is None and status is None and live is None \
+            and fields is None and cursor is None and limit is None:
+        return encoded_response(request, match_list.encoded())
+    try:
+        encoded, next_cursor = match_list.query(
+            event_ids=split_param(event_id), competitions=split_param(competition),
+            statuses=split_param(status), live=live, fields=split_param(fields), cursor=cursor, limit=limit,
+        )
+    except QueryError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return encoded_response(request, encoded, {"X-Next-Cursor": next_cursor} if next_cursor else None)
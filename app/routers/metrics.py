@@ -0,0 +1,13 @@
+# app/routers/metrics.py
+from fastapi import APIRouter
+from fastapi.responses import Response
+from app.services.leader_election import leader_lock
+from app.services.metrics import CONTENT_TYPE, registry
+
+router = APIRouter(tags=["Metrics"])
+
+@router.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    """Prometheus metrics - followers serve the scraping leader's last export"""
+    body = None if leader_lock.is_leader else registry.read_export()
+    return Response(body or registry.render(), media_type=CONTENT_TYPE)
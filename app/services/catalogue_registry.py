@@ -0,0 +1,104 @@
+# app/services/catalogue_registry.py
+"""Static market catalogue data, kept across ticks per market id.
+
+A market's name, condition, category and runner names practically never
+change while it is live; only its prices and status do. The registry keeps
+them as a ``MarketCatalogue`` per market id, classified and interned once,
+and rebuilds one only when its signature (name, condition, runners list)
+differs from the catalogue entry upstream just sent. Comparing the
+signature is a C-level equality check on objects the payload already holds.
+
+Markets are tracked per event and dropped when their event leaves the live
+list (``retain``).
+"""
+import threading
+from functools import lru_cache
+
+from app.services.match_model import ABSENT, intern
+
+
+@lru_cache(maxsize=4096)
+def classify_market(name):
+    name = (name or "").lower()
+    if "match odds" in name:
+        return "bookmaker"
+    elif "runs" in name or "boundaries" in name:
+        return "fancy"
+    elif "session" in name or "over" in name:
+        return "sessions"
+    return "other"
+
+
+def catalogue_signature(cat):
+    return (cat.get('marketName'), cat.get('marketCondition'), cat.get('runners'))
+
+
+class MarketCatalogue:
+    """Classified, interned static data of one market."""
+
+    __slots__ = ("market_id", "signature", "category", "name", "condition", "runner_ids", "runner_names",
+                 "names_by_id")
+
+    def __init__(self, market_id, signature):
+        name, condition, runners = signature
+        self.market_id = market_id
+        self.signature = signature
+        self.category = classify_market(name)
+        self.name = intern(name)
+        # market_condition is only kept for 'fancy' markets
+        self.condition = condition if self.category == 'fancy' else ABSENT
+        runners = runners or []
+        self.runner_ids = tuple(intern(str(r.get('id'))) for r in runners)
+        self.runner_names = tuple(intern(r.get('name')) for r in runners)
+        self.names_by_id = dict(zip(self.runner_ids, self.runner_names))
+
+
+class CatalogueRegistry:
+    """``MarketCatalogue`` per market id, grouped by event.
+
+    Lookups run on the scrape engine thread while the scheduler thread drops
+    events that left the live list, so changes to the two maps take a lock;
+    the common lookup (signature unchanged) is a single dict read without it.
+    """
+
+    def __init__(self):
+        self._markets = {}
+        self._events = {}
+        self._lock = threading.Lock()
+        self.rebuilt = 0
+
+    def lookup(self, event_id, market_id, cat):
+        """The market's catalogue data, rebuilt if ``cat`` changed its signature"""
+        signature = catalogue_signature(cat)
+        entry = self._markets.get(market_id)
+        if entry is not None and entry.signature == signature:
+            return entry
+        entry = MarketCatalogue(market_id, signature)
+        with self._lock:
+            self._markets[market_id] = entry
+            self._events.setdefault(str(event_id), set()).add(market_id)
+            self.rebuilt += 1
+        return entry
+
+    def retain(self, event_ids):
+        """Forget the markets of every event not in ``event_ids``"""
+        keep = {str(e) for e in event_ids}
+        with self._lock:
+            self._discard([e for e in self._events if e not in keep])
+
+    def discard(self, event_ids):
+        """Forget the markets of ``event_ids``"""
+        with self._lock:
+            self._discard(event_ids)
+
+    def _discard(self, event_ids):
+        # Caller holds the lock
+        for event_id in event_ids:
+            for market_id in self._events.pop(str(event_id), ()):
+                self._markets.pop(market_id, None)
+
+    def __len__(self):
+        return len(self._markets)
+
+
+catalogue_registry = CatalogueRegistry()
@@ -0,0 +1,145 @@
+# app/services/circuit_breaker.py
+"""Circuit breakers for upstream hosts and individual live events.
+
+A breaker is closed while requests mostly succeed. Once the failure rate over
+the last ``window`` seconds reaches ``failure_rate`` (with at least
+``min_requests`` outcomes), it opens and callers fail fast for ``cooldown``
+seconds. After that it is half-open: a single probe is let through; success
+closes the breaker, failure opens it again with the cooldown doubled (up to
+``max_cooldown``).
+
+Breakers are not locked: host breakers are only used on the scrape engine
+loop, and an event's breaker is only touched by the one in-flight refresh of
+that event.
+"""
+import time
+from collections import deque
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of making a request while a breaker is open."""
+
+    def __init__(self, name, retry_at, message=None):
+        super().__init__(message or f"Circuit open for {name}")
+        self.name = name
+        # time.monotonic() value after which a probe is allowed
+        self.retry_at = retry_at
+
+
+class HostThrottledError(CircuitOpenError):
+    """Raised when upstream throttles the host (429/403); like an open breaker, it says nothing about the event."""
+
+    def __init__(self, name, retry_at, status):
+        super().__init__(name, retry_at, f"Host {name} throttled (HTTP {status})")
+        self.status = status
+
+
+class EventUnavailable(Exception):
+    """Upstream has no data for an event (404 or no detailed data); retrying soon will not help."""
+
+    def __init__(self, event_id, reason):
+        super().__init__(f"Event {event_id} unavailable: {reason}")
+        self.event_id = event_id
+        self.reason = reason
+
+
+class CircuitBreaker:
+    def __init__(self, name, window, failure_rate, min_requests, cooldown, max_cooldown):
+        self.name = name
+        self.window = window
+        self.failure_rate = failure_rate
+        self.min_requests = min_requests
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.cooldown = cooldown
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self._probing = False
+        self._probe_started = 0.0
+        # (monotonic time, succeeded) for outcomes inside the window
+        self._outcomes = deque()
+        self._failures = 0
+
+    @property
+    def retry_at(self):
+        return self.opened_at + self.cooldown
+
+    def allow(self):
+        """True if a request may go out now; an open breaker becomes half-open after its cooldown"""
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN:
+            if time.monotonic() < self.retry_at:
+                return False
+            self.state = HALF_OPEN
+            self._probing = False
+        now = time.monotonic()
+        # A probe that never reported back (cancelled) is replaced after a cooldown
+        if self._probing and now - self._probe_started < self.cooldown:
+            return False
+        self._probing = True
+        self._probe_started = now
+        return True
+
+    def release(self):
+        """Give back a half-open probe slot that was not used"""
+        self._probing = False
+
+    def check(self):
+        """``allow()`` or raise ``CircuitOpenError``"""
+        if not self.allow():
+            raise CircuitOpenError(self.name, self.retry_at)
+
+    def _trim(self, now):
+        outcomes = self._outcomes
+        while outcomes and outcomes[0][0] < now - self.window:
+            _, ok = outcomes.popleft()
+            if not ok:
+                self._failures -= 1
+
+    def record_success(self):
+        now = time.monotonic()
+        if self.state != CLOSED:
+            self._close()
+            return
+        self._outcomes.append((now, True))
+        self._trim(now)
+
+    def record_failure(self):
+        now = time.monotonic()
+        if self.state == HALF_OPEN:
+            self._open(now, min(self.max_cooldown, self.cooldown * 2))
+            return
+        if self.state == OPEN:
+            return
+        self._outcomes.append((now, False))
+        self._failures += 1
+        self._trim(now)
+        total = len(self._outcomes)
+        if total >= self.min_requests and self._failures / total >= self.failure_rate:
+            self._open(now, self.base_cooldown)
+
+    def _open(self, now, cooldown):
+        self.state = OPEN
+        self.opened_at = now
+        self.cooldown = cooldown
+        self._probing = False
+
+    def _close(self):
+        self.state = CLOSED
+        self.cooldown = self.base_cooldown
+        self._probing = False
+        self._outcomes.clear()
+        self._failures = 0
+
+    def stats(self):
+        return {
+            "state": self.state,
+            "requests": len(self._outcomes),
+            "failures": self._failures,
+            "retry_in": round(max(0.0, self.retry_at - time.monotonic()), 2) if self.state != CLOSED else 0,
+        }
@@ -0,0 +1,339 @@
+# app/services/cluster.py
+"""Split the live events between several scraper nodes.
+
+One node runs into the upstream per-IP rate limit long before it runs out
+of CPU. In cluster mode (``CLUSTER_BACKEND``) the scraping leader of every
+node joins a cluster through a shared coordination backend:
+
+- it heartbeats every ``CLUSTER_HEARTBEAT`` seconds; nodes silent for
+  ``CLUSTER_NODE_TTL`` seconds are dropped
+- the live nodes form a consistent hash ring (``CLUSTER_VNODES`` points
+  each) and a node only scrapes the events of each sport that hash to it,
+  so a node joining or leaving moves about 1/N of the events
+- each node publishes the matches it owns, one row per match, and merges
+  the other nodes' rows into its own store, so ``/live/odds`` on any node
+  serves every live match
+
+Backends: ``SqliteBackend`` (a file every node opens: nodes on one host or
+on a shared volume) and ``MemoryBackend`` (nodes in one process, for tests
+and benchmarks). Both keep the same two tables: node heartbeats, and match
+rows keyed by (sport, node, match id) with a write stamp, so readers only
+fetch the bodies that changed.
+"""
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from bisect import bisect_right
+
+from app.core.config import DATA_DIR
+from app.core.logger import get_logger
+from app.core.settings import settings
+from app.services.match_model import LiveMatch
+from app.services.metrics import Counter, Gauge
+
+logger = get_logger("cluster")
+
+CLUSTER_REBALANCES = Counter("cluster_rebalances_total", "Cluster membership changes that rebuilt the hash ring")
+
+
+def ring_hash(key):
+    # Stable across processes, unlike hash()
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """Consistent hash ring of node ids"""
+
+    def __init__(self, nodes, vnodes):
+        self.nodes = tuple(sorted(nodes))
+        points = sorted((ring_hash(f"{node}#{i}"), node) for node in self.nodes for i in range(vnodes))
+        self._hashes = [h for h, _ in points]
+        self._owners = [node for _, node in points]
+
+    def owner(self, key):
+        if not self._hashes:
+            return None
+        return self._owners[bisect_right(self._hashes, ring_hash(key)) % len(self._hashes)]
+
+
+# --- Backends ---
+
+class MemoryBackend:
+    """Coordination state held in this process, shared by the nodes given the same instance"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # node_id -> last heartbeat (epoch seconds)
+        self._nodes = {}
+        # (sport, node_id, match_id) -> (stamp, body)
+        self._matches = {}
+
+    def heartbeat(self, node_id, now):
+        """Record a heartbeat; True if the node was not registered (new, or dropped as dead)"""
+        with self._lock:
+            new = node_id not in self._nodes
+            self._nodes[node_id] = now
+            return new
+
+    def members(self, since):
+        with self._lock:
+            return sorted(node for node, beat in self._nodes.items() if beat >= since)
+
+    def prune(self, before):
+        """Drop nodes whose last heartbeat is older than ``before``, with their matches"""
+        with self._lock:
+            dead = {node for node, beat in self._nodes.items() if beat < before}
+            self._drop(dead)
+
+    def leave(self, node_id):
+        with self._lock:
+            self._drop({node_id})
+
+    def _drop(self, nodes):
+        for node in nodes:
+            self._nodes.pop(node, None)
+        for key in [k for k in self._matches if k[1] in nodes]:
+            del self._matches[key]
+
+    def put_matches(self, node_id, sport, upserts, removed):
+        """``upserts``: [(match_id, stamp, body)]; ``removed``: match ids"""
+        with self._lock:
+            for match_id, stamp, body in upserts:
+                self._matches[(sport, node_id, match_id)] = (stamp, body)
+            for match_id in removed:
+                self._matches.pop((sport, node_id, match_id), None)
+
+    def match_stamps(self, sport):
+        """``{(node_id, match_id): stamp}`` of every row of ``sport``"""
+        with self._lock:
+            return {(node, mid): row[0] for (s, node, mid), row in self._matches.items() if s == sport}
+
+    def match_bodies(self, sport, keys):
+        """``{(node_id, match_id): body}`` for the given keys that still exist"""
+        with self._lock:
+            rows = ((key, self._matches.get((sport,) + key)) for key in keys)
+            return {key: row[1] for key, row in rows if row is not None}
+
+
+class SqliteBackend:
+    """Coordination state in a SQLite file shared by the nodes (WAL mode, one connection per process)"""
+
+    def __init__(self, path):
+        self.path = path
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connection(self):
+        # Caller holds the lock; opened on first use, so non-scraping workers never touch the file
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS nodes (node_id TEXT PRIMARY KEY, heartbeat REAL NOT NULL)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS matches (sport TEXT NOT NULL, node_id TEXT NOT NULL, "
+                "match_id TEXT NOT NULL, stamp INTEGER NOT NULL, body BLOB NOT NULL, "
+                "PRIMARY KEY (sport, node_id, match_id))"
+            )
+            self._conn = conn
+        return self._conn
+
+    def _transaction(self, work):
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = work(conn)
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+            return result
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self._connection().execute(sql, params).fetchall()
+
+    def heartbeat(self, node_id, now):
+        def work(conn):
+            new = conn.execute("SELECT 1 FROM nodes WHERE node_id = ?", (node_id,)).fetchone() is None
+            conn.execute(
+                "INSERT INTO nodes (node_id, heartbeat) VALUES (?, ?) "
+                "ON CONFLICT(node_id) DO UPDATE SET heartbeat = excluded.heartbeat",
+                (node_id, now),
+            )
+            return new
+        return self._transaction(work)
+
+    def members(self, since):
+        return [row[0] for row in self._query("SELECT node_id FROM nodes WHERE heartbeat >= ? ORDER BY node_id",
+                                              (since,))]
+
+    def prune(self, before):
+        def work(conn):
+            conn.execute("DELETE FROM matches WHERE node_id IN (SELECT node_id FROM nodes WHERE heartbeat < ?)",
+                         (before,))
+            conn.execute("DELETE FROM nodes WHERE heartbeat < ?", (before,))
+        self._transaction(work)
+
+    def leave(self, node_id):
+        def work(conn):
+            conn.execute("DELETE FROM matches WHERE node_id = ?", (node_id,))
+            conn.execute("DELETE FROM nodes WHERE node_id = ?", (node_id,))
+        self._transaction(work)
+
+    def put_matches(self, node_id, sport, upserts, removed):
+        def work(conn):
+            conn.executemany(
+                "INSERT OR REPLACE INTO matches (sport, node_id, match_id, stamp, body) VALUES (?, ?, ?, ?, ?)",
+                [(sport, node_id, mid, stamp, body) for mid, stamp, body in upserts],
+            )
+            conn.executemany("DELETE FROM matches WHERE sport = ? AND node_id = ? AND match_id = ?",
+                             [(sport, node_id, mid) for mid in removed])
+        self._transaction(work)
+
+    def match_stamps(self, sport):
+        rows = self._query("SELECT node_id, match_id, stamp FROM matches WHERE sport = ?", (sport,))
+        return {(node, mid): stamp for node, mid, stamp in rows}
+
+    def match_bodies(self, sport, keys):
+        bodies = {}
+        with self._lock:
+            conn = self._connection()
+            for node, mid in keys:
+                row = conn.execute("SELECT body FROM matches WHERE sport = ? AND node_id = ? AND match_id = ?",
+                                   (sport, node, mid)).fetchone()
+                if row is not None:
+                    bodies[(node, mid)] = row[0]
+        return bodies
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+BACKENDS = {
+    "sqlite": lambda: SqliteBackend(settings.CLUSTER_DB or os.path.join(DATA_DIR, "cluster.db")),
+    "memory": MemoryBackend,
+}
+
+
+# --- Node ---
+
+class ClusterNode:
+    """This process as a member of the scraper cluster (the scraping leader only)"""
+
+    def __init__(self, node_id, backend, ttl, vnodes):
+        self.node_id = node_id
+        self.backend = backend
+        self.ttl = ttl
+        self.vnodes = vnodes
+        self.ring = HashRing((), vnodes)
+        self.joined = False
+        self.rebalanced_at = 0.0
+        # sport -> {match_id: LiveMatch} as last published by this node
+        self._published = {}
+        # sport -> {match_id: (node_id, stamp)} of the other nodes' rows merged into the store
+        self._merged = {}
+
+    def owner(self, sport, event_id):
+        return self.ring.owner(f"{sport}:{event_id}")
+
+    def owns(self, sport, event_id):
+        """Whether this node scrapes the event (every event while it is not in the cluster)"""
+        return not self.joined or self.owner(sport, event_id) == self.node_id
+
+    def owned(self, sport, live_matches):
+        """The entries of a live match list this node scrapes"""
+        return [m for m in live_matches if self.owns(sport, m.get('event_id'))]
+
+    def join(self):
+        self.beat()
+        logger.info("Joined the scraper cluster as %s (%s nodes)", self.node_id, len(self.ring.nodes))
+
+    def beat(self):
+        """Heartbeat, and rebuild the ring when nodes joined or left"""
+        now = time.time()
+        if self.backend.heartbeat(self.node_id, now) and self.joined:
+            # Dropped as dead (e.g. a long pause): our rows are gone, publish everything again
+            logger.warning("Node %s had been dropped from the cluster, rejoining", self.node_id)
+            self._published.clear()
+        self.backend.prune(now - self.ttl)
+        members = tuple(self.backend.members(now - self.ttl))
+        self.joined = True
+        if members != self.ring.nodes:
+            logger.info("Cluster members changed: %s", ", ".join(members))
+            self.ring = HashRing(members, self.vnodes)
+            self.rebalanced_at = time.monotonic()
+            CLUSTER_REBALANCES.inc()
+
+    def leave(self):
+        """Drop out of the cluster now, so the other nodes take over without waiting for the TTL"""
+        if not self.joined:
+            return
+        self.joined = False
+        self.ring = HashRing((), self.vnodes)
+        self.backend.leave(self.node_id)
+        logger.info("Node %s left the scraper cluster", self.node_id)
+
+    def sync(self, sport, store):
+        """Publish this node's matches of ``sport`` and merge the other nodes' into ``store``"""
+        if not self.joined:
+            return
+        snapshot = store.current()
+        owned = {mid: m for mid, m in snapshot.by_id.items() if self.owns(sport, mid)}
+        published = self._published.get(sport, {})
+        stamp = time.time_ns()
+        upserts = [(mid, stamp, m.to_json()) for mid, m in owned.items() if published.get(mid) is not m]
+        removed = [mid for mid in published if mid not in owned]
+        if upserts or removed:
+            self.backend.put_matches(self.node_id, sport, upserts, removed)
+        self._published[sport] = owned
+
+        # Other nodes' rows, for the events each of them owns on the current ring
+        wanted = {
+            mid: (node, row_stamp) for (node, mid), row_stamp in self.backend.match_stamps(sport).items()
+            if node != self.node_id and self.owner(sport, mid) == node
+        }
+        merged = self._merged.get(sport, {})
+        changed = [(node, mid) for mid, (node, row_stamp) in wanted.items() if merged.get(mid) != (node, row_stamp)]
+        matches = []
+        for (node, mid), body in self.backend.match_bodies(sport, changed).items():
+            try:
+                matches.append(LiveMatch.from_dict(json.loads(body)))
+            except (ValueError, TypeError, AttributeError) as e:
+                logger.warning("Skipping match %s from node %s: %s", mid, node, e)
+                continue
+            merged[mid] = wanted[mid]
+        # Matches neither owned here nor published by their owner have ended, or their new
+        # owner has not fetched them yet after a rebalance: keep those for one node TTL
+        gone = []
+        if time.monotonic() - self.rebalanced_at > self.ttl:
+            gone = [mid for mid in snapshot.by_id if mid not in wanted and not self.owns(sport, mid)]
+        self._merged[sport] = {mid: row for mid, row in merged.items() if mid in wanted}
+        if matches or gone:
+            store.apply(matches, gone)
+
+
+def _cluster_from_settings():
+    if not settings.CLUSTER_BACKEND:
+        return None
+    factory = BACKENDS.get(settings.CLUSTER_BACKEND.lower())
+    if factory is None:
+        raise ValueError(
+            f"Unknown CLUSTER_BACKEND {settings.CLUSTER_BACKEND!r}; expected one of {', '.join(BACKENDS)}")
+    node_id = settings.CLUSTER_NODE_ID or f"{socket.gethostname()}-{os.getpid()}"
+    return ClusterNode(node_id, factory(), settings.CLUSTER_NODE_TTL, settings.CLUSTER_VNODES)
+
+
+# None unless CLUSTER_BACKEND is set
+cluster = _cluster_from_settings()
+
+Gauge("cluster_members", "Scraper nodes on the cluster hash ring",
+      lambda: len(cluster.ring.nodes) if cluster is not None and cluster.joined else None)
@@ -0,0 +1,108 @@
+# app/services/delta_feed.py
+"""Market/runner level diffs between consecutive versions of a live match.
+
+Each snapshot version records the list of match deltas that produced it.
+Markets are compared on the compact ``MarketBook`` model, so unchanged
+markets cost an array comparison and only changed runners become dicts.
+Deltas are kept in a bounded ring buffer so clients can ask for everything
+after the version they last saw and fall back to a full snapshot when they
+are too far behind.
+
+Delta shapes:
+
+- ``{"type": "match", "match_id", "match"}``: a match appeared (full payload)
+- ``{"type": "remove", "match_id"}``: a match left the live list
+- ``{"type": "update", "match_id", "last_updated", ...}`` with optional
+  ``fields`` (changed top-level values), ``result``, ``markets``
+  (``{category: {market_id: changes}}``) and ``removed_markets``
+  (``{category: [market_id]}``). A changed market lists its changed scalar
+  fields plus ``runners`` (changed runners in full) and ``removed_runners``.
+
+The raw ``odds`` blob is not diffed; it duplicates the parsed markets and is
+only available from the full snapshot.
+"""
+import bisect
+import threading
+from collections import deque
+
+from app.services.match_model import MARKET_CATEGORIES
+
+def diff_match(prev, new):
+    """Return the delta turning ``prev`` into ``new`` (``LiveMatch`` objects), or None if nothing changed"""
+    if new is None:
+        return {"type": "remove", "match_id": prev.match_id} if prev is not None else None
+    if prev is None:
+        return {"type": "match", "match_id": new.match_id, "match": new.to_dict()}
+
+    delta = {}
+    fields = {}
+    if prev.match_name != new.match_name:
+        fields["match_name"] = new.match_name
+    prev_info = prev.info or {}
+    for key, value in (new.info or {}).items():
+        if prev_info.get(key) != value:
+            fields[key] = value
+    if fields:
+        delta["fields"] = fields
+    if prev.score_raw != new.score_raw:
+        delta["result"] = new.result
+
+    markets = {}
+    removed_markets = {}
+    for category in MARKET_CATEGORIES:
+        prev_markets = prev.markets.get(category) or {}
+        new_markets = new.markets.get(category) or {}
+        changed = {}
+        for market_id, market in new_markets.items():
+            old = prev_markets.get(market_id)
+            if old is None:
+                changed[market_id] = market.to_dict()
+            elif old != market:
+                market_changes = market.diff(old)
+                if market_changes:
+                    changed[market_id] = market_changes
+        if changed:
+            markets[category] = changed
+        removed = [mid for mid in prev_markets if mid not in new_markets]
+        if removed:
+            removed_markets[category] = removed
+    if markets:
+        delta["markets"] = markets
+    if removed_markets:
+        delta["removed_markets"] = removed_markets
+
+    if not delta:
+        return None
+    delta.update({"type": "update", "match_id": new.match_id, "last_updated": new.last_updated})
+    return delta
+
+
+class DeltaFeed:
+    """Bounded ring buffer of ``(previous_version, version, deltas)`` entries.
+
+    Versions normally increase by one, but a store mirroring another process
+    may skip versions; an entry then covers every change between
+    ``previous_version`` and ``version``. Deltas carry absolute values, so
+    replaying an entry on top of any version inside that range is safe.
+    """
+
+    def __init__(self, maxlen):
+        self._entries = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+
+    def append(self, previous_version, version, deltas):
+        with self._lock:
+            self._entries.append((previous_version, version, deltas))
+
+    def since(self, version, until=None):
+        """Entries newer than ``version`` up to ``until``; None if ``version`` fell out of the buffer"""
+        with self._lock:
+            entries = list(self._entries)
+        if not entries or version < entries[0][0]:
+            return None
+        start = bisect.bisect_right(entries, version, key=lambda e: e[1])
+        return [
+            {"version": v, "deltas": deltas}
+            for _, v, deltas in entries[start:]
+            if until is None or v <= until
+        ]
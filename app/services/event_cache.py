@@ -0,0 +1,78 @@
+# app/services/event_cache.py
+"""Per-event memory of the last upstream response, for cheap unchanged ticks.
+
+For every live event we keep the validators upstream sent (``ETag`` /
+``Last-Modified``), a hash of the raw body and the pieces it was organized
+from. A refresh then costs:
+
+- a 304 when upstream honours the conditional headers
+- one hash when the body is byte-identical to the last one
+- otherwise only the markets whose raw odds or catalogue entry changed are
+  rebuilt (on top of the static data in ``catalogue_registry``); the rest
+  reuse the previous ``MarketBook`` objects
+"""
+import hashlib
+
+
+def body_hash(body):
+    return hashlib.blake2b(body, digest_size=16).digest()
+
+
+class EventCacheEntry:
+    __slots__ = ("etag", "last_modified", "body_hash", "match", "odds_raw", "odds_data", "books")
+
+    def __init__(self):
+        self.etag = None
+        self.last_modified = None
+        self.body_hash = None
+        # Last organized LiveMatch for this event (as published, with match list info)
+        self.match = None
+        # Raw odds string and its decoded dict
+        self.odds_raw = None
+        self.odds_data = None
+        # market_id -> (MarketCatalogue, raw market odds, catalogue (status, inPlay), MarketBook)
+        self.books = {}
+
+    def conditional_headers(self):
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def remember_response(self, headers, digest):
+        self.etag = headers.get("ETag")
+        self.last_modified = headers.get("Last-Modified")
+        self.body_hash = digest
+
+
+class EventCache:
+    """``EventCacheEntry`` per event id.
+
+    Entries are filled in by fetches on the scrape engine thread; the scheduler
+    thread only discards events that left the live list.
+    """
+
+    def __init__(self):
+        self._entries = {}
+
+    def get(self, event_id):
+        return self._entries.get(str(event_id))
+
+    def entry(self, event_id):
+        key = str(event_id)
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = EventCacheEntry()
+        return entry
+
+    def discard(self, event_ids):
+        for event_id in event_ids:
+            self._entries.pop(str(event_id), None)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+event_cache = EventCache()
@@ -0,0 +1,69 @@
+# app/services/leader_election.py
+"""Pick one scraping process per host with an OS file lock.
+
+Every gunicorn/uvicorn worker imports ``app.main``. Only the worker holding
+the lock under ``DATA_DIR`` runs the scrapers; the others mirror its
+snapshot. The lock is tied to the open file descriptor, so it is released
+automatically when the leader exits and a follower can take over.
+"""
+import os
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from app.core.config import DATA_DIR
+from app.core.logger import get_logger
+
+logger = get_logger("leader_election")
+
+
+class FileLeaderLock:
+    def __init__(self, path):
+        self.path = path
+        self._fd = None
+
+    @property
+    def is_leader(self):
+        return self._fd is not None
+
+    def try_acquire(self):
+        """Become leader if nobody else holds the lock; never blocks"""
+        if self._fd is not None:
+            return True
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        except OSError:
+            os.close(fd)
+            return False
+
+        # Record the owner for debugging; the lock itself is what matters
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        self._fd = fd
+        logger.info("Process %s is the scraping leader", os.getpid())
+        return True
+
+    def release(self):
+        if self._fd is None:
+            return
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+
+# Process-wide lock shared by all workers of this deployment
+leader_lock = FileLeaderLock(os.path.join(DATA_DIR, "scraper.lock"))
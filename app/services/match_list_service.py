@@ -1,56 +1,231 @@
 # app/services/match_list_service.py
-import requests, json, os
-from app.core.config import HEADERS, MATCH_LIST_URL, ALL_MATCHES_FILE, DATA_DIR
+"""Match lists per sport, refreshed on a schedule and served from memory.
+
+There is one list per configured sport (``SPORTS``, upstream event type);
+``match_list`` is the default sport's. The scraping leader refreshes each
+list from upstream every ``MATCH_LIST_TTL`` seconds through the shared
+scrape engine and rewrites its file (``ALL_MATCHES_FILE``, or
+``all_matches.<sport>.json``) only when the list changed. Readers always get the cached list: once it is
+older than the TTL they still get it (stale-while-revalidate) while the
+leader refreshes it in the background and followers re-read the file.
+Requests never wait for upstream: before the first list is fetched or
+loaded from the file they get an empty list.
+"""
+import json, os
+import threading
+import time
+from app.core.config import ALL_MATCHES_FILE, DATA_DIR, DEFAULT_SPORT, SPORTS, match_list_url, sport_path
 from app.core.logger import get_logger
+from app.core.settings import settings
+from app.services.circuit_breaker import CircuitOpenError
+from app.services.leader_election import leader_lock
+from app.services.metrics import Gauge
+from app.services.response_cache import EncodedBody, reuse_or_encode
+from app.services.scrape_engine import engine
+from app.services.snapshot_query import match_list_index, query_match_list
 
 logger = get_logger("match_list_service")
 
+EMPTY_LIST = EncodedBody(b"[]")
+
+def organize_match_list(data):
+    """Flatten the upstream market list into match entries"""
+    matches = []
+
+    for item in data:
+        event = item.get('event', {})
+        catalogue = item.get('catalogue', {})
+        competition = item.get('competition', {})
+        runners = catalogue.get('runners', [])
+        matches.append({
+            'match_name': event.get('name', 'N/A'),
+            'teams': ', '.join([r.get('name', 'N/A') for r in runners]),
+            'start_time': event.get('openDate', 'N/A'),
+            'status': catalogue.get('status', 'N/A'),
+            'market_id': catalogue.get('marketId', 'N/A'),
+            'event_id': event.get('id', 'N/A'),
+            'competition': competition.get('name', 'N/A'),
+            'live': catalogue.get('inPlay', False)
+        })
+
+    # Sort matches: Live first, then OPEN before SUSPENDED, then by start time
+    def sort_key(match):
+        # Priority 1: Live matches first (True=1, False=0, invert to get True first)
+        live_priority = 0 if match.get('live') else 1
+
+        # Priority 2: Status priority (OPEN before SUSPENDED)
+        status = match.get('status', 'N/A')
+        status_priority = 0 if status == 'OPEN' else (1 if status == 'SUSPENDED' else 2)
+
+        # Priority 3: Start time (earliest first)
+        start_time = match.get('start_time', 'Z')
+
+        return (live_priority, status_priority, start_time)
+
+    matches.sort(key=sort_key)
+    return matches
+
+
+class MatchListCache:
+    """In-memory match list with its live subset and pre-encoded response body."""
+
+    def __init__(self, ttl, path, url, sport=DEFAULT_SPORT):
+        self.ttl = ttl
+        self.path = path
+        self.url = url
+        self.sport = sport
+        self._matches = None
+        self._live = None
+        self._encoded = None
+        # (matches, ItemIndex) swapped as one reference for filtered queries
+        self._indexed = None
+        # Wall-clock time the cached list was fetched (file mtime when loaded from disk)
+        self._fetched_at = 0.0
+        self._file_mtime = None
+        # Held for the whole upstream refresh, released from the engine thread
+        self._refreshing = threading.Lock()
+
+    @property
+    def age(self):
+        return time.time() - self._fetched_at
+
+    def _set(self, matches, fetched_at):
+        encoded = reuse_or_encode(self._encoded, matches)
+        changed = encoded is not self._encoded
+        if changed:
+            self._live = [m for m in matches if m.get('live')]
+            self._indexed = (matches, match_list_index(matches))
+            self._encoded = encoded
+            self._matches = matches
+        self._fetched_at = fetched_at
+        return changed
+
+    def _save(self, encoded):
+        """Atomically replace the match list file (other workers read it) and precompress the body"""
+        encoded.precompress()
+        try:
+            os.makedirs(DATA_DIR, exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(encoded.body)
+            os.replace(tmp_path, self.path)
+            self._file_mtime = os.path.getmtime(self.path)
+        except Exception as e:
+            logger.error("Error saving match list: %s", e)
+
+    async def _refresh_async(self):
+        try:
+            res = await engine.fetch(self.url, label=f"{self.sport} match list", budget=self.sport)
+        except CircuitOpenError as e:
+            logger.warning("Not fetching %s matches, keeping the cached list: %s", self.sport, e)
+            return False
+        if res is None or res.status != 200:
+            logger.error("Error fetching %s matches: upstream unavailable, keeping the cached list", self.sport)
+            return False
+        try:
+            matches = organize_match_list(json.loads(res.body))
+        except Exception as e:
+            logger.error("Error fetching matches: %s", e)
+            return False
+
+        if self._set(matches, time.time()):
+            # The file holds the same compact bytes as the response body
+            await engine.loop.run_in_executor(None, self._save, self._encoded)
+            logger.info("Saved %s %s matches (sorted: live first, then by status and time).", len(matches), self.sport)
+        return True
+
+    def refresh(self):
+        """Fetch the list from upstream now; False if it failed or a refresh is already running"""
+        if not self._refreshing.acquire(blocking=False):
+            return False
+        try:
+            return engine.run(self._refresh_async())
+        except Exception as e:
+            logger.error("Error fetching matches: %s", e)
+            return False
+        finally:
+            self._refreshing.release()
+
+    def refresh_in_background(self):
+        """Start a refresh on the engine without waiting for it (no-op if one is running)"""
+        if not self._refreshing.acquire(blocking=False):
+            return
+        future = engine.submit(self._refresh_async())
+        future.add_done_callback(self._background_done)
+
+    def _background_done(self, future):
+        self._refreshing.release()
+        if not future.cancelled() and future.exception() is not None:
+            logger.error("Error fetching matches: %s", future.exception())
+
+    def load_file(self):
+        """Adopt ``ALL_MATCHES_FILE`` if it was rewritten since we last saw it"""
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return False
+        if mtime == self._file_mtime:
+            return False
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                matches = json.load(f)
+        except Exception as e:
+            logger.error("Error reading match file: %s", e)
+            return False
+        self._file_mtime = mtime
+        self._set(matches, mtime)
+        return True
+
+    def _ensure_fresh(self):
+        if self._matches is None:
+            # Cold start: only the last saved list; readers never fetch upstream, the
+            # leader's refresh job (or refresh_in_background) does
+            self.load_file()
+        elif self.age > self.ttl:
+            if leader_lock.is_leader:
+                self.refresh_in_background()
+            else:
+                self.load_file()
+
+    def get(self):
+        """All matches, or None if no list could be loaded yet"""
+        self._ensure_fresh()
+        return self._matches
+
+    def live(self):
+        """Live entries of the match list, or None if no list could be loaded yet"""
+        self._ensure_fresh()
+        return self._live
+
+    def peek_live(self):
+        """Live entries as cached, without loading or refreshing the list (None before the first load)"""
+        return self._live
+
+    def encoded(self):
+        """Response body for GET /matches/all"""
+        self._ensure_fresh()
+        return self._encoded or EMPTY_LIST
+
+    def query(self, **criteria):
+        """``(EncodedBody, next_cursor)`` for a filtered/paged ``/matches/all`` (see ``snapshot_query``)"""
+        self._ensure_fresh()
+        indexed = self._indexed
+        if indexed is None:
+            return EMPTY_LIST, None
+        return query_match_list(*indexed, **criteria)
+
+
+match_lists = {
+    sport.name: MatchListCache(settings.MATCH_LIST_TTL, sport_path(ALL_MATCHES_FILE, sport.name),
+                               match_list_url(sport.event_type), sport.name)
+    for sport in SPORTS
+}
+match_list = match_lists[DEFAULT_SPORT]
+Gauge("match_list_age_seconds", "Age of the cached match list per sport",
+      lambda: {(name,): cache.age for name, cache in match_lists.items() if cache._matches is not None},
+      labelnames=("sport",))
+
 def fetch_all_matches():
-    try:
-        response = requests.get(MATCH_LIST_URL, headers=HEADERS, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        matches = []
-
-        for item in data:
-            event = item.get('event', {})
-            catalogue = item.get('catalogue', {})
-            competition = item.get('competition', {})
-            runners = catalogue.get('runners', [])
-            matches.append({
-                'match_name': event.get('name', 'N/A'),
-                'teams': ', '.join([r.get('name', 'N/A') for r in runners]),
-                'start_time': event.get('openDate', 'N/A'),
-                'status': catalogue.get('status', 'N/A'),
-                'market_id': catalogue.get('marketId', 'N/A'),
-                'event_id': event.get('id', 'N/A'),
-                'competition': competition.get('name', 'N/A'),
-                'live': catalogue.get('inPlay', False)
-            })
-
-        # Sort matches: Live first, then OPEN before SUSPENDED, then by start time
-        def sort_key(match):
-            # Priority 1: Live matches first (True=1, False=0, invert to get True first)
-            live_priority = 0 if match.get('live') else 1
-            
-            # Priority 2: Status priority (OPEN before SUSPENDED)
-            status = match.get('status', 'N/A')
-            status_priority = 0 if status == 'OPEN' else (1 if status == 'SUSPENDED' else 2)
-            
-            # Priority 3: Start time (earliest first)
-            start_time = match.get('start_time', 'Z')
-            
-            return (live_priority, status_priority, start_time)
-        
-        matches.sort(key=sort_key)
-
-        os.makedirs(DATA_DIR, exist_ok=True)
-        with open(ALL_MATCHES_FILE, 'w', encoding='utf-8') as f:
-            json.dump(matches, f, indent=4, ensure_ascii=False)
-
-        logger.info(f"Saved {len(matches)} matches (sorted: live first, then by status and time).")
-        return matches
-
-    except Exception as e:
-        logger.error(f"Error fetching matches: {e}")
-        return []
+    """Refresh the match list from upstream now and return it"""
+    match_list.refresh()
+    return match_list.get() or []
@@ -0,0 +1,326 @@
+# app/services/match_model.py
+"""Compact in-memory model for organized live matches.
+
+An organized match used to be a tree of dicts: one per market, one per
+runner and two more per runner for back/lay, next to the parsed ``odds``
+blob that held the same prices again. Here a market is one ``MarketBook``
+whose runner prices live in two flat arrays, ids and names are interned so
+every tick shares the same string objects, and the raw ``odds``/``score``
+strings are kept as-is and only decoded when a dict is asked for.
+
+``to_dict()`` produces exactly the structure the API has always returned;
+``from_dict()`` rebuilds the model from it (follower workers, disk).
+Published objects are shared between snapshots and must not be mutated.
+"""
+import json
+import sys
+from array import array
+
+from app.services.response_cache import dumps
+
+CATEGORIES = ("bookmaker", "fancy", "sessions")
+# Every category a market can be classified into: matches always carry CATEGORIES,
+# "other" only when they have markets that fit none of them
+MARKET_CATEGORIES = CATEGORIES + ("other",)
+
+NAN = float("nan")
+# Marks markets outside the fancy category, which carry no market_condition key
+ABSENT = object()
+# Per runner: back price, lay price
+_PRICE_FIELDS = 2
+# Per runner: back volume, back exposed, lay volume, lay exposed
+_SIZE_FIELDS = 4
+
+
+def intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _price(value):
+    return None if value != value else value
+
+
+class MarketBook:
+    """One market: static catalogue data plus runner prices in flat arrays."""
+
+    __slots__ = ("market_id", "name", "status", "in_play", "condition", "runner_ids",
+                 "runner_names", "runner_status", "prices", "sizes", "fallback")
+
+    def __init__(self, market_id, name, status, in_play, condition=ABSENT, runner_ids=(),
+                 runner_names=(), runner_status=None, prices=None, sizes=None, fallback=None):
+        self.market_id = market_id
+        self.name = name
+        self.status = status
+        self.in_play = in_play
+        self.condition = condition
+        self.runner_ids = runner_ids
+        self.runner_names = runner_names
+        # None for catalogue-only markets, which list runners without prices
+        self.runner_status = runner_status
+        self.prices = prices
+        self.sizes = sizes
+        # Markets that arrive in an unexpected shape are kept as the original dict
+        self.fallback = fallback
+
+    @classmethod
+    def from_odds(cls, market_id, name, condition, odds, names):
+        """Build from a decoded ``odds_codec.MarketOdds`` and the catalogue's runner names"""
+        prices = array("d")
+        sizes = array("q")
+        for r in odds.runners:
+            prices.append(NAN if r.back_price is None else r.back_price)
+            prices.append(NAN if r.lay_price is None else r.lay_price)
+            sizes.extend((r.back_volume, r.back_exposed, r.lay_volume, r.lay_exposed))
+        return cls(
+            market_id, intern(name), intern(odds.status), odds.in_play, condition,
+            tuple(intern(r.id) for r in odds.runners),
+            tuple(intern(names.get(r.id, 'Unknown')) for r in odds.runners),
+            tuple(intern(r.status) for r in odds.runners),
+            prices, sizes,
+        )
+
+    @classmethod
+    def from_catalogue(cls, market_id, name, condition, status, in_play, runners):
+        """Market without odds: runner ids and names only"""
+        return cls(
+            market_id, intern(name), intern(status), in_play, condition,
+            tuple(intern(str(r.get('id'))) for r in runners),
+            tuple(intern(r.get('name')) for r in runners),
+        )
+
+    @classmethod
+    def from_dict(cls, market_id, entry):
+        condition = entry.get("market_condition", ABSENT)
+        runners = entry.get("runners") or []
+        try:
+            if all(r.keys() == {"id", "name"} for r in runners):
+                return cls.from_catalogue(market_id, entry.get("name"), condition,
+                                          entry.get("status"), entry.get("in_play"), runners)
+            prices = array("d")
+            sizes = array("q")
+            for r in runners:
+                back, lay = r["back"], r["lay"]
+                prices.append(NAN if back["price"] is None else back["price"])
+                prices.append(NAN if lay["price"] is None else lay["price"])
+                sizes.extend((back["volume"], back["exposed"], lay["volume"], lay["exposed"]))
+            return cls(
+                market_id, intern(entry.get("name")), intern(entry.get("status")), entry.get("in_play"), condition,
+                tuple(intern(r["id"]) for r in runners),
+                tuple(intern(r.get("name")) for r in runners),
+                tuple(intern(r["status"]) for r in runners),
+                prices, sizes,
+            )
+        except (KeyError, TypeError, OverflowError, AttributeError):
+            return cls.from_fallback(market_id, entry)
+
+    @classmethod
+    def from_fallback(cls, market_id, entry):
+        return cls(market_id, entry.get("name"), entry.get("status"), entry.get("in_play"), fallback=entry)
+
+    def __len__(self):
+        return len(self.runner_ids)
+
+    def __reduce__(self):
+        # Parse pool workers send books between processes: ABSENT is a
+        # per-process sentinel and strings come back un-interned
+        condition = self.condition
+        return (_unpickle_book, (
+            self.market_id, self.name, self.status, self.in_play, condition is not ABSENT,
+            None if condition is ABSENT else condition, self.runner_ids, self.runner_names,
+            self.runner_status, self.prices, self.sizes, self.fallback,
+        ))
+
+    def runner_dict(self, i):
+        if self.runner_status is None:
+            return {"id": self.runner_ids[i], "name": self.runner_names[i]}
+        p = i * _PRICE_FIELDS
+        s = i * _SIZE_FIELDS
+        sizes = self.sizes
+        return {
+            'id': self.runner_ids[i],
+            'status': self.runner_status[i],
+            'back': {'price': _price(self.prices[p]), 'volume': sizes[s], 'exposed': sizes[s + 1]},
+            'lay': {'price': _price(self.prices[p + 1]), 'volume': sizes[s + 2], 'exposed': sizes[s + 3]},
+            'name': self.runner_names[i],
+        }
+
+    def to_dict(self):
+        if self.fallback is not None:
+            return self.fallback
+        entry = {
+            "name": self.name,
+            "runners": [self.runner_dict(i) for i in range(len(self.runner_ids))],
+            "status": self.status,
+            "in_play": self.in_play,
+        }
+        if self.condition is not ABSENT:
+            entry["market_condition"] = self.condition
+        return entry
+
+    def _key(self):
+        # Price arrays are compared as bytes so NaN (no price) equals NaN
+        return (
+            self.name, self.status, self.in_play, self.condition, self.runner_ids, self.runner_names,
+            self.runner_status,
+            self.prices.tobytes() if self.prices is not None else None,
+            self.sizes.tobytes() if self.sizes is not None else None,
+            self.fallback,
+        )
+
+    def __eq__(self, other):
+        if not isinstance(other, MarketBook):
+            return NotImplemented
+        return self is other or self._key() == other._key()
+
+    __hash__ = None
+
+    def diff(self, prev):
+        """Changed fields and runners relative to ``prev`` (same market_id)"""
+        if self.fallback is not None or prev.fallback is not None:
+            new, old = self.to_dict(), prev.to_dict()
+            return {k: v for k, v in new.items() if old.get(k) != v}
+
+        changes = {}
+        if self.name != prev.name:
+            changes["name"] = self.name
+        if self.status != prev.status:
+            changes["status"] = self.status
+        if self.in_play != prev.in_play:
+            changes["in_play"] = self.in_play
+        if self.condition is not ABSENT and self.condition != prev.condition:
+            changes["market_condition"] = self.condition
+
+        prev_index = {rid: i for i, rid in enumerate(prev.runner_ids)}
+        changed_runners = []
+        for i, rid in enumerate(self.runner_ids):
+            j = prev_index.get(rid)
+            if j is None or not self._runner_equal(i, prev, j):
+                changed_runners.append(self.runner_dict(i))
+        if changed_runners:
+            changes["runners"] = changed_runners
+        current_ids = set(self.runner_ids)
+        removed = [rid for rid in prev.runner_ids if rid not in current_ids]
+        if removed:
+            changes["removed_runners"] = removed
+        return changes
+
+    def _runner_equal(self, i, other, j):
+        if self.runner_names[i] != other.runner_names[j]:
+            return False
+        if self.runner_status is None or other.runner_status is None:
+            return self.runner_status is other.runner_status
+        if self.runner_status[i] != other.runner_status[j]:
+            return False
+        p, q = i * _PRICE_FIELDS, j * _PRICE_FIELDS
+        s, t = i * _SIZE_FIELDS, j * _SIZE_FIELDS
+        return (self.prices[p:p + _PRICE_FIELDS].tobytes() == other.prices[q:q + _PRICE_FIELDS].tobytes()
+                and self.sizes[s:s + _SIZE_FIELDS] == other.sizes[t:t + _SIZE_FIELDS])
+
+
+def _unpickle_book(market_id, name, status, in_play, has_condition, condition, runner_ids, runner_names,
+                   runner_status, prices, sizes, fallback):
+    return MarketBook(
+        intern(market_id), intern(name), intern(status), in_play, condition if has_condition else ABSENT,
+        tuple(map(intern, runner_ids)), tuple(map(intern, runner_names)),
+        None if runner_status is None else tuple(map(intern, runner_status)),
+        prices, sizes, fallback,
+    )
+
+
+class LiveMatch:
+    """One organized live match.
+
+    ``markets`` maps category -> {market_id: MarketBook}. The upstream
+    ``odds`` and ``score`` strings are kept raw; ``odds``/``result`` decode
+    them on access.
+    """
+
+    __slots__ = ("match_id", "match_name", "markets", "odds_raw", "score_raw", "last_updated", "info", "_json")
+
+    def __init__(self, match_id, match_name, markets, odds_raw, score_raw, last_updated, info=None):
+        self.match_id = match_id
+        self.match_name = match_name
+        self.markets = markets
+        self.odds_raw = odds_raw
+        self.score_raw = score_raw
+        self.last_updated = last_updated
+        # Match list metadata: teams, competition, start_time, status
+        self.info = info
+        self._json = None
+
+    @staticmethod
+    def _decode(raw):
+        if not raw:
+            return {}
+        try:
+            return json.loads(raw) or {}
+        except (json.JSONDecodeError, TypeError):
+            return {}
+
+    @property
+    def odds(self):
+        return self._decode(self.odds_raw)
+
+    @property
+    def result(self):
+        return self._decode(self.score_raw)
+
+    def with_info(self, match_name, info):
+        """This match with match list metadata attached; a copy unless it already has it"""
+        if match_name == self.match_name and info == self.info:
+            return self
+        return LiveMatch(self.match_id, match_name, self.markets, self.odds_raw, self.score_raw,
+                         self.last_updated, info)
+
+    def iter_markets(self, categories=CATEGORIES):
+        for category in categories:
+            yield from (self.markets.get(category) or {}).values()
+
+    def fingerprint(self):
+        """Hashable value that changes whenever any market's prices or status change"""
+        return hash((
+            self.odds_raw, self.score_raw,
+            tuple((b.market_id, b.status, b.in_play) for b in self.iter_markets()),
+        ))
+
+    def to_dict(self, categories=None, include_odds=True):
+        """Materialize the API structure, optionally restricted to some categories"""
+        data = {"match_id": self.match_id, "match_name": self.match_name}
+        for category, books in self.markets.items():
+            if categories is None or category in categories:
+                data[category] = {mid: book.to_dict() for mid, book in books.items()}
+        data["result"] = self.result
+        if include_odds:
+            data["odds"] = self.odds
+        data["last_updated"] = self.last_updated
+        if self.info:
+            data.update(self.info)
+        return data
+
+    def to_json(self):
+        """``to_dict()`` as compact JSON bytes, encoded once per match object"""
+        if self._json is None:
+            self._json = dumps(self.to_dict())
+        return self._json
+
+    @classmethod
+    def from_dict(cls, data):
+        markets = {c: {} for c in CATEGORIES}
+        info = {}
+        for key, value in data.items():
+            if key in ("match_id", "match_name", "result", "odds", "last_updated"):
+                continue
+            if isinstance(value, dict) and key in MARKET_CATEGORIES:
+                markets[key] = {intern(mid): MarketBook.from_dict(intern(mid), entry) for mid, entry in value.items()}
+            else:
+                info[key] = value
+        compact = (",", ":")
+        return cls(
+            data.get("match_id"),
+            data.get("match_name"),
+            markets,
+            json.dumps(data["odds"], separators=compact) if data.get("odds") else "",
+            json.dumps(data["result"], separators=compact) if data.get("result") else "",
+            data.get("last_updated"),
+            info or None,
+        )
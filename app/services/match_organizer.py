@@ -0,0 +1,155 @@
+# app/services/match_organizer.py
+"""Decode and organize event detail payloads into ``LiveMatch`` objects.
+
+Kept apart from ``live_match_service`` (and free of its singletons) so parse
+pool worker processes can import it cheaply; see ``parse_pool``.
+"""
+import json
+from datetime import datetime
+
+from app.core.logger import get_logger
+from app.services.catalogue_registry import catalogue_registry
+from app.services.match_model import LiveMatch, MarketBook, intern
+from app.services.metrics import EVENT_CATALOGUES, EVENT_MARKETS, MARKET_BOOKS
+from app.services.odds_codec import MarketOdds, parse_market
+
+logger = get_logger("match_organizer")
+
+_BOOKS_REUSED = MARKET_BOOKS.labels("reused")
+_BOOKS_BUILT = MARKET_BOOKS.labels("built")
+
+
+class PayloadError(ValueError):
+    """Event detail body that cannot be organized; retrying will not fix it"""
+
+
+def decode_event(body, event_id, cache=None, registry=catalogue_registry):
+    """``(LiveMatch, stats)`` for an event detail response body, or None when upstream has no detailed data
+
+    ``stats`` is what ``observe_organized`` records. Raises ``PayloadError``
+    for bodies that are not a valid event detail.
+    """
+    try:
+        data = json.loads(body)
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        raise PayloadError(f"JSON decode error: {e}")
+    if not isinstance(data, dict):
+        raise PayloadError("Invalid JSON structure")
+    if not data.get('event'):
+        return None
+    try:
+        return _organize(data, event_id, cache, registry)
+    except (AttributeError, TypeError, KeyError) as e:
+        raise PayloadError(f"Invalid data structure: {e}")
+
+
+def observe_organized(stats):
+    catalogues, markets, reused = stats
+    EVENT_CATALOGUES.observe(catalogues)
+    EVENT_MARKETS.observe(markets)
+    _BOOKS_REUSED.inc(reused)
+    _BOOKS_BUILT.inc(markets - reused)
+
+
+def organize_match(data, event_id, cache=None, registry=catalogue_registry):
+    """Organize a raw event detail payload into a compact LiveMatch (bookmaker/fancy/sessions markets)
+
+    Static catalogue data (category, names, runner names) comes from the
+    sport's catalogue registry. With an ``EventCacheEntry``, markets whose raw odds and
+    catalogue did not change since the previous call reuse their previous MarketBook.
+    """
+    organized, stats = _organize(data, event_id, cache, registry)
+    observe_organized(stats)
+    return organized
+
+
+def _organize(data, event_id, cache, registry):
+    # Odds and score stay as the raw upstream strings; only odds is decoded here
+    odds_raw = data.get('odds') if isinstance(data.get('odds'), str) else ''
+    score_raw = data.get('score') if isinstance(data.get('score'), str) else ''
+    if cache is not None and odds_raw == cache.odds_raw:
+        odds_data = cache.odds_data
+    else:
+        try:
+            odds_data = json.loads(odds_raw) if odds_raw else {}
+        except (json.JSONDecodeError, TypeError):
+            odds_data = {}
+    previous_books = cache.books if cache is not None else {}
+    books = {}
+    reused = 0
+
+    markets = {"bookmaker": {}, "fancy": {}, "sessions": {}}
+    organized = LiveMatch(
+        match_id=data.get('event', {}).get('id', event_id),
+        match_name=data.get('event', {}).get('name', 'Unknown Match'),
+        markets=markets,
+        odds_raw=odds_raw,
+        score_raw=score_raw,
+        last_updated=datetime.now().isoformat()
+    )
+
+    # Process catalogues (markets) with error handling
+    catalogues = data.get('catalogues', [])
+    logger.info("Found %s catalogues for event %s", len(catalogues), event_id)
+
+    for cat in catalogues:
+        try:
+            market_id = intern(str(cat.get('marketId', '')))
+            catalogue = registry.lookup(event_id, market_id, cat)
+            category = catalogue.category
+
+            # Ensure the category key exists in the markets dict
+            if category not in markets:
+                markets[category] = {}
+
+            # Compact encoded string for this market, if odds_data has one
+            raw = None
+            if odds_data and isinstance(odds_data, dict):
+                raw = odds_data.get(market_id) or odds_data.get(int(market_id))
+
+            # Catalogue status, used when the market has no decodable odds
+            state = (cat.get('status', 'ACTIVE'), cat.get('inPlay', False))
+            previous = previous_books.get(market_id)
+            if previous is not None and previous[0] is catalogue and previous[1] == raw and previous[2] == state:
+                book = previous[3]
+                reused += 1
+            else:
+                book = _build_market_book(catalogue, state, raw)
+            books[market_id] = (catalogue, raw, state, book)
+            markets[category][market_id] = book
+        except Exception as e:
+            logger.warning("Error processing catalogue for event %s: %s", event_id, e)
+            continue
+
+    if cache is not None:
+        cache.odds_raw = odds_raw
+        cache.odds_data = odds_data
+        cache.books = books
+    return organized, (len(catalogues), len(books), reused)
+
+
+def _build_market_book(catalogue, state, raw):
+    """Merge a market's raw odds into its cached catalogue data"""
+    market_status, market_inplay = state
+    parsed_market = parse_market(raw) if raw else None
+
+    if isinstance(parsed_market, MarketOdds):
+        return MarketBook.from_odds(catalogue.market_id, catalogue.name, catalogue.condition,
+                                    parsed_market, catalogue.names_by_id)
+    if parsed_market and isinstance(parsed_market, dict):
+        # JSON-encoded market: attach runner names when ids match
+        for r in parsed_market.get('runners', []):
+            r['name'] = catalogue.names_by_id.get(str(r.get('id')), r.get('name', 'Unknown'))
+
+        market_entry = {
+            "name": catalogue.name,
+            "runners": parsed_market.get('runners', []),
+            "status": parsed_market.get('status', market_status),
+            "in_play": parsed_market.get('in_play', market_inplay)
+        }
+        if catalogue.category == 'fancy':
+            market_entry["market_condition"] = catalogue.condition
+        return MarketBook.from_fallback(catalogue.market_id, market_entry)
+    # No odds: runners from the catalogue, without prices
+    return MarketBook(catalogue.market_id, catalogue.name, intern(market_status), market_inplay,
+                      catalogue.condition, catalogue.runner_ids, catalogue.runner_names)
@@ -0,0 +1,265 @@
+# app/services/metrics.py
+"""Prometheus metrics for the scrape pipeline, without a client library.
+
+Counters and histograms are plain objects updated in place on the hot path
+(a dict lookup and an add, no locks: concurrent updates from the engine and
+scheduler threads are best-effort). Gauges are read from callbacks when
+``GET /metrics`` renders the text exposition format.
+
+Only the scraping leader fetches upstream, so it also exports its metrics to
+``METRICS_FILE``; follower workers serve that file instead of their own
+(mostly idle) counters.
+"""
+import os
+import threading
+import time
+from bisect import bisect_left
+
+from app.core.config import METRICS_FILE
+from app.core.logger import dropped_records, get_logger
+
+logger = get_logger("metrics")
+
+PREFIX = "cricket_"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Upper bounds of the default latency buckets (seconds)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+COUNT_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_histogram(lines, name, bounds, counts, total, labels=""):
+    """Append histogram sample lines; ``counts`` are cumulative per bound, then +Inf"""
+    inner = labels[1:-1] + "," if labels else ""
+    for bound, count in zip(bounds, counts):
+        lines.append(f'{name}_bucket{{{inner}le="{_number(float(bound))}"}} {count}')
+    lines.append(f'{name}_bucket{{{inner}le="+Inf"}} {counts[-1]}')
+    lines.append(f"{name}_sum{labels} {_number(float(total))}")
+    lines.append(f"{name}_count{labels} {counts[-1]}")
+
+
+class _Metric:
+    type = None
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = PREFIX + name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        registry.register(self)
+
+    def labels(self, *values):
+        child = self._children.get(values)
+        if child is None:
+            child = self._children[values] = self._new_child()
+        return child
+
+    def render(self, lines):
+        lines.append(f"# HELP {self.name} {self.help}")
+        lines.append(f"# TYPE {self.name} {self.type}")
+        for values, child in list(self._children.items()):
+            child.render(lines, self.name, _labels(self.labelnames, values))
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+    def render(self, lines, name, labels):
+        lines.append(f"{name}{labels} {_number(self.value)}")
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def __init__(self, name, help, labelnames=()):
+        super().__init__(name, help, labelnames)
+        if not self.labelnames:
+            self._default = self.labels()
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount=1):
+        self._default.value += amount
+
+    @property
+    def value(self):
+        return self._default.value
+
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        # Per bucket (not cumulative) so an observation is a single add
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    def render(self, lines, name, labels):
+        cumulative, running = [], 0
+        for count in self.counts:
+            running += count
+            cumulative.append(running)
+        render_histogram(lines, name, self.bounds, cumulative, self.sum, labels)
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name, help, buckets=LATENCY_BUCKETS, labelnames=()):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, help, labelnames)
+        if not self.labelnames:
+            self._default = self.labels()
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value):
+        self._default.observe(value)
+
+    @property
+    def count(self):
+        return sum(self._default.counts)
+
+    @property
+    def sum(self):
+        return self._default.sum
+
+
+class Gauge(_Metric):
+    """Value read from ``fn()`` at render time: a number, or ``{label values tuple: number}``"""
+    type = "gauge"
+
+    def __init__(self, name, help, fn, labelnames=()):
+        self.fn = fn
+        super().__init__(name, help, labelnames)
+
+    def render(self, lines):
+        try:
+            value = self.fn()
+        except Exception as e:
+            logger.warning("Error reading metric %s: %s", self.name, e)
+            return
+        if value is None:
+            return
+        lines.append(f"# HELP {self.name} {self.help}")
+        lines.append(f"# TYPE {self.name} {self.type}")
+        if isinstance(value, dict):
+            for values, v in value.items():
+                lines.append(f"{self.name}{_labels(self.labelnames, values)} {_number(v)}")
+        else:
+            lines.append(f"{self.name} {_number(value)}")
+
+
+class Registry:
+    def __init__(self, path):
+        self.path = path
+        self._metrics = []
+        self._export_lock = threading.Lock()
+
+    def register(self, metric):
+        self._metrics.append(metric)
+
+    def render(self):
+        lines = []
+        for metric in list(self._metrics):
+            metric.render(lines)
+        return "\n".join(lines) + "\n"
+
+    def export(self):
+        """Leader: write the current metrics for follower workers to serve"""
+        with self._export_lock:
+            body = f"# Exported by scraping leader pid {os.getpid()} at {int(time.time())}\n" + self.render()
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(body)
+            os.replace(tmp_path, self.path)
+
+    def read_export(self):
+        """Follower: the leader's last export, or None"""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return f.read()
+        except OSError:
+            return None
+
+
+registry = Registry(METRICS_FILE)
+
+# --- Scrape pipeline metrics ---
+
+UPSTREAM_REQUEST_SECONDS = Histogram(
+    "upstream_request_seconds", "Duration of single upstream HTTP requests", labelnames=("host", "egress"))
+UPSTREAM_RESPONSES = Counter(
+    "upstream_responses_total", "Upstream HTTP responses by status code", labelnames=("status",))
+UPSTREAM_ERRORS = Counter(
+    "upstream_errors_total", "Upstream requests that failed without a response", labelnames=("reason",))
+UPSTREAM_RETRIES = Counter("upstream_retries_total", "Upstream request retries")
+CIRCUIT_REJECTED = Counter("circuit_rejected_total", "Upstream requests refused by an open host circuit breaker")
+
+EVENT_FETCH_SECONDS = Histogram(
+    "event_fetch_seconds", "Time to fetch one event detail, including rate limiting and retries")
+EVENT_PARSE_SECONDS = Histogram(
+    "event_parse_seconds", "Time to decode and organize one event detail payload (including the parse pool round trip)",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0))
+EVENT_PARSES = Counter(
+    "event_parses_total", "Event detail payloads decoded and organized, by where (inline, pool)",
+    labelnames=("mode",))
+EVENT_CATALOGUES = Histogram("event_catalogues", "Catalogues per parsed event detail", buckets=COUNT_BUCKETS)
+EVENT_MARKETS = Histogram("event_markets", "Markets organized per parsed event detail", buckets=COUNT_BUCKETS)
+EVENT_RESPONSES = Counter(
+    "event_responses_total",
+    "Event detail fetches by outcome (parsed, not_modified, unchanged_body, unavailable, failed)",
+    labelnames=("result",))
+MARKET_BOOKS = Counter(
+    "market_books_total", "Markets organized, by whether the previous MarketBook was reused",
+    labelnames=("result",))
+
+LIVE_CYCLE_SECONDS = Histogram("live_cycle_seconds", "Duration of a full update_live_matches() cycle")
+SCHEDULER_TICK_SECONDS = Histogram("scheduler_tick_seconds", "Duration of a per-event scheduler tick")
+SCHEDULER_LAG_SECONDS = Histogram(
+    "scheduler_lag_seconds", "How late events are dispatched after they became due",
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0))
+SCHEDULER_MISSED_RUNS = Counter(
+    "scheduler_missed_runs_total", "Scheduled job runs skipped because they were late or still running",
+    labelnames=("job",))
+
+# --- Webhook ---
+
+WEBHOOK_PUSH_SECONDS = Histogram(
+    "webhook_push_seconds", "Duration of webhook POST attempts", buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0))
+WEBHOOK_QUEUED = Counter("webhook_updates_queued_total", "Live match updates queued for the webhook")
+WEBHOOK_PUSHED = Counter("webhook_updates_pushed_total", "Live match updates delivered to the webhook")
+WEBHOOK_BATCHES = Counter("webhook_batches_total", "Webhook POSTs delivered")
+WEBHOOK_FAILED = Counter("webhook_updates_failed_total", "Live match updates given up on after retries")
+WEBHOOK_DROPPED = Counter("webhook_updates_dropped_total", "Live match updates dropped from a full queue")
+WEBHOOK_RETRIES = Counter("webhook_retries_total", "Webhook POST retries")
+
+Gauge("log_records_dropped", "Log records dropped because the log queue was full", dropped_records)
@@ -0,0 +1,326 @@
+# app/services/odds_history.py
+"""Append-only tick history of runner prices, for replay and analytics.
+
+The snapshot store listener only queues ``(timestamp, match)`` for matches
+that changed; the leader's history job turns them into ticks off the scrape
+path. The queue is bounded: if the job falls behind, the oldest entries are
+dropped (``odds_history_dropped_total``). A tick is recorded for a runner only when its back/lay price or volume
+moved, and markets whose ``MarketBook`` object was reused are skipped
+without looking at their runners.
+
+Layout: ``HISTORY_DIR/<match_id>/<first tick ms>.seg``. Each flush appends
+one block per match to its current segment:
+
+    header (magic, rows, min ts, max ts, keys length, payload length)
+    keys     JSON list of [category, market_id, runner_id], one per series
+    payload  zlib of the columns: series index (u32), timestamp ms, back and
+             lay price x PRICE_SCALE (delta-encoded i64), back and lay
+             volume (i64); a price of 0 means no price
+
+Segments roll over by size or age and are deleted after the retention
+period. Reads memory-map each segment and only decompress blocks whose time
+range and series match the query.
+"""
+import itertools
+import json
+import mmap
+import os
+import re
+import shutil
+import struct
+import threading
+import time
+import zlib
+from array import array
+from collections import deque
+
+from app.core.config import HISTORY_DIR
+from app.core.logger import get_logger
+from app.core.settings import settings
+from app.services.metrics import Counter
+from app.services.response_cache import dumps
+
+logger = get_logger("odds_history")
+
+MAGIC = b"OHB1"
+BLOCK = struct.Struct("<4sIqqII")
+PRICE_SCALE = 1000
+# Delta-encoded i64 columns after the u32 series index
+_DELTA_COLUMNS = ("t", "back", "lay")
+_PLAIN_COLUMNS = ("back_volume", "lay_volume")
+# Used with fullmatch: "$" would also accept a trailing newline
+_SAFE_ID = re.compile(r"[\w-][\w.-]*")
+
+HISTORY_DROPPED = Counter("odds_history_dropped_total",
+                          "Changed matches dropped from the history queue because the history job fell behind")
+
+
+def _scale(price):
+    # NaN (no price) -> 0
+    return int(round(price * PRICE_SCALE)) if price == price else 0
+
+
+def _unscale(value):
+    return value / PRICE_SCALE if value else None
+
+
+def _delta_encode(values):
+    encoded = array("q", values)
+    for i in range(len(encoded) - 1, 0, -1):
+        encoded[i] -= encoded[i - 1]
+    return encoded
+
+
+def downsample_ohlc(timestamps, prices, interval_ms):
+    """``[[bucket start ms, open, high, low, close], ...]`` ignoring ticks without a price"""
+    candles = []
+    current = None
+    for t, price in zip(timestamps, prices):
+        if price is None:
+            continue
+        bucket = t - t % interval_ms
+        if current is None or current[0] != bucket:
+            current = [bucket, price, price, price, price]
+            candles.append(current)
+        else:
+            current[2] = max(current[2], price)
+            current[3] = min(current[3], price)
+            current[4] = price
+    return candles
+
+
+class OddsHistory:
+    def __init__(self, root, segment_bytes, segment_seconds, retention, max_pending):
+        self.root = root
+        self.segment_bytes = segment_bytes
+        self.segment_ms = int(segment_seconds * 1000)
+        self.retention = retention
+        self.enabled = False
+        # (timestamp ms, match_id, LiveMatch); the oldest are dropped when full
+        self._pending = deque(maxlen=max_pending)
+        # Ids of matches that left the live list (at most one entry per removal)
+        self._removed = deque()
+        # match_id -> {(category, market_id, runner_id): last recorded values}
+        self._last = {}
+        # (match_id, market_id) -> last MarketBook recorded
+        self._books = {}
+        # match_id -> (segment path, first tick ms)
+        self._segments = {}
+        self._last_retention = 0.0
+        self._flush_lock = threading.Lock()
+
+    def start(self):
+        """Start recording (leader only)"""
+        self.enabled = True
+
+    def on_snapshot(self, snapshot, deltas):
+        """Snapshot store listener: queue the matches that changed in this version"""
+        if not self.enabled:
+            return
+        now_ms = int(time.time() * 1000)
+        pending = self._pending
+        for delta in deltas:
+            match_id = str(delta["match_id"])
+            match = snapshot.by_id.get(match_id)
+            if match is None:
+                self._removed.append(match_id)
+                continue
+            if len(pending) == pending.maxlen:
+                HISTORY_DROPPED.inc()
+            pending.append((now_ms, match_id, match))
+
+    # --- Writing ---
+
+    def flush(self):
+        """Write the queued ticks; returns the number of rows written"""
+        with self._flush_lock:
+            rows = {}
+            while self._pending:
+                t, match_id, match = self._pending.popleft()
+                self._collect(t, match_id, match, rows.setdefault(match_id, []))
+
+            written = 0
+            for match_id, match_rows in rows.items():
+                if match_rows:
+                    try:
+                        self._append_block(match_id, match_rows)
+                        written += len(match_rows)
+                    except (OSError, ValueError) as e:
+                        logger.error("Error writing odds history for %s: %s", match_id, e)
+            # After writing: ticks queued before a match left still belong to it
+            while self._removed:
+                self._forget(self._removed.popleft())
+
+            if time.monotonic() - self._last_retention > 600:
+                self._last_retention = time.monotonic()
+                self.apply_retention()
+            return written
+
+    def _forget(self, match_id):
+        self._last.pop(match_id, None)
+        self._segments.pop(match_id, None)
+        for key in [k for k in self._books if k[0] == match_id]:
+            del self._books[key]
+
+    def _collect(self, t, match_id, match, out):
+        last = self._last.setdefault(match_id, {})
+        for category, books in match.markets.items():
+            for market_id, book in books.items():
+                key = (match_id, market_id)
+                if self._books.get(key) is book:
+                    continue
+                self._books[key] = book
+                # Catalogue-only and unparsed markets carry no price arrays
+                if book.runner_status is None or book.fallback is not None:
+                    continue
+                prices, sizes = book.prices, book.sizes
+                for i, runner_id in enumerate(book.runner_ids):
+                    values = (_scale(prices[2 * i]), _scale(prices[2 * i + 1]), sizes[4 * i], sizes[4 * i + 2])
+                    series = (category, market_id, runner_id)
+                    if last.get(series) != values:
+                        last[series] = values
+                        out.append((series, t) + values)
+
+    def _segment_for(self, match_id, t):
+        current = self._segments.get(match_id)
+        if current is None:
+            # Upstream ids become directory names; never let one leave HISTORY_DIR
+            if not _SAFE_ID.fullmatch(match_id):
+                raise ValueError(f"Invalid match id: {match_id!r}")
+            directory = os.path.join(self.root, match_id)
+            os.makedirs(directory, exist_ok=True)
+            existing = sorted((n for n in os.listdir(directory) if n.endswith(".seg")), key=lambda n: int(n[:-4]))
+            if existing:
+                current = (os.path.join(directory, existing[-1]), int(existing[-1][:-4]))
+        if current is not None:
+            path, start = current
+            try:
+                full = os.path.getsize(path) >= self.segment_bytes
+            except OSError:
+                full = True
+            if full or t - start >= self.segment_ms:
+                current = None
+        if current is None:
+            current = (os.path.join(self.root, match_id, f"{t}.seg"), t)
+        self._segments[match_id] = current
+        return current[0]
+
+    def _append_block(self, match_id, rows):
+        index = {}
+        for row in rows:
+            index.setdefault(row[0], len(index))
+        keys = dumps([list(k) for k in index])
+        columns = [array("I", (index[r[0]] for r in rows))]
+        columns.extend(_delta_encode(r[1 + i] for r in rows) for i in range(len(_DELTA_COLUMNS)))
+        columns.extend(array("q", (r[4 + i] for r in rows)) for i in range(len(_PLAIN_COLUMNS)))
+        payload = zlib.compress(b"".join(c.tobytes() for c in columns), 1)
+        header = BLOCK.pack(MAGIC, len(rows), rows[0][1], rows[-1][1], len(keys), len(payload))
+        with open(self._segment_for(match_id, rows[0][1]), "ab") as f:
+            f.write(header + keys + payload)
+
+    def apply_retention(self):
+        """Delete segments last written before the retention period, and empty match folders"""
+        if not os.path.isdir(self.root):
+            return
+        cutoff = time.time() - self.retention
+        for match_id in os.listdir(self.root):
+            directory = os.path.join(self.root, match_id)
+            try:
+                names = os.listdir(directory)
+                for name in names:
+                    path = os.path.join(directory, name)
+                    if os.path.getmtime(path) < cutoff:
+                        os.remove(path)
+                if not os.listdir(directory) and match_id not in self._last:
+                    shutil.rmtree(directory, ignore_errors=True)
+            except OSError as e:
+                logger.warning("Error applying odds history retention to %s: %s", directory, e)
+
+    # --- Reading ---
+
+    def query(self, match_id, market_id=None, runner_id=None, start=None, end=None):
+        """Ticks per runner between ``start`` and ``end`` (epoch ms, inclusive), oldest first"""
+        match_id = str(match_id)
+        if not _SAFE_ID.fullmatch(match_id):
+            raise ValueError(f"Invalid match id: {match_id}")
+        directory = os.path.join(self.root, match_id)
+        try:
+            names = sorted((n for n in os.listdir(directory) if n.endswith(".seg")), key=lambda n: int(n[:-4]))
+        except FileNotFoundError:
+            return []
+
+        series = {}
+        for name in names:
+            if end is not None and int(name[:-4]) > end:
+                break
+            self._scan(os.path.join(directory, name), series, market_id, runner_id, start, end)
+        return list(series.values())
+
+    def _scan(self, path, series, market_id, runner_id, start, end):
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < BLOCK.size:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                offset = 0
+                while offset + BLOCK.size <= size:
+                    magic, rows, min_t, max_t, keys_len, payload_len = BLOCK.unpack_from(mm, offset)
+                    if magic != MAGIC:
+                        logger.warning("Corrupt odds history block in %s at %s", path, offset)
+                        return
+                    keys_at = offset + BLOCK.size
+                    payload_at = keys_at + keys_len
+                    offset = payload_at + payload_len
+                    if offset > size:
+                        # Block still being written
+                        return
+                    if (start is not None and max_t < start) or (end is not None and min_t > end):
+                        continue
+                    keys = json.loads(mm[keys_at:payload_at])
+                    wanted = {
+                        i for i, (_, mid, rid) in enumerate(keys)
+                        if (market_id is None or mid == market_id) and (runner_id is None or rid == runner_id)
+                    }
+                    if wanted:
+                        self._decode_block(mm[payload_at:offset], rows, keys, wanted, series, start, end)
+
+    @staticmethod
+    def _decode_block(payload, rows, keys, wanted, series, start, end):
+        raw = zlib.decompress(payload)
+        index = array("I")
+        index.frombytes(raw[:4 * rows])
+        columns = []
+        offset = 4 * rows
+        for i in range(len(_DELTA_COLUMNS) + len(_PLAIN_COLUMNS)):
+            column = array("q")
+            column.frombytes(raw[offset:offset + 8 * rows])
+            offset += 8 * rows
+            columns.append(list(itertools.accumulate(column)) if i < len(_DELTA_COLUMNS) else column)
+        ts, back, lay, back_volume, lay_volume = columns
+
+        for row in range(rows):
+            i = index[row]
+            t = ts[row]
+            if i not in wanted or (start is not None and t < start) or (end is not None and t > end):
+                continue
+            category, mid, rid = keys[i]
+            entry = series.get((mid, rid))
+            if entry is None:
+                entry = series[(mid, rid)] = {
+                    "category": category, "market_id": mid, "runner_id": rid,
+                    "t": [], "back": [], "lay": [], "back_volume": [], "lay_volume": [],
+                }
+            entry["t"].append(t)
+            entry["back"].append(_unscale(back[row]))
+            entry["lay"].append(_unscale(lay[row]))
+            entry["back_volume"].append(back_volume[row])
+            entry["lay_volume"].append(lay_volume[row])
+
+
+odds_history = OddsHistory(
+    HISTORY_DIR,
+    segment_bytes=settings.HISTORY_SEGMENT_BYTES,
+    segment_seconds=settings.HISTORY_SEGMENT_SECONDS,
+    retention=settings.HISTORY_RETENTION,
+    max_pending=settings.HISTORY_MAX_PENDING,
+)
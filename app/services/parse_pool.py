@@ -0,0 +1,183 @@
+# app/services/parse_pool.py
+"""Decode and organize large event detail payloads in worker processes.
+
+Decoding a big in-play event (the detail JSON, then its embedded ``odds``
+string) and organizing it is pure CPU work that holds the GIL on the scrape
+engine thread, so API requests served by the same process wait behind it.
+With ``PARSE_WORKERS`` > 0, ``ParsePool.decode`` ships the raw body bytes
+to a worker process instead and gets the organized ``LiveMatch`` back
+(pickled compactly: arrays and interned tuples).
+
+It is adaptive: the pool keeps a moving average of parse time per body
+byte and only offloads bodies whose estimated parse time reaches
+``PARSE_OFFLOAD_SECONDS``; small payloads stay inline, where a round trip
+would cost more than the parse.
+
+Each event is pinned to one worker (a single-process executor per worker),
+so that worker's own event cache and catalogue registry stay warm and
+unchanged markets still reuse their previous ``MarketBook`` there. Those
+are not sent back: the scrape process already holds them in the event's
+previous match, so only changed markets cross the process boundary.
+"""
+import asyncio
+import multiprocessing
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from app.core.logger import get_logger
+from app.core.settings import settings
+from app.services.catalogue_registry import CatalogueRegistry
+from app.services.event_cache import EventCacheEntry, body_hash
+from app.services.match_organizer import decode_event
+from app.services.metrics import EVENT_PARSES, Gauge
+
+logger = get_logger("parse_pool")
+
+# Starting estimate of inline parse time per body byte (~20 MB/s)
+INITIAL_SECONDS_PER_BYTE = 5e-8
+# Weight of the newest parse in the moving average
+ALPHA = 0.1
+# Events whose cache entry each worker keeps (least recently parsed dropped first)
+WORKER_CACHED_EVENTS = 256
+
+_INLINE = EVENT_PARSES.labels("inline")
+_POOL = EVENT_PARSES.labels("pool")
+
+# --- Worker process side ---
+
+_worker_entries = OrderedDict()
+_worker_registries = {}
+
+
+def _decode_in_worker(body, event_id, sport, previous_hash):
+    """``(decode_event result, parse seconds)`` using this worker's cache for the event
+
+    When ``previous_hash`` is the body this worker organized last for the
+    event, the scrape process holds the same books, so unchanged ones are
+    sent as None (see ``_restore_unchanged``).
+    """
+    registry = _worker_registries.get(sport)
+    if registry is None:
+        registry = _worker_registries[sport] = CatalogueRegistry()
+    key = (sport, str(event_id))
+    entry = _worker_entries.get(key)
+    if entry is None:
+        entry = _worker_entries[key] = EventCacheEntry()
+        if len(_worker_entries) > WORKER_CACHED_EVENTS:
+            (old_sport, old_event), _ = _worker_entries.popitem(last=False)
+            _worker_registries[old_sport].discard([old_event])
+    else:
+        _worker_entries.move_to_end(key)
+    shared = previous_hash is not None and previous_hash == entry.body_hash
+    previous_books = {mid: built[3] for mid, built in entry.books.items()} if shared else {}
+    start = time.perf_counter()
+    entry.body_hash = None
+    result = decode_event(body, event_id, entry, registry)
+    if result is not None:
+        entry.body_hash = body_hash(body)
+        for books in result[0].markets.values():
+            for mid, book in books.items():
+                if book is previous_books.get(mid):
+                    books[mid] = None
+    return result, time.perf_counter() - start
+
+
+def _restore_unchanged(match, previous):
+    """Put the previous match's books back where the worker sent None; False if one is missing"""
+    for category, books in match.markets.items():
+        old = (previous.markets.get(category) or {}) if previous is not None else {}
+        for mid, book in books.items():
+            if book is None:
+                book = books[mid] = old.get(mid)
+                if book is None:
+                    return False
+    return True
+
+
+# --- Scrape process side ---
+
+class ParsePool:
+    def __init__(self, workers, offload_seconds):
+        self.workers = max(0, workers)
+        self.offload_seconds = offload_seconds
+        self.seconds_per_byte = INITIAL_SECONDS_PER_BYTE
+        self.pending = 0
+        self._executors = [None] * self.workers
+        self._lock = threading.Lock()
+
+    def should_offload(self, size):
+        return self.workers > 0 and size * self.seconds_per_byte >= self.offload_seconds
+
+    def observe(self, size, seconds):
+        if size:
+            self.seconds_per_byte += ALPHA * (seconds / size - self.seconds_per_byte)
+
+    def _executor(self, slot):
+        with self._lock:
+            executor = self._executors[slot]
+            if executor is None:
+                # spawn: the scrape process runs threads, which fork would copy mid-lock
+                executor = self._executors[slot] = ProcessPoolExecutor(
+                    max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+            return executor
+
+    def _reset(self, slot, executor):
+        with self._lock:
+            if self._executors[slot] is executor:
+                self._executors[slot] = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    async def decode(self, body, event_id, sport, cache, registry):
+        """``decode_event`` for a response body, in the event's worker when it is large enough
+
+        ``cache`` is the event's entry (its last organized match and body
+        hash); it and ``registry`` are also what inline parses use. Raises
+        ``PayloadError`` like ``decode_event``.
+        """
+        size = len(body)
+        if self.should_offload(size):
+            slot = zlib.crc32(str(event_id).encode()) % self.workers
+            executor = self._executor(slot)
+            self.pending += 1
+            previous = cache.match
+            try:
+                result, seconds = await asyncio.get_running_loop().run_in_executor(
+                    executor, _decode_in_worker, body, event_id, sport,
+                    cache.body_hash if previous is not None else None)
+            except BrokenProcessPool:
+                # The worker died (e.g. killed for memory): parse inline, start a new one next time
+                logger.warning("Parse worker %s stopped; parsing event %s inline", slot, event_id)
+                self._reset(slot, executor)
+            else:
+                self.observe(size, seconds)
+                if result is None or _restore_unchanged(result[0], previous):
+                    _POOL.inc()
+                    return result
+                logger.warning("Parse worker %s referred to books event %s does not have; parsing inline",
+                               slot, event_id)
+            finally:
+                self.pending -= 1
+        start = time.perf_counter()
+        result = decode_event(body, event_id, cache, registry)
+        self.observe(size, time.perf_counter() - start)
+        _INLINE.inc()
+        return result
+
+    def close(self):
+        with self._lock:
+            executors, self._executors = self._executors, [None] * self.workers
+        for executor in executors:
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+
+parse_pool = ParsePool(settings.PARSE_WORKERS, settings.PARSE_OFFLOAD_SECONDS)
+
+Gauge("parse_pool_pending", "Event detail payloads sent to parse workers and not returned yet",
+      lambda: parse_pool.pending if parse_pool.workers else None)
+Gauge("parse_seconds_per_byte", "Moving average of event detail parse time per body byte",
+      lambda: parse_pool.seconds_per_byte if parse_pool.workers else None)
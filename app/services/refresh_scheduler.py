@@ -0,0 +1,223 @@
+# app/services/refresh_scheduler.py
+"""Per-event refresh scheduling with adaptive intervals.
+
+Instead of rescraping every live event as one batch, each event has its own
+next-due time in a priority queue. ``tick()`` is cheap and non-blocking: it
+dispatches the events that are due to the scrape engine and returns. When a
+fetch completes, the event's interval adapts to how much its odds moved:
+
+- in-play events whose odds changed are refreshed faster (down to ``min_interval``)
+- events whose odds did not change back off gradually
+- suspended events drop to ``max_interval``
+- failures back off exponentially; repeated failures open the event's
+  circuit breaker, after which one probe is sent per cooldown
+- events upstream has no data for (``EventUnavailable``) are quarantined
+  until the match list changes or ``quarantine`` seconds pass
+- while the upstream host's breaker is open (``CircuitOpenError``) or the
+  host throttles us (``HostThrottledError`` on 429/403) events simply wait
+  for it, keeping their data and without counting a failure
+"""
+import heapq
+import itertools
+import threading
+import time
+
+from app.core.logger import get_logger
+from app.services.circuit_breaker import CLOSED, OPEN, CircuitBreaker, CircuitOpenError, EventUnavailable
+from app.services.metrics import SCHEDULER_LAG_SECONDS
+
+logger = get_logger("refresh_scheduler")
+
+
+class EventState:
+    __slots__ = ("event_id", "match_info", "interval", "due", "fingerprint", "in_flight", "failures",
+                 "breaker", "quarantined")
+
+    def __init__(self, event_id, match_info, interval, breaker):
+        self.event_id = event_id
+        self.match_info = match_info
+        self.interval = interval
+        self.due = 0.0
+        self.fingerprint = None
+        self.in_flight = False
+        self.failures = 0
+        self.breaker = breaker
+        self.quarantined = False
+
+
+class EventRefreshScheduler:
+    """Priority queue of live events keyed by their next-due time.
+
+    ``fetch`` is a coroutine function ``fetch(match_info) -> organized | None``
+    run on ``engine``; it may raise ``EventUnavailable`` or
+    ``CircuitOpenError`` (including ``HostThrottledError``).
+    ``on_result(event_id, result, changed)`` is called from the engine thread
+    after every successful fetch, and with ``result`` None when upstream has
+    no data for the event (``EventUnavailable``). Transient failures (None,
+    other exceptions) and host back-off do not call it, so the event keeps
+    its last data. ``fingerprint(result)`` returns a value that changes
+    whenever the event's odds change.
+    """
+
+    def __init__(self, engine, fetch, on_result, fingerprint, base_interval,
+                 min_interval, max_interval, max_in_flight, quarantine):
+        self.engine = engine
+        self.fetch = fetch
+        self.on_result = on_result
+        self.fingerprint = fingerprint
+        self.base_interval = base_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.max_in_flight = max_in_flight
+        self.quarantine = quarantine
+        self._live_list = None
+        self._events = {}
+        self._heap = []
+        self._seq = itertools.count()
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    def _push(self, state, due):
+        state.due = due
+        heapq.heappush(self._heap, (due, next(self._seq), state.event_id))
+
+    def _new_breaker(self, event_id):
+        # One request per interval: three failures in a few intervals open it
+        return CircuitBreaker(
+            f"event {event_id}", window=self.max_interval * 4, failure_rate=0.5, min_requests=3,
+            cooldown=self.max_interval, max_cooldown=self.max_interval * 10,
+        )
+
+    def sync_events(self, live_matches):
+        """Track newly live events (due immediately) and drop events that left the list.
+
+        A new match list (a different list object) releases quarantined events.
+        Returns the ids of dropped events.
+        """
+        live = {str(m.get('event_id')): m for m in live_matches if m.get('event_id')}
+        now = time.monotonic()
+        list_changed = live_matches is not self._live_list
+        self._live_list = live_matches
+        with self._lock:
+            removed = [eid for eid in self._events if eid not in live]
+            for eid in removed:
+                # Stale heap entries are skipped lazily in tick()
+                del self._events[eid]
+            for eid, info in live.items():
+                state = self._events.get(eid)
+                if state is None:
+                    state = self._events[eid] = EventState(eid, info, self.base_interval, self._new_breaker(eid))
+                    self._push(state, now)
+                else:
+                    state.match_info = info
+                    if state.quarantined and list_changed and not state.in_flight:
+                        state.quarantined = False
+                        self._push(state, now)
+        return removed
+
+    def tick(self):
+        """Dispatch every due event to the engine without waiting for results"""
+        now = time.monotonic()
+        dispatch = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now and self._in_flight < self.max_in_flight:
+                due, _, eid = heapq.heappop(self._heap)
+                state = self._events.get(eid)
+                if state is None or state.in_flight or state.due != due:
+                    continue
+                if not state.breaker.allow():
+                    self._push(state, max(state.breaker.retry_at, now + self.min_interval))
+                    continue
+                state.in_flight = True
+                self._in_flight += 1
+                dispatch.append(state)
+                SCHEDULER_LAG_SECONDS.observe(now - due)
+
+        for state in dispatch:
+            future = self.engine.submit(self.fetch(state.match_info))
+            future.add_done_callback(lambda f, s=state: self._on_done(s, f))
+        return len(dispatch)
+
+    def _on_done(self, state, future):
+        quarantine = False
+        try:
+            result = future.result()
+        except CircuitOpenError as e:
+            # The host is backing off or throttled: keep the event's current data and health
+            state.breaker.release()
+            self._finish(state, max(self.min_interval, e.retry_at - time.monotonic()))
+            return
+        except EventUnavailable as e:
+            logger.info("Quarantining event %s until the match list changes: %s", state.event_id, e.reason)
+            result = None
+            quarantine = True
+        except Exception as e:
+            logger.error("Refresh failed for event %s: %s", state.event_id, e)
+            result = None
+
+        changed = False
+        if result:
+            fingerprint = self.fingerprint(result)
+            changed = fingerprint != state.fingerprint
+            state.fingerprint = fingerprint
+            state.failures = 0
+            state.breaker.record_success()
+            state.interval = self._next_interval(state, result, changed)
+            delay = state.interval
+        elif quarantine:
+            # Upstream answered; there is just nothing to show for this event
+            state.breaker.record_success()
+            delay = self.quarantine
+        else:
+            state.failures += 1
+            state.breaker.record_failure()
+            state.interval = min(self.max_interval, self.base_interval * (2 ** state.failures))
+            delay = state.interval
+            if state.breaker.state == OPEN:
+                delay = max(delay, state.breaker.retry_at - time.monotonic())
+
+        if result or quarantine:
+            try:
+                self.on_result(state.event_id, result, changed)
+            except Exception as e:
+                logger.error("Error applying refresh for event %s: %s", state.event_id, e)
+
+        self._finish(state, delay, quarantine)
+
+    def _finish(self, state, delay, quarantined=False):
+        with self._lock:
+            state.in_flight = False
+            state.quarantined = quarantined
+            self._in_flight -= 1
+            if self._events.get(state.event_id) is state:
+                self._push(state, time.monotonic() + delay)
+
+    def _next_interval(self, state, result, changed):
+        if _is_suspended(state.match_info, result):
+            return self.max_interval
+        if changed:
+            if _is_in_play(result):
+                return max(self.min_interval, min(state.interval, self.base_interval) / 2)
+            return self.base_interval
+        return min(self.max_interval, state.interval * 1.5)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "events": len(self._events),
+                "in_flight": self._in_flight,
+                "intervals": {eid: round(s.interval, 2) for eid, s in self._events.items()},
+                "quarantined": [eid for eid, s in self._events.items() if s.quarantined],
+                "open_circuits": [eid for eid, s in self._events.items() if s.breaker.state != CLOSED],
+            }
+
+
+def _is_in_play(result):
+    return any(m.in_play for m in result.iter_markets())
+
+
+def _is_suspended(match_info, result):
+    if match_info.get('status') == 'SUSPENDED':
+        return True
+    statuses = [m.status for m in result.iter_markets()]
+    return bool(statuses) and all(s in ('SUSPENDED', 'CLOSED') for s in statuses)
@@ -0,0 +1,139 @@
+# app/services/response_cache.py
+"""Pre-encoded JSON response bodies.
+
+The hot read endpoints serve the same data to many pollers between updates.
+An ``EncodedBody`` holds the JSON bytes of one version of that data and a
+content-hash ETag, plus its gzip and brotli variants, reused for every
+later request. Bodies served to many clients are compressed ahead of time
+off the event loop (``precompress``); any other variant is compressed on
+first use at a fast level, since that runs inside the request handler.
+``encoded_response`` picks the variant the client accepts and answers
+matching ``If-None-Match`` with 304.
+"""
+import gzip
+import hashlib
+import json
+
+from fastapi import Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional encoding
+    brotli = None
+
+# Bodies smaller than this are sent uncompressed
+MIN_COMPRESS_SIZE = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+# Variants compressed on the request path (the event loop): fast, slightly larger
+FAST_GZIP_LEVEL = 1
+FAST_BROTLI_QUALITY = 1
+
+
+def dumps(payload):
+    """Compact JSON bytes; uses orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(payload, default=str, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False, default=str).encode("utf-8")
+
+
+def _compress(encoding, body, fast=False):
+    if encoding == "br":
+        return brotli.compress(body, quality=FAST_BROTLI_QUALITY if fast else BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=FAST_GZIP_LEVEL if fast else GZIP_LEVEL, mtime=0)
+
+
+def _encodings():
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def _accepted_encodings(header):
+    accepted = set()
+    for part in header.split(","):
+        name, *params = part.split(";")
+        quality = 1.0
+        for param in params:
+            key, _, value = param.strip().partition("=")
+            if key.lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            accepted.add(name.strip().lower())
+    return accepted
+
+
+def _etag_matches(header, etag):
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # Weak comparison: W/"x" and "x" match
+    bare = etag[2:] if etag.startswith("W/") else etag
+    return any(tag.strip().removeprefix("W/") == bare for tag in header.split(","))
+
+
+class EncodedBody:
+    """JSON body of one version of a response, with its ETag and compressed variants."""
+
+    __slots__ = ("body", "etag", "_variants")
+
+    def __init__(self, body):
+        self.body = body
+        # Weak because the same tag is sent for every content encoding
+        self.etag = f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+        self._variants = {}
+
+    @classmethod
+    def from_payload(cls, payload):
+        return cls(dumps(payload))
+
+    def precompress(self):
+        """Compress every missing variant at the full level; call it off the event loop"""
+        if len(self.body) < MIN_COMPRESS_SIZE:
+            return self
+        for encoding in _encodings():
+            if encoding not in self._variants:
+                self._variants[encoding] = _compress(encoding, self.body)
+        return self
+
+    def variant(self, accept_encoding):
+        """``(body, content_encoding)`` for the best encoding the client accepts"""
+        if not accept_encoding or len(self.body) < MIN_COMPRESS_SIZE:
+            return self.body, None
+        accepted = _accepted_encodings(accept_encoding)
+        for encoding in _encodings():
+            if encoding not in accepted:
+                continue
+            data = self._variants.get(encoding)
+            if data is None:
+                # Not precompressed: runs in the handler, so use the fast level. Concurrent
+                # first requests may both compress; either result is valid
+                data = self._variants[encoding] = _compress(encoding, self.body, fast=True)
+            return data, encoding
+        return self.body, None
+
+
+def reuse_or_encode(previous, payload):
+    """Encode ``payload``, keeping ``previous`` (and its compressed variants) if the bytes are unchanged"""
+    body = dumps(payload)
+    if previous is not None and previous.body == body:
+        return previous
+    return EncodedBody(body)
+
+
+def encoded_response(request, encoded, headers=None):
+    """Serve an ``EncodedBody``: 304 on a matching ETag, else the negotiated variant"""
+    headers = {**(headers or {}), "ETag": encoded.etag, "Vary": "Accept-Encoding"}
+    if _etag_matches(request.headers.get("if-none-match"), encoded.etag):
+        return Response(status_code=304, headers=headers)
+    body, encoding = encoded.variant(request.headers.get("accept-encoding"))
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,114 @@
+# app/services/shared_snapshot.py
+"""Hand the leader's live snapshot to follower workers through a mapped file.
+
+The leader periodically writes the current snapshot to a temp file and
+renames it over ``live_snapshot.bin``, so readers either see the old or the
+new file, never a partial one. Followers ``stat`` the file on every poll
+and only map it when it was replaced by a newer version, then publish it
+into their own store under the leader's version number.
+
+Versions change on every merged event, but most matches do not, so every
+match carries a stamp that only changes when the leader wrote a different
+match object. Followers decode just the matches whose stamp changed and
+reuse their ``LiveMatch`` objects for the rest.
+
+File layout: ``MAGIC | version (u64) | index length (u64) | index | bodies``.
+The index is compact JSON ``{"version", "updated_at", "matches": [[match_id,
+stamp, offset, length], ...]}``; each match body is its compact JSON at
+``offset`` from the start of the bodies.
+"""
+import json
+import mmap
+import os
+import struct
+import time
+
+from app.core.config import DATA_DIR
+from app.core.logger import get_logger
+from app.services.match_model import LiveMatch
+from app.services.response_cache import dumps
+
+logger = get_logger("shared_snapshot")
+
+MAGIC = b"LSN2"
+HEADER = struct.Struct("<4sQQ")
+
+
+class SharedSnapshotFile:
+    def __init__(self, path):
+        self.path = path
+        self._written_version = 0
+        # Leader: match_id -> (LiveMatch, stamp) as last written
+        self._written = {}
+        # Follower: match_id -> (stamp, LiveMatch) as last read
+        self._read = {}
+        self._file_key = None
+
+    def write(self, snapshot):
+        """Atomically replace the shared file if ``snapshot`` is newer than the last write"""
+        if snapshot.version == self._written_version:
+            return False
+        stamp = time.time_ns()
+        written = {}
+        index = []
+        bodies = []
+        offset = 0
+        for match in snapshot.matches:
+            match_id = str(match.match_id)
+            previous = self._written.get(match_id)
+            written[match_id] = previous if previous is not None and previous[0] is match else (match, stamp)
+            body = match.to_json()
+            index.append([match_id, written[match_id][1], offset, len(body)])
+            bodies.append(body)
+            offset += len(body)
+        head = dumps({"version": snapshot.version, "updated_at": snapshot.updated_at, "matches": index})
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, snapshot.version, len(head)))
+            f.write(head)
+            f.writelines(bodies)
+        os.replace(tmp_path, self.path)
+        self._written_version = snapshot.version
+        self._written = written
+        return True
+
+    def read_if_changed(self, known_version):
+        """``(version, updated_at, matches)`` if the file holds a version newer than ``known_version``.
+
+        ``matches`` are ``LiveMatch`` objects; those the leader did not change
+        since the last read are the objects returned then.
+        """
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        file_key = (st.st_ino, st.st_mtime_ns, st.st_size)
+        if file_key == self._file_key or st.st_size < HEADER.size:
+            return None
+
+        with open(self.path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                magic, version, length = HEADER.unpack_from(mm, 0)
+                if magic != MAGIC:
+                    logger.warning("Ignoring shared snapshot with bad header: %s", self.path)
+                    return None
+                self._file_key = file_key
+                if version <= known_version:
+                    return None
+                head = json.loads(mm[HEADER.size:HEADER.size + length])
+                start = HEADER.size + length
+                read = {}
+                matches = []
+                for match_id, stamp, offset, size in head["matches"]:
+                    previous = self._read.get(match_id)
+                    if previous is not None and previous[0] == stamp:
+                        match = previous[1]
+                    else:
+                        match = LiveMatch.from_dict(json.loads(mm[start + offset:start + offset + size]))
+                    read[match_id] = (stamp, match)
+                    matches.append(match)
+        self._read = read
+        return head["version"], head["updated_at"], matches
+
+
+shared_snapshot = SharedSnapshotFile(os.path.join(DATA_DIR, "live_snapshot.bin"))
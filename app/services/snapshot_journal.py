@@ -0,0 +1,119 @@
+# app/services/snapshot_journal.py
+"""Append-only NDJSON journal of the live snapshot, for warm starts.
+
+Instead of rewriting every match on every cycle, the leader appends only
+the matches that changed since its last write, followed by a commit record:
+
+    {"op":"put","match":{...}}
+    {"op":"del","match_id":"123"}
+    {"op":"commit","version":42,"updated_at":"..."}
+
+Once the journal grows past ``compact_bytes`` it is rewritten as
+``reset`` + one ``put`` per current match + ``commit`` into a temp file that
+replaces the journal atomically. Readers apply records only when they reach
+their commit, so a torn tail from a crash is simply ignored.
+"""
+import json
+import os
+
+from app.core.config import LIVE_JOURNAL_FILE
+from app.core.logger import get_logger
+from app.core.settings import settings
+from app.services.response_cache import dumps
+
+logger = get_logger("snapshot_journal")
+
+
+class SnapshotJournal:
+    def __init__(self, path, compact_bytes):
+        self.path = path
+        self.compact_bytes = compact_bytes
+        self._file = None
+        self._size = 0
+        # Last snapshot written; unchanged matches are the same objects
+        self._written = None
+
+    def _commit_line(self, snapshot):
+        return dumps({"op": "commit", "version": snapshot.version, "updated_at": snapshot.updated_at}) + b"\n"
+
+    @staticmethod
+    def _put_line(match):
+        return b'{"op":"put","match":' + match.to_json() + b"}\n"
+
+    def write(self, snapshot):
+        """Append what changed since the last write; False if the version was already written"""
+        if self._written is not None and snapshot.version == self._written.version:
+            return False
+        if self._file is None or self._size >= self.compact_bytes:
+            self._rewrite(snapshot)
+            return True
+
+        previous = self._written.by_id
+        lines = [self._put_line(m) for mid, m in snapshot.by_id.items() if previous.get(mid) is not m]
+        lines.extend(dumps({"op": "del", "match_id": mid}) + b"\n" for mid in previous if mid not in snapshot.by_id)
+        lines.append(self._commit_line(snapshot))
+        data = b"".join(lines)
+        self._file.write(data)
+        self._file.flush()
+        self._size += len(data)
+        self._written = snapshot
+        return True
+
+    def _rewrite(self, snapshot):
+        self.close()
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(b'{"op":"reset"}\n')
+            f.writelines(self._put_line(m) for m in snapshot.matches)
+            f.write(self._commit_line(snapshot))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self._file = open(self.path, "ab")
+        self._size = self._file.tell()
+        self._written = snapshot
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def load_journal(path):
+    """Replay a journal: ``(version, updated_at, [match dicts])``, or None if there is none"""
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return None
+
+    matches = {}
+    version, updated_at = 0, None
+    pending = []
+    with f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # Torn write at the tail; everything before the last commit is intact
+                logger.warning("Ignoring incomplete journal record in %s", path)
+                break
+            if record.get("op") != "commit":
+                pending.append(record)
+                continue
+            for op in pending:
+                if op["op"] == "reset":
+                    matches.clear()
+                elif op["op"] == "put":
+                    matches[str(op["match"]["match_id"])] = op["match"]
+                elif op["op"] == "del":
+                    matches.pop(str(op["match_id"]), None)
+            pending = []
+            version, updated_at = record["version"], record["updated_at"]
+
+    if not version:
+        return None
+    return version, updated_at, list(matches.values())
+
+
+# Written by the scraping leader only
+journal = SnapshotJournal(LIVE_JOURNAL_FILE, settings.PERSIST_COMPACT_BYTES)
@@ -0,0 +1,252 @@
+# app/services/snapshot_query.py
+"""Filtered, projected and paged views of the live snapshot and the match list.
+
+Each ``LiveSnapshot`` (and each version of the match list) gets an
+``ItemIndex`` the first time it is queried: item positions grouped by id,
+competition and category (or status/live for the match list). A query picks
+its candidates from those groups instead of scanning every match, then only
+the selected matches, categories, markets and fields are materialized, so
+response size and encoding time follow what the client asked for.
+
+Paged responses are ordered by id and the cursor is the last id returned,
+so it stays valid while matches come and go between versions. Encoded
+responses are kept per index (i.e. per version) for repeat pollers.
+"""
+import base64
+import binascii
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
+
+from app.services.match_model import MARKET_CATEGORIES
+from app.services.response_cache import EncodedBody, dumps
+
+MAX_PAGE_SIZE = 500
+# Distinct queries whose encoded response is kept per version
+RESPONSE_CACHE_SIZE = 128
+
+
+class QueryError(ValueError):
+    """Invalid query parameter (answered with 400)"""
+
+
+def encode_cursor(item_id):
+    return base64.urlsafe_b64encode(item_id.encode("utf-8")).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor):
+    try:
+        return base64.b64decode(cursor + "=" * (-len(cursor) % 4), altchars=b"-_", validate=True).decode("utf-8")
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise QueryError("Invalid cursor")
+
+
+def _group(values_per_item):
+    groups = {}
+    for pos, values in enumerate(values_per_item):
+        for value in values:
+            groups.setdefault(value, []).append(pos)
+    return {value: frozenset(positions) for value, positions in groups.items()}
+
+
+class ItemIndex:
+    """Positions of a list's items by id and by a few field values, plus id order for paging."""
+
+    def __init__(self, ids, fields):
+        # ids: item ids in list order; fields: {name: [iterable of values per item]}
+        self.ids = ids
+        self.position = {item_id: pos for pos, item_id in enumerate(ids)}
+        self.groups = {name: _group(values) for name, values in fields.items()}
+        self.paged = sorted(range(len(ids)), key=ids.__getitem__)
+        self.paged_ids = [ids[pos] for pos in self.paged]
+        self._responses = OrderedDict()
+        self._lock = threading.Lock()
+
+    def select(self, ids=None, **criteria):
+        """Positions of items matching every given field (any of its values), or None for all"""
+        selected = None
+        if ids is not None:
+            selected = {self.position[i] for i in ids if i in self.position}
+        for name, values in criteria.items():
+            if values is None:
+                continue
+            groups = self.groups[name]
+            positions = set().union(*(groups.get(v, ()) for v in values))
+            selected = positions if selected is None else selected & positions
+        return selected
+
+    def ordered(self, selected, paged, cursor=None):
+        """Selected positions in list order, or in id order after ``cursor`` when ``paged``"""
+        if not paged:
+            if selected is None:
+                return range(len(self.ids))
+            return sorted(selected)
+        start = bisect_right(self.paged_ids, decode_cursor(cursor)) if cursor else 0
+        order = self.paged[start:]
+        return order if selected is None else [pos for pos in order if pos in selected]
+
+    def cached(self, key, build):
+        """Response for ``key`` built once per index"""
+        with self._lock:
+            response = self._responses.get(key)
+            if response is not None:
+                self._responses.move_to_end(key)
+                return response
+        response = build()
+        with self._lock:
+            self._responses[key] = response
+            if len(self._responses) > RESPONSE_CACHE_SIZE:
+                self._responses.popitem(last=False)
+        return response
+
+
+def _lower(value):
+    return value.lower() if isinstance(value, str) else value
+
+
+def _upper(value):
+    return value.upper() if isinstance(value, str) else value
+
+
+def _frozen(values, transform=None):
+    if not values:
+        return None
+    return frozenset(map(transform, values) if transform else values)
+
+
+def _page(index, selected, cursor, limit, render):
+    """Render selected items (``render(pos)`` may return None to skip); returns (items, next_cursor)"""
+    paged = cursor is not None or limit is not None
+    items = []
+    last = None
+    positions = index.ordered(selected, paged, cursor)
+    for pos in positions:
+        item = render(pos)
+        if item is None:
+            continue
+        if limit is not None and len(items) == limit:
+            # Page full and at least one more item follows
+            return items, encode_cursor(index.ids[last])
+        items.append(item)
+        last = pos
+    return items, None
+
+
+# --- Live odds ---
+
+def live_index(matches):
+    def competition(match):
+        info = match.info or {}
+        return (_lower(info.get("competition")),)
+
+    def categories(match):
+        return tuple(c for c, books in match.markets.items() if books)
+
+    return ItemIndex(
+        [str(m.match_id) for m in matches],
+        {"competition": map(competition, matches), "category": map(categories, matches)},
+    )
+
+
+def _wanted(key, fields, exclude):
+    return (fields is None or key in fields) and (exclude is None or key not in exclude)
+
+
+def project_live_match(match, categories, statuses, fields, exclude):
+    """A live match as JSON bytes restricted to the selected categories, market statuses and
+    fields; None when a category/status filter leaves it without markets"""
+    if categories is None and statuses is None and fields is None and exclude is None:
+        return match.to_json()
+    data = {}
+    for key in ("match_id", "match_name"):
+        if _wanted(key, fields, exclude):
+            data[key] = getattr(match, key)
+    selected_markets = 0
+    for category, books in match.markets.items():
+        if categories is not None and category not in categories:
+            continue
+        selected = {
+            mid: book for mid, book in books.items() if statuses is None or _upper(book.status) in statuses
+        }
+        selected_markets += len(selected)
+        if _wanted(category, fields, exclude):
+            data[category] = {mid: book.to_dict() for mid, book in selected.items()}
+    if (categories is not None or statuses is not None) and not selected_markets:
+        return None
+    if _wanted("result", fields, exclude):
+        data["result"] = match.result
+    if _wanted("odds", fields, exclude):
+        data["odds"] = match.odds
+    if _wanted("last_updated", fields, exclude):
+        data["last_updated"] = match.last_updated
+    for key, value in (match.info or {}).items():
+        if _wanted(key, fields, exclude):
+            data[key] = value
+    return dumps(data)
+
+
+def query_live(snapshot, match_ids=None, competitions=None, categories=None, statuses=None,
+               fields=None, exclude=None, cursor=None, limit=None):
+    """``(EncodedBody, next_cursor)`` for a ``/live/odds`` query, encoded once per snapshot version"""
+    if categories and not set(categories) <= set(MARKET_CATEGORIES):
+        raise QueryError(f"Unknown category; expected any of {', '.join(MARKET_CATEGORIES)}")
+    match_ids = _frozen(match_ids)
+    competitions = _frozen(competitions, str.lower)
+    categories = _frozen(categories)
+    statuses = _frozen(statuses, str.upper)
+    fields = _frozen(fields)
+    exclude = _frozen(exclude)
+    if cursor is not None:
+        decode_cursor(cursor)
+    key = (match_ids, competitions, categories, statuses, fields, exclude, cursor, limit)
+
+    def build():
+        index = snapshot.index()
+        selected = index.select(match_ids, competition=competitions, category=categories)
+        matches = snapshot.matches
+        items, next_cursor = _page(
+            index, selected, cursor, limit,
+            lambda pos: project_live_match(matches[pos], categories, statuses, fields, exclude),
+        )
+        head = dumps({"count": len(items), "version": snapshot.version, "updated_at": snapshot.updated_at})
+        return EncodedBody(head[:-1] + b',"live_matches":[' + b",".join(items) + b"]}"), next_cursor
+
+    return snapshot.index().cached(key, build)
+
+
+# --- Match list ---
+
+def match_list_index(matches):
+    return ItemIndex(
+        [str(m.get("event_id")) for m in matches],
+        {
+            "competition": ((_lower(m.get("competition")),) for m in matches),
+            "status": ((_lower(m.get("status")),) for m in matches),
+            "live": ((bool(m.get("live")),) for m in matches),
+        },
+    )
+
+
+def query_match_list(matches, index, event_ids=None, competitions=None, statuses=None, live=None,
+                     fields=None, cursor=None, limit=None):
+    """``(EncodedBody, next_cursor)`` for a ``/matches/all`` query on one version of the list"""
+    event_ids = _frozen(event_ids)
+    competitions = _frozen(competitions, str.lower)
+    statuses = _frozen(statuses, str.lower)
+    fields = _frozen(fields)
+    if cursor is not None:
+        decode_cursor(cursor)
+    key = (event_ids, competitions, statuses, live, fields, cursor, limit)
+
+    def render(pos):
+        match = matches[pos]
+        return match if fields is None else {k: v for k, v in match.items() if k in fields}
+
+    def build():
+        selected = index.select(
+            event_ids, competition=competitions, status=statuses, live=None if live is None else (live,),
+        )
+        items, next_cursor = _page(index, selected, cursor, limit, render)
+        return EncodedBody(dumps(items)), next_cursor
+
+    return index.cached(key, build)
@@ -0,0 +1,199 @@
+# app/services/snapshot_store.py
+"""Versioned, read-only snapshots of live match data.
+
+The scraper builds a fresh list of matches and publishes it here; request
+handlers only ever read the current snapshot. Publishing swaps a single
+reference, so readers never see a half-built list and never take a lock.
+Every new version also records the match deltas that produced it in a
+bounded ``DeltaFeed`` and is handed to registered listeners.
+"""
+import threading
+import time
+from types import MappingProxyType
+
+from app.core.logger import get_logger
+from app.core.settings import settings
+from app.services.delta_feed import DeltaFeed, diff_match
+from app.services.response_cache import EncodedBody, dumps
+from app.services.snapshot_query import live_index
+from app.utils.common import now_iso
+
+logger = get_logger("snapshot_store")
+
+class LiveSnapshot:
+    """Immutable view of the live matches at one version.
+
+    ``matches`` are ``LiveMatch`` objects; once handed to ``publish`` they
+    belong to the snapshot and must not be mutated by the caller.
+    """
+
+    __slots__ = ("version", "matches", "by_id", "updated_at", "published_monotonic", "_dicts", "_encoded", "_resync",
+                 "_index")
+
+    def __init__(self, version, matches, updated_at=None):
+        self.version = version
+        self.matches = tuple(matches)
+        self.by_id = MappingProxyType({str(m.match_id): m for m in self.matches})
+        self.updated_at = updated_at
+        self.published_monotonic = time.monotonic()
+        self._dicts = None
+        self._encoded = None
+        self._resync = None
+        self._index = None
+
+    def as_dicts(self):
+        """The matches as API dicts, materialized on first use and then reused"""
+        if self._dicts is None:
+            self._dicts = [m.to_dict() for m in self.matches]
+        return self._dicts
+
+    def matches_json(self):
+        """The matches as a JSON array, spliced from each match's cached bytes"""
+        return b"[" + b",".join(m.to_json() for m in self.matches) + b"]"
+
+    def encoded(self):
+        """The ``/live/odds`` response body, encoded once per version"""
+        if self._encoded is None:
+            head = dumps({"count": len(self.matches), "version": self.version, "updated_at": self.updated_at})
+            self._encoded = EncodedBody(head[:-1] + b',"live_matches":' + self.matches_json() + b"}")
+        return self._encoded
+
+    def resync(self):
+        """The ``/live/odds/changes`` full-resync body: the ``/live/odds`` body flagged ``"full": true``"""
+        if self._resync is None:
+            self._resync = EncodedBody(b'{"full":true,' + self.encoded().body[1:])
+        return self._resync
+
+    def index(self):
+        """Lookup index for filtered ``/live/odds`` queries, built once per version"""
+        if self._index is None:
+            self._index = live_index(self.matches)
+        return self._index
+
+    @property
+    def age(self):
+        """Seconds since this snapshot was published"""
+        return time.monotonic() - self.published_monotonic
+
+
+class SnapshotStore:
+    """Holds the current ``LiveSnapshot`` and serializes writers."""
+
+    def __init__(self, delta_buffer_size=None):
+        self._write_lock = threading.Lock()
+        self._snapshot = LiveSnapshot(0, ())
+        self.deltas = DeltaFeed(delta_buffer_size or settings.DELTA_BUFFER_SIZE)
+        self._listeners = []
+
+    def current(self):
+        return self._snapshot
+
+    def add_listener(self, listener):
+        """Call ``listener(snapshot, deltas)`` after every new version.
+
+        Listeners run on the writer's thread while the write lock is held, so
+        they see versions in order; they must be quick and must not publish.
+        """
+        self._listeners.append(listener)
+
+    def _commit(self, matches, deltas, version=None, updated_at=None):
+        # Caller holds the write lock
+        previous_version = self._snapshot.version
+        snapshot = LiveSnapshot(version or previous_version + 1, matches, updated_at or now_iso())
+        self.deltas.append(previous_version, snapshot.version, deltas)
+        self._snapshot = snapshot
+        for listener in self._listeners:
+            try:
+                listener(snapshot, deltas)
+            except Exception as e:
+                logger.error("Snapshot listener failed: %s", e)
+        return snapshot
+
+    def publish(self, matches, version=None, updated_at=None):
+        """Replace the whole match list and return the new snapshot.
+
+        ``version``/``updated_at`` let a follower process mirror the leader's
+        numbering; ``version`` must be greater than the current one.
+        """
+        with self._write_lock:
+            if version is not None and version <= self._snapshot.version:
+                return self._snapshot
+            previous = self._snapshot.by_id
+            deltas = []
+            seen = set()
+            for match in matches:
+                match_id = str(match.match_id)
+                seen.add(match_id)
+                prev = previous.get(match_id)
+                if prev is match:
+                    continue
+                delta = diff_match(prev, match)
+                if delta:
+                    deltas.append(delta)
+            deltas.extend(diff_match(m, None) for mid, m in previous.items() if mid not in seen)
+            return self._commit(matches, deltas, version, updated_at)
+
+    def merge(self, match):
+        """Insert or replace a single match, keeping the order of the others"""
+        match_id = str(match.match_id)
+        with self._write_lock:
+            current = self._snapshot
+            previous = current.by_id.get(match_id)
+            matches = list(current.matches)
+            if previous is not None:
+                idx = next(i for i, m in enumerate(matches) if str(m.match_id) == match_id)
+                matches[idx] = match
+            else:
+                matches.append(match)
+            delta = diff_match(previous, match)
+            return self._commit(matches, [delta] if delta else [])
+
+    def apply(self, matches=(), removed=()):
+        """Insert or replace ``matches`` and drop the ``removed`` ids as one new version.
+
+        Returns the current snapshot if that changes nothing.
+        """
+        upserts = {str(m.match_id): m for m in matches}
+        removed = {str(m) for m in removed}.difference(upserts)
+        with self._write_lock:
+            current = self._snapshot
+            previous = current.by_id
+            removed.intersection_update(previous)
+            upserts = {mid: m for mid, m in upserts.items() if previous.get(mid) is not m}
+            if not upserts and not removed:
+                return current
+            kept = [upserts.get(mid, m) for mid, m in previous.items() if mid not in removed]
+            kept.extend(m for mid, m in upserts.items() if mid not in previous)
+            deltas = [diff_match(previous.get(mid), m) for mid, m in upserts.items()]
+            deltas = [d for d in deltas if d]
+            deltas.extend(diff_match(m, None) for mid, m in previous.items() if mid in removed)
+            return self._commit(kept, deltas)
+
+    def remove(self, match_ids):
+        """Drop the given matches; returns the current snapshot if none were present"""
+        match_ids = {str(m) for m in match_ids}
+        with self._write_lock:
+            current = self._snapshot
+            if not match_ids.intersection(current.by_id):
+                return current
+            matches = []
+            deltas = []
+            for match in current.matches:
+                if str(match.match_id) in match_ids:
+                    deltas.append(diff_match(match, None))
+                else:
+                    matches.append(match)
+            return self._commit(matches, deltas)
+
+    def changes_since(self, version):
+        """Return ``(snapshot, changes)``; ``changes`` is None when a full resync is needed"""
+        snapshot = self._snapshot
+        if version > snapshot.version:
+            return snapshot, None
+        if version == snapshot.version:
+            return snapshot, []
+        return snapshot, self.deltas.since(version, until=snapshot.version)
+
+
+# Process-wide store for live matches
+store = SnapshotStore()
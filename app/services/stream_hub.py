@@ -0,0 +1,169 @@
+# app/services/stream_hub.py
+"""Fan-out of live odds changes to SSE and WebSocket subscribers.
+
+The hub listens to every sport's snapshot store. Each new version is handed
+to the server's event loop once, filtered per distinct subscription (sport,
+match ids and categories) and serialized once per subscription, then queued
+to every subscriber sharing it. Each subscriber has a bounded queue: a consumer that
+falls behind is evicted rather than slowing everyone else down.
+"""
+import asyncio
+import json
+import threading
+
+from app.core.config import DEFAULT_SPORT
+from app.core.logger import get_logger
+from app.core.settings import settings
+from app.services.match_model import MARKET_CATEGORIES
+from app.services.metrics import Gauge
+
+logger = get_logger("stream_hub")
+
+
+def _dumps(payload):
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+class StreamMessage:
+    """One serialized update shared by all subscribers with the same filter."""
+
+    __slots__ = ("version", "text", "_sse")
+
+    def __init__(self, version, text):
+        self.version = version
+        self.text = text
+        self._sse = None
+
+    @property
+    def sse(self):
+        if self._sse is None:
+            self._sse = f"id: {self.version}\ndata: {self.text}\n\n".encode("utf-8")
+        return self._sse
+
+
+class Subscriber:
+    __slots__ = ("sport", "match_ids", "categories", "queue", "evicted")
+
+    def __init__(self, match_ids, categories, queue_size, sport=DEFAULT_SPORT):
+        self.sport = sport
+        self.match_ids = frozenset(match_ids) if match_ids else None
+        self.categories = frozenset(categories) if categories else None
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.evicted = False
+
+    @property
+    def key(self):
+        return (self.sport, self.match_ids, self.categories)
+
+
+def project_match(match, categories):
+    """Full match dict restricted to the selected market categories"""
+    if categories is None:
+        return match
+    return {
+        k: v for k, v in match.items()
+        if k != "odds" and (k not in MARKET_CATEGORIES or k in categories)
+    }
+
+
+def filter_deltas(deltas, match_ids, categories):
+    """Restrict a version's deltas to a subscription; drops deltas left empty"""
+    selected = []
+    for delta in deltas:
+        if match_ids is not None and str(delta.get("match_id")) not in match_ids:
+            continue
+        if categories is None or delta["type"] == "remove":
+            selected.append(delta)
+            continue
+        if delta["type"] == "match":
+            selected.append({**delta, "match": project_match(delta["match"], categories)})
+            continue
+        filtered = {k: v for k, v in delta.items() if k not in ("markets", "removed_markets")}
+        for key in ("markets", "removed_markets"):
+            part = {c: v for c, v in (delta.get(key) or {}).items() if c in categories}
+            if part:
+                filtered[key] = part
+        if any(k in filtered for k in ("markets", "removed_markets", "fields", "result")):
+            selected.append(filtered)
+    return selected
+
+
+class StreamHub:
+    def __init__(self, queue_size=None):
+        self.queue_size = queue_size or settings.STREAM_QUEUE_SIZE
+        self._loop = None
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    @property
+    def subscriber_count(self):
+        return len(self._subscribers)
+
+    def subscribe(self, match_ids=None, categories=None, sport=DEFAULT_SPORT):
+        """Register a subscriber to one sport's updates; must be called from the server's event loop"""
+        self._loop = asyncio.get_running_loop()
+        subscriber = Subscriber(match_ids, categories, self.queue_size, sport)
+        with self._lock:
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def initial_message(self, subscriber, snapshot):
+        """Full (filtered) snapshot sent when a subscriber connects"""
+        matches = snapshot.matches
+        if subscriber.match_ids is not None:
+            matches = [m for m in matches if str(m.match_id) in subscriber.match_ids]
+        payload = {
+            "version": snapshot.version,
+            "full": True,
+            "live_matches": [
+                m.to_dict(subscriber.categories, include_odds=subscriber.categories is None) for m in matches
+            ],
+        }
+        return StreamMessage(snapshot.version, _dumps(payload))
+
+    def on_snapshot(self, snapshot, deltas, sport=DEFAULT_SPORT):
+        """Snapshot store listener of ``sport``'s store; may be called from any thread"""
+        if not deltas or not self._subscribers or self._loop is None:
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._dispatch, snapshot.version, deltas, sport)
+        except RuntimeError:
+            # Server loop already closed
+            self._loop = None
+
+    def _dispatch(self, version, deltas, sport):
+        with self._lock:
+            subscribers = [s for s in self._subscribers if s.sport == sport]
+
+        messages = {}
+        for subscriber in subscribers:
+            key = subscriber.key
+            if key not in messages:
+                selected = filter_deltas(deltas, subscriber.match_ids, subscriber.categories)
+                messages[key] = StreamMessage(version, _dumps({"version": version, "deltas": selected})) if selected else None
+            message = messages[key]
+            if message is None:
+                continue
+            try:
+                subscriber.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                self._evict(subscriber)
+
+    def _evict(self, subscriber):
+        logger.warning("Evicting slow stream subscriber")
+        subscriber.evicted = True
+        self.unsubscribe(subscriber)
+        # Make room for the sentinel that tells the consumer to stop
+        while not subscriber.queue.empty():
+            subscriber.queue.get_nowait()
+        subscriber.queue.put_nowait(None)
+
+
+# Process-wide hub, fed by every sport's live snapshot store
+hub = StreamHub()
+
+Gauge("stream_subscribers", "Connected SSE and WebSocket subscribers", lambda: hub.subscriber_count)
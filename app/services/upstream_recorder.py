@@ -0,0 +1,97 @@
+# app/services/upstream_recorder.py
+"""Capture raw upstream responses as replay fixtures.
+
+With ``RECORD_DIR`` set, the scrape engine hands every 200 response body to
+the recorder, which writes it unchanged to
+
+    RECORD_DIR/<url path>/<receive time ms>.json
+
+where ``<url path>`` is the request path with ``/`` replaced by ``_`` (e.g.
+``delaymarkets_events_detail_123``). ``benchmarks.replay_server`` serves a
+recorded directory back, one body per request in recording order.
+
+Files are written by a writer thread, so recording never blocks the scrape
+engine's event loop on disk I/O.
+"""
+import os
+import queue
+import re
+import threading
+import time
+from urllib.parse import urlsplit
+
+from app.core.logger import get_logger
+
+logger = get_logger("upstream_recorder")
+
+_UNSAFE = re.compile(r"[^\w.-]+")
+
+
+def fixture_key(url):
+    """Fixture directory name for a request URL (its path, flattened)"""
+    return _UNSAFE.sub("_", urlsplit(url).path.strip("/")) or "_"
+
+
+class UpstreamRecorder:
+    def __init__(self, root):
+        self.root = root
+        self.recorded = 0
+        self._last_ms = {}
+        # (url, directory, file name, body) per response, None to stop the writer
+        self._queue = queue.SimpleQueue()
+        self._writer = None
+        self._writer_lock = threading.Lock()
+
+    def record(self, url, body):
+        """Queue ``body`` for the writer thread (called on the engine loop)"""
+        key = fixture_key(url)
+        # Unique, ordered file names even for two bodies in the same millisecond
+        ms = max(int(time.time() * 1000), self._last_ms.get(key, 0) + 1)
+        self._last_ms[key] = ms
+        if self._writer is None:
+            with self._writer_lock:
+                if self._writer is None:
+                    self._writer = threading.Thread(target=self._write_loop, name="upstream-recorder", daemon=True)
+                    self._writer.start()
+        self._queue.put((url, os.path.join(self.root, key), f"{ms}.json", body))
+
+    def _write_loop(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            url, directory, name, body = item
+            try:
+                os.makedirs(directory, exist_ok=True)
+                with open(os.path.join(directory, name), "wb") as f:
+                    f.write(body)
+                self.recorded += 1
+            except OSError as e:
+                logger.error("Error recording upstream response for %s: %s", url, e)
+
+    def close(self, timeout=5):
+        """Write what is queued and stop the writer thread"""
+        writer = self._writer
+        if writer is None:
+            return
+        self._queue.put(None)
+        writer.join(timeout)
+        self._writer = None
+
+
+def load_fixtures(root):
+    """``{fixture key: [body bytes, ...]}`` in recording order"""
+    fixtures = {}
+    for key in sorted(os.listdir(root)):
+        directory = os.path.join(root, key)
+        if not os.path.isdir(directory):
+            continue
+        names = sorted((n for n in os.listdir(directory) if n.endswith(".json")), key=lambda n: int(n[:-5]))
+        bodies = []
+        for name in names:
+            with open(os.path.join(directory, name), "rb") as f:
+                bodies.append(f.read())
+        if bodies:
+            fixtures[key] = bodies
+    return fixtures
+
@@ -0,0 +1,191 @@
+# app/services/webhook_push.py
+"""Push live match updates to ``LIVE_MATCH_ODDS_PUSH_URL`` off the scrape path.
+
+The pusher listens to every sport's snapshot store and only queues what changed; a
+worker on the scrape engine's loop drains the queue with its own pooled
+``aiohttp`` session, so a slow or failing receiver never delays scraping.
+
+- up to ``batch_size`` updates go out per POST. With a batch size of 1 the
+  body is a single JSON object, as before; larger batches send a JSON array
+- ``payload="full"`` sends the whole match (``LiveMatch.to_dict()``);
+  ``payload="delta"`` sends the snapshot delta with its ``version``. Updates
+  of sports other than the default one also carry their ``sport``
+- failed POSTs (connection errors, timeouts, 429 and 5xx) are retried with
+  exponential backoff; other 4xx responses drop the batch
+- the queue is bounded: when the receiver falls behind, the oldest updates
+  are dropped first
+"""
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+
+from app.core.config import DEFAULT_SPORT, LIVE_MATCH_ODDS_PUSH_URL
+from app.core.logger import get_logger
+from app.core.settings import settings
+from app.services.metrics import (
+    WEBHOOK_BATCHES, WEBHOOK_DROPPED, WEBHOOK_FAILED, WEBHOOK_PUSH_SECONDS, WEBHOOK_PUSHED, WEBHOOK_QUEUED,
+    WEBHOOK_RETRIES, Gauge,
+)
+from app.services.response_cache import dumps
+from app.services.scrape_engine import engine
+
+logger = get_logger("webhook_push")
+
+class WebhookPusher:
+    def __init__(self, url, engine, queue_size, batch_size, payload, timeout, max_retries):
+        self.url = url
+        self.engine = engine
+        self.queue_size = queue_size
+        self.batch_size = max(batch_size, 1)
+        self.payload = payload
+        self.timeout = timeout
+        self.max_retries = max_retries
+        # (sport, version, delta, match) per queued update
+        self._pending = deque()
+        self._lock = threading.Lock()
+        self._wakeup = None
+        self._future = None
+
+    @property
+    def running(self):
+        return self._future is not None and not self._future.done()
+
+    def start(self):
+        """Start the push worker (leader only; followers would push duplicates)"""
+        if not self.url or self.running:
+            return
+        self._wakeup = asyncio.Event()
+        self._future = self.engine.submit(self._run())
+        logger.info("Pushing live match updates to %s (%s, batches of %s)", self.url, self.payload, self.batch_size)
+
+    def stop(self):
+        if self._future is not None:
+            self._future.cancel()
+            self._future = None
+
+    def on_snapshot(self, snapshot, deltas, sport=DEFAULT_SPORT):
+        """Listener of ``sport``'s snapshot store: queue the matches that changed in this version"""
+        if not self.running:
+            return
+        for delta in deltas:
+            if self.payload == "delta":
+                self._enqueue((sport, snapshot.version, delta, None))
+            elif delta["type"] != "remove":
+                match = snapshot.by_id.get(str(delta["match_id"]))
+                if match is not None:
+                    self._enqueue((sport, snapshot.version, None, match))
+
+    def _enqueue(self, item):
+        with self._lock:
+            if len(self._pending) >= self.queue_size:
+                self._pending.popleft()
+                WEBHOOK_DROPPED.inc()
+            self._pending.append(item)
+            WEBHOOK_QUEUED.inc()
+        try:
+            self.engine.loop.call_soon_threadsafe(self._wakeup.set)
+        except RuntimeError:
+            # Engine loop already closed during shutdown
+            pass
+
+    def _take_batch(self):
+        with self._lock:
+            count = min(self.batch_size, len(self._pending))
+            return [self._pending.popleft() for _ in range(count)]
+
+    @staticmethod
+    def _encode_item(sport, version, delta, match):
+        if sport == DEFAULT_SPORT:
+            return match.to_json() if match is not None else dumps({"version": version, **delta})
+        if match is not None:
+            return dumps({**match.to_dict(), "sport": sport})
+        return dumps({"version": version, "sport": sport, **delta})
+
+    def _encode(self, batch):
+        items = [self._encode_item(*item) for item in batch]
+        if self.batch_size == 1:
+            return items[0]
+        return b"[" + b",".join(items) + b"]"
+
+    async def _run(self):
+        import aiohttp
+
+        session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=4),
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            headers={"Content-Type": "application/json"},
+        )
+        try:
+            while True:
+                await self._wakeup.wait()
+                self._wakeup.clear()
+                while True:
+                    batch = self._take_batch()
+                    if not batch:
+                        break
+                    await self._send(session, batch)
+        finally:
+            await session.close()
+
+    async def _send(self, session, batch):
+        import aiohttp
+
+        body = self._encode(batch)
+        error = None
+        for attempt in range(self.max_retries + 1):
+            if attempt > 0:
+                WEBHOOK_RETRIES.inc()
+                await asyncio.sleep(min(30.0, 0.5 * 2 ** (attempt - 1)) + random.uniform(0, 0.25))
+            start = time.monotonic()
+            try:
+                async with session.post(self.url, data=body) as res:
+                    await res.read()
+                    status = res.status
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = repr(e)
+                continue
+            finally:
+                WEBHOOK_PUSH_SECONDS.observe(time.monotonic() - start)
+
+            if status < 300:
+                WEBHOOK_BATCHES.inc()
+                WEBHOOK_PUSHED.inc(len(batch))
+                return
+            error = f"HTTP {status}"
+            if status < 500 and status != 429:
+                # The receiver rejected the payload; resending it will not help
+                break
+
+        WEBHOOK_FAILED.inc(len(batch))
+        logger.warning("Failed to push %s live match update(s): %s", len(batch), error)
+
+    def stats(self):
+        latency = WEBHOOK_PUSH_SECONDS
+        return {
+            "running": self.running,
+            "queue_depth": len(self._pending),
+            "queued": WEBHOOK_QUEUED.value,
+            "pushed": WEBHOOK_PUSHED.value,
+            "batches": WEBHOOK_BATCHES.value,
+            "failed": WEBHOOK_FAILED.value,
+            "dropped": WEBHOOK_DROPPED.value,
+            "retries": WEBHOOK_RETRIES.value,
+            "avg_latency": round(latency.sum / latency.count, 4) if latency.count else None,
+        }
+
+
+webhook_pusher = WebhookPusher(
+    LIVE_MATCH_ODDS_PUSH_URL or settings.LIVE_MATCH_ODDS_PUSH_URL,
+    engine,
+    queue_size=settings.WEBHOOK_QUEUE_SIZE,
+    batch_size=settings.WEBHOOK_BATCH_SIZE,
+    payload=settings.WEBHOOK_PAYLOAD,
+    timeout=settings.WEBHOOK_TIMEOUT,
+    max_retries=settings.WEBHOOK_MAX_RETRIES,
+)
+
+
+Gauge("webhook_queue_depth", "Live match updates waiting to be pushed",
+      lambda: len(webhook_pusher._pending) if webhook_pusher.url else None)
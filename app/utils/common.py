@@ -3,3 +3,9 @@ from datetime import datetime
 
 def now_iso():
     return datetime.utcnow().isoformat() + 'Z'
+
+def split_param(value):
+    """Parse a comma-separated query parameter into a list (None if empty)"""
+    if not value:
+        return None
+    return [v.strip() for v in value.split(',') if v.strip()] or None
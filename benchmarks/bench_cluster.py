@@ -0,0 +1,109 @@
+# benchmarks/bench_cluster.py
+"""Cluster benchmark: upstream scrape capacity against the number of nodes.
+
+For 1..N nodes, starts the replay server and N ``uvicorn app.main:app``
+processes in cluster mode (``CLUSTER_BACKEND=sqlite`` on one shared file,
+separate ``DATA_DIR`` each, ``SCRAPE_RATE_LIMIT`` per node as if each had
+its own egress IP), waits until every node serves every live event, then
+reports the event detail requests per second the cluster sustains and the
+resulting refresh interval per event. With more events than one node's
+rate limit covers, capacity grows with the node count.
+
+Run from the project root (replay server options are passed through):
+
+    python -m benchmarks.bench_cluster [--nodes 3] [--events 40] [--rate 5] [--duration 10]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from contextlib import ExitStack
+from urllib.request import urlopen
+
+if __package__ in (None, ""):
+    # Run as a script (python benchmarks/<name>.py): make the project root importable
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_pipeline import free_port, replay_args, start_process, wait_for
+from benchmarks.replay_server import add_arguments
+
+
+def replay_stats(base_url):
+    with urlopen(f"{base_url}/_stats", timeout=5) as res:
+        return json.loads(res.read())
+
+
+def run(nodes, args, data_dir):
+    replay_port = free_port()
+    base_url = f"http://127.0.0.1:{replay_port}"
+    env = dict(
+        os.environ,
+        BASE_URL=base_url,
+        SCRAPE_RATE_LIMIT=str(args.rate),
+        SCRAPE_RATE_BURST="1",
+        LIVE_MIN_INTERVAL="0.5",
+        HISTORY_ENABLED="false",
+        RECORD_DIR="",
+        LOG_LEVEL="WARNING",
+        CLUSTER_BACKEND="sqlite",
+        CLUSTER_DB=os.path.join(data_dir, f"cluster-{nodes}.db"),
+        CLUSTER_HEARTBEAT="1",
+    )
+    with ExitStack() as stack:
+        log = stack.enter_context(open(os.path.join(data_dir, f"replay-{nodes}.log"), "wb"))
+        replay = start_process(replay_args(args, replay_port), env, f"{base_url}/_stats", log)
+        stack.callback(replay.wait)
+        stack.callback(replay.terminate)
+        ports = []
+        for i in range(nodes):
+            port = free_port()
+            node_env = dict(env, DATA_DIR=os.path.join(data_dir, f"{nodes}-{i}"), CLUSTER_NODE_ID=f"node-{i}")
+            log = stack.enter_context(open(os.path.join(data_dir, f"node-{nodes}-{i}.log"), "wb"))
+            api = start_process(
+                [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+                node_env, f"http://127.0.0.1:{port}/", log,
+            )
+            stack.callback(api.wait)
+            stack.callback(api.terminate)
+            ports.append(port)
+        events = args.events or 20
+        for port in ports:
+            wait_for(f"http://127.0.0.1:{port}/live/odds", lambda body: json.loads(body).get("count") == events,
+                     timeout=120)
+
+        before = replay_stats(base_url)["detail"]
+        start = time.monotonic()
+        time.sleep(args.duration)
+        requests = replay_stats(base_url)["detail"] - before
+        seconds = time.monotonic() - start
+        counts = []
+        for port in ports:
+            with urlopen(f"http://127.0.0.1:{port}/live/odds", timeout=5) as res:
+                counts.append(json.loads(res.read())["count"])
+    rate = requests / seconds
+    print(f"  {nodes} node{'s' if nodes > 1 else ' '}  {rate:7.1f} event req/s  "
+          f"{events / rate if rate else float('inf'):6.1f} s per event refresh  "
+          f"matches served per node {counts}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_arguments(parser)
+    parser.add_argument("--nodes", type=int, default=3)
+    parser.add_argument("--rate", type=float, default=5.0, help="SCRAPE_RATE_LIMIT of each node")
+    parser.add_argument("--duration", type=float, default=10.0, help="Measurement time per cluster size (in seconds)")
+    args = parser.parse_args()
+    if args.events is None:
+        args.events = 40
+
+    data_dir = tempfile.mkdtemp(prefix="bench-cluster-")
+    print(f"{args.events} live events, {args.rate:g} upstream req/s per node")
+    for nodes in range(1, args.nodes + 1):
+        run(nodes, args, data_dir)
+    print(f"Logs and data in {data_dir}")
+
+
+if __name__ == "__main__":
+    main()
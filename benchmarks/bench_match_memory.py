@@ -0,0 +1,60 @@
+# benchmarks/bench_match_memory.py
+"""Memory benchmark: compact LiveMatch model vs the legacy dict tree.
+
+Builds the same synthetic events both ways and reports the retained heap per
+event and per market, measured with tracemalloc. Run from the project root:
+
+    python -m benchmarks.bench_match_memory [--events 50] [--markets 60] [--runners 2]
+"""
+import argparse
+import gc
+import os
+import random
+import sys
+import tracemalloc
+
+if __package__ in (None, ""):
+    # Run as a script (python benchmarks/<name>.py): make the project root importable
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.match_organizer import organize_match
+from benchmarks.payloads import make_event
+
+
+def retained(build):
+    """Bytes still allocated after ``build()`` returns, while its result is alive"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return after - before
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=50)
+    parser.add_argument("--markets", type=int, default=60)
+    parser.add_argument("--runners", type=int, default=2)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    payloads = [make_event(1000 + i, args.markets, args.runners, rng) for i in range(args.events)]
+    # Warm caches (interned strings, codec memo) so both sides start equal
+    [organize_match(p, p["event"]["id"]) for p in payloads]
+
+    # Legacy form: the organized dict with the parsed odds/result kept alongside
+    legacy = retained(lambda: [organize_match(p, p["event"]["id"]).to_dict() for p in payloads])
+    compact = retained(lambda: [organize_match(p, p["event"]["id"]) for p in payloads])
+
+    total_markets = args.events * args.markets
+    print(f"{args.events} events x {args.markets} markets x {args.runners} runners")
+    print(f"  dict tree   {legacy / 1024:10.1f} KiB  {legacy / total_markets:8.0f} B/market")
+    print(f"  LiveMatch   {compact / 1024:10.1f} KiB  {compact / total_markets:8.0f} B/market  ({legacy / compact:.2f}x smaller)")
+
+
+if __name__ == "__main__":
+    main()
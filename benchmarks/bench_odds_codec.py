@@ -0,0 +1,141 @@
+# benchmarks/bench_odds_codec.py
+"""Microbenchmark: odds_codec vs the closures that used to live in fetch_live_match.
+
+Run from the project root:
+
+    python -m benchmarks.bench_odds_codec [--markets 300] [--runners 2] [--repeat 20]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import timeit
+
+if __package__ in (None, ""):
+    # Run as a script (python benchmarks/<name>.py): make the project root importable
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.odds_codec import decode_market, parse_market
+
+
+# --- Legacy implementation (as previously defined inside fetch_live_match) ---
+
+def legacy_parse_runner_odds(runner_str):
+    if not runner_str:
+        return None
+    parts = runner_str.split('~')
+    if len(parts) < 3:
+        return None
+    runner_id = parts[0]
+    status = parts[1]
+    back_parts = parts[2].split(':') if parts[2] else [None, 0, 0]
+    lay_parts = parts[3].split(':') if len(parts) > 3 and parts[3] else [None, 0, 0]
+    try:
+        back_price = float(back_parts[0]) if back_parts[0] not in (None, '') else None
+    except Exception:
+        back_price = None
+    try:
+        lay_price = float(lay_parts[0]) if lay_parts[0] not in (None, '') else None
+    except Exception:
+        lay_price = None
+    def to_int(x):
+        try:
+            return int(x)
+        except Exception:
+            return 0
+    return {
+        'id': runner_id,
+        'status': status,
+        'back': {'price': back_price, 'volume': to_int(back_parts[1]) if len(back_parts) > 1 else 0, 'exposed': to_int(back_parts[2]) if len(back_parts) > 2 else 0},
+        'lay': {'price': lay_price, 'volume': to_int(lay_parts[1]) if len(lay_parts) > 1 else 0, 'exposed': to_int(lay_parts[2]) if len(lay_parts) > 2 else 0}
+    }
+
+
+def legacy_parse_market_odds(odds_str):
+    if not odds_str or not isinstance(odds_str, str):
+        return None
+    parts = odds_str.split('|')
+    if len(parts) >= 8:
+        status = parts[2]
+        in_play = parts[6].lower() == 'true'
+        runners_str = parts[7]
+        runners = []
+        for r in runners_str.split(','):
+            parsed = legacy_parse_runner_odds(r)
+            if parsed:
+                runners.append(parsed)
+        return {'status': status, 'in_play': in_play, 'runners': runners}
+    try:
+        return json.loads(odds_str)
+    except Exception:
+        return None
+
+
+# --- Workload ---
+
+def make_market(market_id, runners, rng):
+    encoded = []
+    for i in range(runners):
+        back = f"{rng.uniform(1, 100):.2f}:{rng.randint(0, 50000)}:0"
+        lay = f"{rng.uniform(1, 100):.2f}:{rng.randint(0, 50000)}:0" if rng.random() > 0.1 else ""
+        encoded.append(f"{1000 + i}~{rng.choice(['ACTIVE', 'SUSPENDED'])}~{back}~{lay}")
+    return f"{market_id}|1|{rng.choice(['OPEN', 'SUSPENDED'])}|0|0|0|{rng.choice(['true', 'false'])}|{','.join(encoded)}"
+
+
+def make_edge_cases():
+    return [
+        "1.1|a|OPEN|b|c|d|TRUE|",
+        "1.2|a|OPEN|b|c|d|true|1~ACTIVE~,2~ACTIVE~~,3~X",
+        "1.3|a|OPEN|b|c|d|true|1~S~1.5,2~S~x:y:z~abc:1.5:7,,5~S~1:2:3:4~5:6:7:8~extra",
+        "1.4|a|OPEN|b|c|d|false|1~S~1.5:10:0~2.0:20:0|trailing|fields",
+        '{"status": "OPEN"}',
+        "not json",
+        "",
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--markets", type=int, default=300)
+    parser.add_argument("--runners", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    markets = [make_market(f"1.{i}", args.runners, rng) for i in range(args.markets)]
+
+    # Both decoders must agree before their speed is worth comparing
+    for raw in markets + make_edge_cases():
+        new = decode_market(raw)
+        new = new.to_dict() if hasattr(new, "to_dict") else new
+        if isinstance(new, dict) and "runners" in new:
+            for r in new["runners"]:
+                r.pop("name")
+        assert new == legacy_parse_market_odds(raw), raw
+
+    def best(fn):
+        return min(timeit.repeat(fn, number=1, repeat=args.repeat))
+
+    legacy = best(lambda: [legacy_parse_market_odds(m) for m in markets])
+    cold = best(lambda: [decode_market(m) for m in markets])
+    cold_dicts = best(lambda: [decode_market(m).to_dict() for m in markets])
+    # Upstream returns fresh string objects every tick; copy them before each
+    # run so the cached path pays for hashing like it does in production
+    [parse_market(m) for m in markets]
+    warm = float("inf")
+    for _ in range(args.repeat):
+        fresh = [m.encode().decode() for m in markets]
+        start = timeit.default_timer()
+        [parse_market(m) for m in fresh]
+        warm = min(warm, timeit.default_timer() - start)
+
+    print(f"{args.markets} markets x {args.runners} runners (best of {args.repeat})")
+    print(f"  legacy closures               {legacy * 1000:8.2f} ms")
+    print(f"  decode_market (records)       {cold * 1000:8.2f} ms  ({legacy / cold:.2f}x)")
+    print(f"  decode_market + to_dict       {cold_dicts * 1000:8.2f} ms  ({legacy / cold_dicts:.2f}x)")
+    print(f"  parse_market, unchanged tick  {warm * 1000:8.2f} ms  ({legacy / warm:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# benchmarks/bench_parse_pool.py
+"""Parse pool benchmark: event detail decode/organize inline vs in worker processes.
+
+Replays synthetic frames of large in-play events the way scrape ticks do
+(every event's next frame at once) through ``ParsePool.decode``, inline and
+with 1..N workers, and reports:
+
+- throughput: frames and MB decoded and organized per second
+- event loop stall: how late a 1 ms heartbeat on the same loop ran, which is
+  what API requests sharing the process would wait during a heavy tick
+
+Run from the project root:
+
+    python -m benchmarks.bench_parse_pool [--events 16] [--markets 400] [--frames 10] [--workers 4]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+
+if __package__ in (None, ""):
+    # Run as a script (python benchmarks/<name>.py): make the project root importable
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.catalogue_registry import CatalogueRegistry
+from app.services.event_cache import EventCacheEntry, body_hash
+from app.services.parse_pool import ParsePool
+from benchmarks.bench_pipeline import percentile
+from benchmarks.replay_server import ReplaySource
+
+HEARTBEAT = 0.001
+
+
+async def heartbeat(lags, stop):
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        due = loop.time() + HEARTBEAT
+        await asyncio.sleep(HEARTBEAT)
+        lags.append(max(0.0, loop.time() - due))
+
+
+async def parse(pool, body, event_id, cache, registry):
+    # Like fetch_live_match_async: the entry remembers the last organized body and match
+    result = await pool.decode(body, event_id, "cricket", cache, registry)
+    cache.match = result[0]
+    cache.body_hash = body_hash(body)
+
+
+async def replay(pool, frames):
+    caches = {event_id: EventCacheEntry() for event_id in frames}
+    registry = CatalogueRegistry()
+    # First frame untimed: starts the workers and warms their caches
+    await asyncio.gather(*(parse(pool, f[0], eid, caches[eid], registry) for eid, f in frames.items()))
+
+    lags, stop = [], asyncio.Event()
+    beat = asyncio.create_task(heartbeat(lags, stop))
+    start = time.perf_counter()
+    for tick in range(1, min(len(f) for f in frames.values())):
+        await asyncio.gather(*(
+            parse(pool, f[tick], eid, caches[eid], registry) for eid, f in frames.items()
+        ))
+    seconds = time.perf_counter() - start
+    stop.set()
+    await beat
+    return seconds, sorted(lags) or [0.0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=16)
+    parser.add_argument("--markets", type=int, default=400)
+    parser.add_argument("--runners", type=int, default=3)
+    parser.add_argument("--frames", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+    # Keep per-event INFO logs out of the timings
+    for name in list(logging.root.manager.loggerDict):
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+    frames = ReplaySource.synthetic(args.events, args.markets, args.runners, args.frames).frames
+    timed = [f for fs in frames.values() for f in fs[1:]]
+    total_bytes = sum(map(len, timed))
+    print(f"{args.events} events x {args.markets} markets, {len(timed)} timed frames"
+          f" ({total_bytes / len(timed) / 1e3:.0f} KB each)")
+    for workers in range(args.workers + 1):
+        # Offload everything when there are workers, to compare like with like
+        pool = ParsePool(workers, offload_seconds=0.0)
+        try:
+            seconds, lags = asyncio.run(replay(pool, frames))
+        finally:
+            pool.close()
+        label = f"{workers} workers" if workers else "inline"
+        print(f"  {label:10} {len(timed) / seconds:8.0f} frames/s  {total_bytes / seconds / 1e6:7.1f} MB/s"
+              f"  loop stall p50 {percentile(lags, 0.5) * 1000:6.1f} ms  p99 {percentile(lags, 0.99) * 1000:6.1f} ms"
+              f"  max {lags[-1] * 1000:6.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+# benchmarks/bench_pipeline.py
+"""End-to-end benchmark against the replay server.
+
+Starts ``benchmarks.replay_server`` in a subprocess and points the scraper at
+it through ``BASE_URL``, with a temporary ``DATA_DIR``. Reports:
+
+- parse throughput: JSON decode + organize_match over the served frames,
+  cold and with the event cache carried from frame to frame
+- cycle time: full ``update_live_matches()`` scrape-and-publish cycles
+- memory: traced heap held by the published snapshot, and peak RSS
+- ``GET /live/odds`` latency under concurrent clients (full snapshot, and
+  one match's bookmaker markets), against
+  ``uvicorn app.main:app`` (one worker) scraping the replay server
+
+Run from the project root (replay server options such as ``--fixtures``,
+``--latency`` or ``--rate-429`` are passed through):
+
+    python -m benchmarks.bench_pipeline [--events 20] [--markets 60] [--cycles 10] [--concurrency 32] [--duration 5]
+"""
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import os
+import resource
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from urllib.request import urlopen
+
+import aiohttp
+
+if __package__ in (None, ""):
+    # Run as a script (python benchmarks/<name>.py): make the project root importable
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.replay_server import add_arguments, source_from_args
+
+REPLAY_OPTIONS = ("fixtures", "events", "markets", "runners", "frames", "change_rate",
+                  "latency", "jitter", "rate_429", "rate_403", "rate_5xx")
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def percentile(sorted_values, p):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p))]
+
+
+def wait_for(url, ready=lambda body: True, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urlopen(url, timeout=5) as res:
+                if ready(res.read()):
+                    return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise SystemExit(f"Timed out waiting for {url}")
+
+
+def start_process(args, env, ready_url, log):
+    process = subprocess.Popen(args, env=env, stdout=log, stderr=subprocess.STDOUT)
+    try:
+        wait_for(ready_url)
+    except SystemExit:
+        process.kill()
+        raise
+    return process
+
+
+def replay_args(args, port):
+    argv = [sys.executable, "-m", "benchmarks.replay_server", "--port", str(port)]
+    for name in REPLAY_OPTIONS:
+        value = getattr(args, name)
+        if value is not None:
+            argv += [f"--{name.replace('_', '-')}", str(value)]
+    return argv
+
+
+# --- Sections ---
+
+def bench_parse(source, organize_match, EventCacheEntry):
+    frames = source.frames
+    total_bytes = sum(len(f) for fs in frames.values() for f in fs)
+    markets = sum(len(json.loads(fs[0]).get("catalogues") or []) for fs in frames.values())
+    bodies = sum(len(fs) for fs in frames.values())
+
+    start = time.perf_counter()
+    for event_id, event_frames in frames.items():
+        for body in event_frames:
+            organize_match(json.loads(body), event_id)
+    cold = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for event_id, event_frames in frames.items():
+        cache = EventCacheEntry()
+        for body in event_frames:
+            organize_match(json.loads(body), event_id, cache)
+    cached = time.perf_counter() - start
+
+    frames_per_event = bodies / len(frames)
+    print(f"Parse throughput ({bodies} bodies, {total_bytes / 1e6:.1f} MB)")
+    for label, seconds in (("cold", cold), ("event cache", cached)):
+        print(f"  {label:12} {bodies / seconds:8.0f} events/s  {markets * frames_per_event / seconds:10.0f} markets/s"
+              f"  {total_bytes / seconds / 1e6:7.1f} MB/s")
+
+
+def bench_cycles(cycles, match_list, update_live_matches, store):
+    if not match_list.refresh():
+        raise SystemExit("Could not load the match list from the replay server")
+    update_live_matches()  # Warm-up: first fetch of every event
+
+    times = []
+    for _ in range(cycles):
+        start = time.perf_counter()
+        update_live_matches()
+        times.append(time.perf_counter() - start)
+    times.sort()
+    snapshot = store.current()
+    print(f"Cycle time ({cycles} cycles, {len(snapshot.matches)} matches)")
+    print(f"  mean {statistics.mean(times) * 1000:8.1f} ms  p50 {percentile(times, 0.5) * 1000:8.1f} ms"
+          f"  max {times[-1] * 1000:8.1f} ms")
+
+
+def bench_memory(source, organize_match):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = [organize_match(json.loads(frames[-1]), event_id) for event_id, frames in source.frames.items()]
+    [m.to_json() for m in kept]
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    markets = sum(sum(len(books) for books in m.markets.values()) for m in kept)
+    held = after - before
+    print("Memory")
+    print(f"  snapshot    {held / 1024:10.1f} KiB  {held / max(markets, 1):8.0f} B/market (incl. cached JSON)")
+    print(f"  peak RSS    {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:10.1f} MiB")
+
+
+async def _load(url, concurrency, duration, headers):
+    latencies = []
+    errors = 0
+    deadline = time.monotonic() + duration
+
+    async def client(session):
+        nonlocal errors
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            try:
+                async with session.get(url, headers=headers) as res:
+                    await res.read()
+                    if res.status != 200:
+                        errors += 1
+                        continue
+            except aiohttp.ClientError:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=concurrency)) as session:
+        await asyncio.gather(*(client(session) for _ in range(concurrency)))
+    return latencies, errors
+
+
+def bench_http(port, concurrency, duration, match_id):
+    url = f"http://127.0.0.1:{port}/live/odds"
+    print(f"GET /live/odds ({concurrency} clients, {duration:.0f}s each)")
+    cases = (
+        ("identity", url, {"Accept-Encoding": "identity"}),
+        ("gzip, br", url, {"Accept-Encoding": "gzip, br"}),
+        ("1 match", f"{url}?match_id={match_id}&category=bookmaker&exclude=odds", {"Accept-Encoding": "identity"}),
+    )
+    for label, url, headers in cases:
+        latencies, errors = asyncio.run(_load(url, concurrency, duration, headers))
+        if not latencies:
+            print(f"  {label:9} no successful requests ({errors} errors)")
+            continue
+        latencies.sort()
+        print(f"  {label:9} {len(latencies) / duration:8.0f} req/s  p50 {percentile(latencies, 0.5) * 1000:6.1f} ms"
+              f"  p95 {percentile(latencies, 0.95) * 1000:6.1f} ms  p99 {percentile(latencies, 0.99) * 1000:6.1f} ms"
+              f"  errors {errors}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_arguments(parser)
+    parser.add_argument("--cycles", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=5.0, help="Load duration per encoding (in seconds)")
+    parser.add_argument("--rate", type=float, default=0.0, help="SCRAPE_RATE_LIMIT for the scraper (0 = unlimited)")
+    args = parser.parse_args()
+
+    replay_port, api_port = free_port(), free_port()
+    data_dir = tempfile.mkdtemp(prefix="bench-pipeline-")
+    env = dict(
+        os.environ,
+        BASE_URL=f"http://127.0.0.1:{replay_port}",
+        DATA_DIR=data_dir,
+        SCRAPE_RATE_LIMIT=str(args.rate),
+        HISTORY_ENABLED="false",
+        RECORD_DIR="",
+    )
+    # The app reads its settings on import; the replay server import above already
+    # loaded them (through the logger), so read them again before any app module uses them
+    os.environ.update(env)
+    from app.core.settings import settings
+    settings.__init__()
+    from app.services.event_cache import EventCacheEntry
+    from app.services.live_match_service import update_live_matches, engine
+    from app.services.match_organizer import organize_match
+    from app.services.match_list_service import match_list
+    from app.services.snapshot_store import store
+    # Keep per-request INFO logs out of the timings
+    for name in list(logging.root.manager.loggerDict):
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+    source = source_from_args(args)
+    with open(os.path.join(data_dir, "replay.log"), "wb") as replay_log, \
+            open(os.path.join(data_dir, "api.log"), "wb") as api_log:
+        replay = start_process(replay_args(args, replay_port), env, f"{env['BASE_URL']}/_stats", replay_log)
+        try:
+            bench_parse(source, organize_match, EventCacheEntry)
+            bench_cycles(args.cycles, match_list, update_live_matches, store)
+            bench_memory(source, organize_match)
+            engine.close()
+
+            api = start_process(
+                [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(api_port), "--log-level", "warning"],
+                env, f"http://127.0.0.1:{api_port}/", api_log,
+            )
+            try:
+                wait_for(f"http://127.0.0.1:{api_port}/live/odds", lambda body: json.loads(body).get("count"))
+                bench_http(api_port, args.concurrency, args.duration, next(iter(source.frames)))
+            finally:
+                api.terminate()
+                api.wait()
+        finally:
+            replay.terminate()
+            replay.wait()
+    print(f"Logs and data in {data_dir}")
+
+
+if __name__ == "__main__":
+    main()
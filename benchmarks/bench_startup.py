@@ -0,0 +1,135 @@
+# benchmarks/bench_startup.py
+"""Start-up benchmark: import time and time to serve and to be ready.
+
+Reports:
+
+- import: ``import app.main`` in fresh interpreters (median of ``--imports``),
+  the threads running right after it and whether it created ``DATA_DIR``;
+  importing should not start workers, open sessions or touch the disk
+- cold / warm start: a ``uvicorn app.main:app`` process against the replay
+  server, first with an empty ``DATA_DIR``, then restarted on the journal
+  and match list the first run left behind; time until ``GET /`` answers
+  and until ``GET /ready`` returns 200
+
+``--max-import-seconds`` / ``--max-ready-seconds`` make it exit non-zero
+when the import or the warm start takes longer, to catch regressions.
+
+Run from the project root (replay server options are passed through):
+
+    python -m benchmarks.bench_startup [--imports 5] [--latency 0.2] [--max-import-seconds 1.0]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import ExitStack
+from urllib.request import urlopen
+
+if __package__ in (None, ""):
+    # Run as a script (python benchmarks/<name>.py): make the project root importable
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_pipeline import free_port, replay_args, start_process
+from benchmarks.replay_server import add_arguments
+
+IMPORT_PROBE = """
+import json, os, threading, time
+start = time.perf_counter()
+import app.main
+print(json.dumps({"seconds": time.perf_counter() - start, "threads": threading.active_count(),
+                  "data_dir": os.path.exists(os.environ["DATA_DIR"])}))
+"""
+
+POLL = 0.02
+
+
+def measure_import(runs, env):
+    results = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", IMPORT_PROBE], env=env, capture_output=True, check=True)
+        results.append(json.loads(out.stdout.splitlines()[-1]))
+    return results
+
+
+def wait_until(url, start, timeout=120):
+    """Seconds from ``start`` until ``url`` answers 200"""
+    deadline = start + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urlopen(url, timeout=5) as res:
+                res.read()
+                return time.monotonic() - start
+        except OSError:
+            time.sleep(POLL)
+    raise SystemExit(f"Timed out waiting for {url}")
+
+
+def start_api(env, log):
+    port = free_port()
+    start = time.monotonic()
+    api = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env, stdout=log, stderr=subprocess.STDOUT,
+    )
+    try:
+        serving = wait_until(f"http://127.0.0.1:{port}/", start)
+        ready = wait_until(f"http://127.0.0.1:{port}/ready", start)
+        with urlopen(f"http://127.0.0.1:{port}/ready", timeout=5) as res:
+            matches = sum(s["matches"] for s in json.loads(res.read())["sports"].values())
+    finally:
+        api.terminate()
+        api.wait()
+    return serving, ready, matches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_arguments(parser)
+    parser.add_argument("--imports", type=int, default=5, help="Fresh interpreters timing the import")
+    parser.add_argument("--max-import-seconds", type=float, default=None)
+    parser.add_argument("--max-ready-seconds", type=float, default=None, help="Limit for the warm start to be ready")
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix="bench-startup-")
+    # Default settings (log level included), so nothing that runs on import is skipped
+    env = dict(os.environ, DATA_DIR=os.path.join(data_dir, "import"))
+    env.pop("LOG_LEVEL", None)
+    imports = measure_import(args.imports, env)
+    import_seconds = statistics.median(r["seconds"] for r in imports)
+    print(f"import app.main  {import_seconds * 1000:7.0f} ms median of {len(imports)}"
+          f"  (min {min(r['seconds'] for r in imports) * 1000:.0f} ms)"
+          f"  threads after import {max(r['threads'] for r in imports)}"
+          f"  DATA_DIR created: {any(r['data_dir'] for r in imports)}")
+
+    replay_port = free_port()
+    base_url = f"http://127.0.0.1:{replay_port}"
+    env = dict(env, BASE_URL=base_url, DATA_DIR=os.path.join(data_dir, "api"), HISTORY_ENABLED="false",
+               RECORD_DIR="", LOG_LEVEL="WARNING")
+    with ExitStack() as stack:
+        log = stack.enter_context(open(os.path.join(data_dir, "replay.log"), "wb"))
+        replay = start_process(replay_args(args, replay_port), env, f"{base_url}/_stats", log)
+        stack.callback(replay.wait)
+        stack.callback(replay.terminate)
+        log = stack.enter_context(open(os.path.join(data_dir, "api.log"), "wb"))
+        timings = {}
+        for label in ("cold", "warm"):
+            serving, ready, matches = timings[label] = start_api(env, log)
+            print(f"{label} start  serving after {serving * 1000:7.0f} ms"
+                  f"  ready after {ready * 1000:7.0f} ms  ({matches} live matches)")
+    print(f"Logs and data in {data_dir}")
+
+    failures = []
+    if args.max_import_seconds is not None and import_seconds > args.max_import_seconds:
+        failures.append(f"import took {import_seconds:.3f}s > {args.max_import_seconds}s")
+    if args.max_ready_seconds is not None and timings["warm"][1] > args.max_ready_seconds:
+        failures.append(f"warm start was ready after {timings['warm'][1]:.3f}s > {args.max_ready_seconds}s")
+    if failures:
+        raise SystemExit("Start-up regression: " + "; ".join(failures))
+
+
+if __name__ == "__main__":
+    main()
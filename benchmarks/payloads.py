@@ -0,0 +1,28 @@
+# benchmarks/payloads.py
+"""Synthetic upstream payloads shared by the benchmarks and the replay server."""
+import json
+
+from benchmarks.bench_odds_codec import make_market
+
+
+def make_event(event_id, markets, runners, rng):
+    odds = {}
+    catalogues = []
+    for i in range(markets):
+        market_id = f"1.{event_id}{i:04d}"
+        odds[market_id] = make_market(market_id, runners, rng)
+        name = "Match Odds" if i == 0 else (f"{i} over runs" if i % 2 else f"Player {i} runs")
+        catalogues.append({
+            "marketId": market_id,
+            "marketName": name,
+            "marketCondition": "normal",
+            "status": "OPEN",
+            "inPlay": True,
+            "runners": [{"id": 1000 + r, "name": f"Runner {r}"} for r in range(runners)],
+        })
+    return {
+        "event": {"id": str(event_id), "name": f"Team {event_id} v Team {event_id + 1}"},
+        "odds": json.dumps(odds),
+        "score": json.dumps({"home": {"runs": 120, "wickets": 3}, "away": {"runs": 0, "wickets": 0}}),
+        "catalogues": catalogues,
+    }
@@ -0,0 +1,274 @@
+# benchmarks/replay_server.py
+"""Local stand-in for the upstream API, for offline runs and benchmarks.
+
+Serves the match list and event detail endpoints either from fixtures
+recorded with ``RECORD_DIR`` or from synthetic events, scaled to N events x
+M markets. Each detail request returns the event's next frame, so odds keep
+moving. Latency and 429/403/5xx responses can be injected. Run from the
+project root and point the API at it:
+
+    python -m benchmarks.replay_server [--fixtures DIR] [--events 20] [--markets 60] [--event-types 2,1] [--port 8765]
+    BASE_URL=http://127.0.0.1:8765 uvicorn app.main:app
+
+``GET /_stats`` returns the request and fault counters.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+
+from aiohttp import web
+
+if __package__ in (None, ""):
+    # Run as a script (python benchmarks/<name>.py): make the project root importable
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.upstream_recorder import fixture_key, load_fixtures
+from benchmarks.bench_odds_codec import make_market
+from benchmarks.payloads import make_event
+
+LIST_PATH = "/delaymarkets/markets/eventtype/4"
+DETAIL_PATH = "/delaymarkets/events/detail"
+LIST_KEY = fixture_key(LIST_PATH)
+DETAIL_PREFIX = fixture_key(DETAIL_PATH) + "_"
+
+
+# --- Payloads ---
+
+def list_item(detail):
+    """Match list entry (live) for an event detail payload"""
+    event = detail.get("event", {})
+    catalogues = detail.get("catalogues") or [{}]
+    first = catalogues[0]
+    return {
+        "event": {"id": str(event.get("id")), "name": event.get("name", "N/A"),
+                  "openDate": event.get("openDate", "2026-01-01T10:00:00.000Z")},
+        "catalogue": {"marketId": first.get("marketId", "N/A"), "status": "OPEN", "inPlay": True,
+                      "runners": first.get("runners", [])},
+        "competition": detail.get("competition") or {"name": "Replay"},
+    }
+
+
+def synthetic_frames(event_id, markets, runners, frames, change_rate, rng):
+    """``frames`` detail payloads for one event; each moves ``change_rate`` of the markets"""
+    detail = make_event(event_id, markets, runners, rng)
+    odds = json.loads(detail["odds"])
+    payloads = []
+    for _ in range(frames):
+        for market_id in odds:
+            if rng.random() < change_rate:
+                odds[market_id] = make_market(market_id, runners, rng)
+        payloads.append(dict(detail, odds=json.dumps(odds)))
+    return payloads
+
+
+def clone_event(detail, event_id, copy, markets):
+    """Copy of a recorded detail payload under a new event id, with its markets repeated up to ``markets``"""
+    detail = dict(detail, event=dict(detail.get("event") or {}, id=event_id))
+    try:
+        odds = json.loads(detail["odds"]) if isinstance(detail.get("odds"), str) else {}
+    except ValueError:
+        odds = {}
+    recorded = detail.get("catalogues") or []
+    catalogues = []
+    new_odds = {}
+    for i in range(max(markets or len(recorded), 0)):
+        if not recorded:
+            break
+        catalogue = recorded[i % len(recorded)]
+        market_id = str(catalogue.get("marketId", ""))
+        # Clones of the original event keep their market ids, extra copies get new ones
+        suffix = f"{copy:02d}{i // len(recorded):02d}" if copy or i >= len(recorded) else ""
+        new_id = market_id + suffix
+        catalogues.append(dict(catalogue, marketId=new_id))
+        raw = odds.get(market_id)
+        if isinstance(raw, str):
+            new_odds[new_id] = new_id + raw[len(market_id):] if raw.startswith(market_id) else raw
+    return dict(detail, catalogues=catalogues, odds=json.dumps(new_odds))
+
+
+class ReplaySource:
+    """Pre-encoded match list and detail frames per event id"""
+
+    def __init__(self, list_bodies, frames):
+        self.list_bodies = list_bodies
+        self.frames = frames
+        self._list_served = 0
+        self._served = {}
+
+    @classmethod
+    def synthetic(cls, events, markets, runners=2, frames=10, change_rate=0.2, seed=42, first_id=30_000_000):
+        rng = random.Random(seed)
+        details = {}
+        for i in range(events):
+            event_id = first_id + i
+            details[str(event_id)] = synthetic_frames(event_id, markets, runners, frames, change_rate, rng)
+        return cls._from_details(details)
+
+    @classmethod
+    def from_fixtures(cls, root, events=0, markets=0, max_frames=20):
+        fixtures = load_fixtures(root)
+        recorded = {
+            key[len(DETAIL_PREFIX):]: [json.loads(b) for b in bodies[:max_frames]]
+            for key, bodies in fixtures.items() if key.startswith(DETAIL_PREFIX)
+        }
+        recorded = {eid: payloads for eid, payloads in recorded.items()
+                    if isinstance(payloads[0], dict) and payloads[0].get("event")}
+        if not recorded:
+            raise SystemExit(f"No event detail fixtures in {root}")
+        if not events and not markets and LIST_KEY in fixtures:
+            # Unscaled: replay everything exactly as recorded
+            return cls(fixtures[LIST_KEY], {eid: fixtures[DETAIL_PREFIX + eid][:max_frames] for eid in recorded})
+
+        ids = sorted(recorded)
+        details = {}
+        for i in range(events or len(ids)):
+            base, copy = ids[i % len(ids)], i // len(ids)
+            event_id = base if copy == 0 else str(int(base) + copy * 100_000_000)
+            details[event_id] = [clone_event(p, event_id, copy, markets) for p in recorded[base]]
+        return cls._from_details(details)
+
+    @classmethod
+    def _from_details(cls, details):
+        match_list = [list_item(payloads[0]) for payloads in details.values()]
+        frames = {eid: [json.dumps(p).encode() for p in payloads] for eid, payloads in details.items()}
+        return cls([json.dumps(match_list).encode()], frames)
+
+    def next_list(self):
+        body = self.list_bodies[self._list_served % len(self.list_bodies)]
+        self._list_served += 1
+        return body
+
+    def merge(self, other):
+        """Also serve ``other``'s events (other event types: their lists stay separate)"""
+        self.frames.update(other.frames)
+
+    def next_detail(self, event_id):
+        frames = self.frames.get(event_id)
+        if frames is None:
+            return None
+        served = self._served.get(event_id, 0)
+        self._served[event_id] = served + 1
+        return frames[served % len(frames)]
+
+
+# --- Server ---
+
+class FaultInjector:
+    def __init__(self, latency=0.0, jitter=0.0, rate_429=0.0, rate_403=0.0, rate_5xx=0.0, seed=7):
+        self.latency = latency
+        self.jitter = jitter
+        self.rates = ((429, rate_429), (403, rate_403), (503, rate_5xx))
+        self.rng = random.Random(seed)
+
+    async def delay(self):
+        seconds = self.latency + (self.rng.uniform(-self.jitter, self.jitter) if self.jitter else 0.0)
+        if seconds > 0:
+            await asyncio.sleep(seconds)
+
+    def status(self):
+        """Injected error status for this request, or None"""
+        roll = self.rng.random()
+        for status, rate in self.rates:
+            if roll < rate:
+                return status
+            roll -= rate
+        return None
+
+
+def make_app(source, faults, other_types=None):
+    """``other_types``: {event type: ReplaySource} served next to ``source`` (event type 4)"""
+    stats = {"list": 0, "detail": 0, "not_found": 0, "bytes": 0, "429": 0, "403": 0, "503": 0}
+    other_types = other_types or {}
+    for other in other_types.values():
+        source.merge(other)
+
+    async def serve(body):
+        await faults.delay()
+        status = faults.status()
+        if status is not None:
+            stats[str(status)] += 1
+            return web.Response(status=status, text="injected")
+        if body is None:
+            stats["not_found"] += 1
+            return web.Response(status=404, text="not found")
+        stats["bytes"] += len(body)
+        return web.Response(body=body, content_type="application/json")
+
+    async def match_list(request):
+        stats["list"] += 1
+        return await serve(source.next_list())
+
+    async def other_list(request):
+        other = other_types.get(request.match_info["event_type"])
+        stats["list"] += 1
+        return await serve(other.next_list() if other is not None else None)
+
+    async def event_detail(request):
+        stats["detail"] += 1
+        return await serve(source.next_detail(request.match_info["event_id"]))
+
+    async def get_stats(request):
+        return web.json_response(stats)
+
+    app = web.Application()
+    app.router.add_get(LIST_PATH, match_list)
+    app.router.add_get(LIST_PATH.rsplit("/", 1)[0] + "/{event_type}", other_list)
+    app.router.add_get(DETAIL_PATH + "/{event_id}", event_detail)
+    app.router.add_get("/_stats", get_stats)
+    return app
+
+
+def add_arguments(parser):
+    parser.add_argument("--fixtures", help="Directory recorded with RECORD_DIR (synthetic events when omitted)")
+    parser.add_argument("--events", type=int, default=None, help="Scale to this many events (default: 20 synthetic, or as recorded)")
+    parser.add_argument("--markets", type=int, default=None, help="Scale to this many markets per event (default: 60 synthetic, or as recorded)")
+    parser.add_argument("--runners", type=int, default=2)
+    parser.add_argument("--frames", type=int, default=10, help="Synthetic frames per event")
+    parser.add_argument("--change-rate", type=float, default=0.2, help="Share of synthetic markets moving per frame")
+    parser.add_argument("--latency", type=float, default=0.0, help="Added response latency (in seconds)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Random +/- latency (in seconds)")
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--rate-403", type=float, default=0.0)
+    parser.add_argument("--rate-5xx", type=float, default=0.0)
+    parser.add_argument("--event-types", default="", help="Other event types to serve synthetic events for (comma-separated)")
+
+
+def other_sources_from_args(args):
+    """Synthetic sources for ``--event-types``, with event ids apart from event type 4's"""
+    types = [t.strip() for t in (args.event_types or "").split(",") if t.strip() and t.strip() != "4"]
+    return {
+        event_type: ReplaySource.synthetic(
+            args.events or 20, args.markets or 60, args.runners, args.frames, args.change_rate,
+            seed=42 + i, first_id=40_000_000 + i * 1_000_000,
+        )
+        for i, event_type in enumerate(types, 1)
+    }
+
+
+def source_from_args(args):
+    if args.fixtures:
+        return ReplaySource.from_fixtures(args.fixtures, args.events or 0, args.markets or 0)
+    return ReplaySource.synthetic(
+        args.events or 20, args.markets or 60, args.runners, args.frames, args.change_rate,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_arguments(parser)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    source = source_from_args(args)
+    faults = FaultInjector(args.latency, args.jitter, args.rate_429, args.rate_403, args.rate_5xx)
+    markets = sum(len(json.loads(f[0]).get("catalogues") or []) for f in source.frames.values())
+    print(f"Replaying {len(source.frames)} events ({markets} markets) on http://{args.host}:{args.port}", flush=True)
+    web.run_app(make_app(source, faults, other_sources_from_args(args)), host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
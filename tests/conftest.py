@@ -0,0 +1,21 @@
+# tests/conftest.py
+import time
+
+import pytest
+
+
+class Clock:
+    """Stand-in for ``time.monotonic`` that only moves when a test advances ``now``"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(time, "monotonic", clock)
+    return clock
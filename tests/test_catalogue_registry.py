@@ -0,0 +1,57 @@
+# tests/test_catalogue_registry.py
+import threading
+
+from app.services.catalogue_registry import CatalogueRegistry
+
+
+def catalogue(name="Match Odds", runners=({"id": 1, "name": "A"},)):
+    return {"marketName": name, "marketCondition": None, "runners": list(runners)}
+
+
+def test_lookup_reuses_until_the_signature_changes():
+    registry = CatalogueRegistry()
+    cat = catalogue()
+    entry = registry.lookup("e1", "m1", cat)
+    assert (entry.category, entry.runner_ids, entry.names_by_id) == ("bookmaker", ("1",), {"1": "A"})
+    assert registry.lookup("e1", "m1", cat) is entry
+    renamed = registry.lookup("e1", "m1", catalogue("Total Runs"))
+    assert renamed is not entry and renamed.category == "fancy"
+    assert registry.rebuilt == 2
+
+
+def test_retain_and_discard():
+    registry = CatalogueRegistry()
+    registry.lookup("e1", "m1", catalogue())
+    registry.lookup("e2", "m2", catalogue())
+    registry.lookup("e3", "m3", catalogue())
+    registry.retain(["e1", "e2"])
+    assert len(registry) == 2
+    registry.discard(["e1"])
+    assert len(registry) == 1
+
+
+def test_lookups_and_retain_from_different_threads():
+    registry = CatalogueRegistry()
+    errors = []
+    done = threading.Event()
+
+    def scrape():
+        try:
+            for i in range(20000):
+                registry.lookup(f"e{i % 500}", f"m{i}", catalogue(runners=({"id": i, "name": "A"},)))
+        except Exception as e:
+            errors.append(e)
+        finally:
+            done.set()
+
+    thread = threading.Thread(target=scrape)
+    thread.start()
+    try:
+        while not done.is_set():
+            registry.retain(f"e{i}" for i in range(0, 500, 2))
+    except Exception as e:
+        errors.append(e)
+    thread.join()
+    assert errors == []
+    registry.retain(f"e{i}" for i in range(0, 500, 2))
+    assert all(int(m[1:]) % 500 % 2 == 0 for m in registry._markets)
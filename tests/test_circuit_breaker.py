@@ -0,0 +1,93 @@
+# tests/test_circuit_breaker.py
+import pytest
+
+from app.services.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+
+def make_breaker():
+    return CircuitBreaker("host", window=10, failure_rate=0.5, min_requests=4, cooldown=5, max_cooldown=20)
+
+
+def trip(breaker):
+    for _ in range(breaker.min_requests):
+        breaker.record_failure()
+
+
+def test_stays_closed_below_min_requests(clock):
+    breaker = make_breaker()
+    for _ in range(3):
+        breaker.record_failure()
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+
+
+def test_opens_at_failure_rate(clock):
+    breaker = make_breaker()
+    breaker.record_success()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    with pytest.raises(CircuitOpenError) as exc:
+        breaker.check()
+    assert exc.value.retry_at == clock.now + 5
+
+
+def test_old_outcomes_leave_the_window(clock):
+    breaker = make_breaker()
+    for _ in range(3):
+        breaker.record_failure()
+    clock.now += 11
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    assert breaker.stats()["failures"] == 1
+
+
+def test_half_open_probe_closes_on_success(clock):
+    breaker = make_breaker()
+    trip(breaker)
+    clock.now += 5
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    # Only one probe at a time
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.stats() == {"state": CLOSED, "requests": 0, "failures": 0, "retry_in": 0}
+
+
+def test_failed_probe_doubles_cooldown_up_to_max(clock):
+    breaker = make_breaker()
+    trip(breaker)
+    for cooldown in (10, 20, 20):
+        clock.now += breaker.cooldown
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == OPEN
+        assert breaker.cooldown == cooldown
+    clock.now += 20
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.cooldown == 5
+
+
+def test_released_probe_slot_is_reused(clock):
+    breaker = make_breaker()
+    trip(breaker)
+    clock.now += 5
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.allow()
+
+
+def test_lost_probe_is_replaced_after_cooldown(clock):
+    breaker = make_breaker()
+    trip(breaker)
+    clock.now += 5
+    assert breaker.allow()
+    clock.now += 4
+    assert not breaker.allow()
+    clock.now += 1
+    assert breaker.allow()
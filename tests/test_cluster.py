@@ -0,0 +1,80 @@
+# tests/test_cluster.py
+import pytest
+
+from app.services.cluster import HashRing, MemoryBackend, SqliteBackend, ring_hash
+
+KEYS = [f"cricket:{i}" for i in range(2000)]
+
+
+def test_ring_hash_is_stable():
+    assert ring_hash("cricket:1") == ring_hash("cricket:1")
+    assert ring_hash("cricket:1") != ring_hash("cricket:2")
+    assert 0 <= ring_hash("x") < 2 ** 64
+
+
+def test_empty_ring_has_no_owner():
+    assert HashRing([], vnodes=16).owner("cricket:1") is None
+
+
+def test_owner_does_not_depend_on_node_order():
+    a = HashRing(["a", "b", "c"], vnodes=32)
+    b = HashRing(["c", "a", "b"], vnodes=32)
+    assert [a.owner(k) for k in KEYS] == [b.owner(k) for k in KEYS]
+
+
+def test_keys_are_spread_over_nodes():
+    ring = HashRing(["a", "b", "c", "d"], vnodes=64)
+    counts = {}
+    for key in KEYS:
+        owner = ring.owner(key)
+        counts[owner] = counts.get(owner, 0) + 1
+    assert set(counts) == {"a", "b", "c", "d"}
+    assert min(counts.values()) > len(KEYS) / 4 * 0.6
+
+
+def test_joining_node_only_takes_keys():
+    before = HashRing(["a", "b", "c"], vnodes=64)
+    after = HashRing(["a", "b", "c", "d"], vnodes=64)
+    moved = [k for k in KEYS if before.owner(k) != after.owner(k)]
+    # Only keys moving to the new node change owner, about 1/4 of them
+    assert all(after.owner(k) == "d" for k in moved)
+    assert 0.1 < len(moved) / len(KEYS) < 0.4
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        yield MemoryBackend()
+        return
+    backend = SqliteBackend(str(tmp_path / "cluster.db"))
+    yield backend
+    backend.close()
+
+
+def test_backend_membership(backend):
+    assert backend.heartbeat("a", 100) is True
+    assert backend.heartbeat("a", 110) is False
+    assert backend.heartbeat("b", 105) is True
+    assert backend.members(since=100) == ["a", "b"]
+    assert backend.members(since=106) == ["a"]
+    backend.prune(before=106)
+    assert backend.heartbeat("b", 120) is True
+    backend.leave("a")
+    assert backend.members(since=0) == ["b"]
+
+
+def test_backend_matches(backend):
+    backend.heartbeat("a", 100)
+    backend.heartbeat("b", 100)
+    backend.put_matches("a", "cricket", [("1", 1, b"one"), ("2", 1, b"two")], [])
+    backend.put_matches("b", "cricket", [("3", 1, b"three")], [])
+    backend.put_matches("a", "tennis", [("9", 1, b"nine")], [])
+    backend.put_matches("a", "cricket", [("1", 2, b"one v2")], ["2"])
+    assert backend.match_stamps("cricket") == {("a", "1"): 2, ("b", "3"): 1}
+    assert backend.match_bodies("cricket", [("a", "1"), ("a", "2"), ("b", "3")]) == {
+        ("a", "1"): b"one v2", ("b", "3"): b"three",
+    }
+    # A node that leaves takes its rows with it
+    backend.leave("a")
+    assert backend.match_stamps("cricket") == {("b", "3"): 1}
+    assert backend.match_stamps("tennis") == {}
@@ -0,0 +1,90 @@
+# tests/test_delta_feed.py
+from app.services.delta_feed import DeltaFeed, diff_match
+from app.services.match_model import LiveMatch
+
+
+def runner(runner_id, back, lay, status="ACTIVE"):
+    return {
+        "id": runner_id,
+        "status": status,
+        "back": {"price": back, "volume": 100, "exposed": 0},
+        "lay": {"price": lay, "volume": 100, "exposed": 0},
+        "name": f"Runner {runner_id}",
+    }
+
+
+def market(*runners, status="OPEN"):
+    return {"name": "Match Odds", "runners": list(runners), "status": status, "in_play": True}
+
+
+def match(**categories):
+    data = {"match_id": 1, "match_name": "A v B", "last_updated": "t0"}
+    data.update(categories)
+    return LiveMatch.from_dict(data)
+
+
+def test_unchanged_match_has_no_delta():
+    prev = match(bookmaker={"m1": market(runner("r1", 1.5, 1.6))})
+    new = match(bookmaker={"m1": market(runner("r1", 1.5, 1.6))})
+    assert diff_match(prev, new) is None
+
+
+def test_added_and_removed_match():
+    new = match()
+    assert diff_match(None, new) == {"type": "match", "match_id": 1, "match": new.to_dict()}
+    assert diff_match(new, None) == {"type": "remove", "match_id": 1}
+    assert diff_match(None, None) is None
+
+
+def test_price_change_lists_only_changed_runners():
+    prev = match(bookmaker={"m1": market(runner("r1", 1.5, 1.6), runner("r2", 3.0, 3.2))})
+    new = match(bookmaker={"m1": market(runner("r1", 1.5, 1.6), runner("r2", 2.8, 3.0))})
+    delta = diff_match(prev, new)
+    assert delta["type"] == "update"
+    assert delta["markets"] == {"bookmaker": {"m1": {"runners": [runner("r2", 2.8, 3.0)]}}}
+    assert "removed_markets" not in delta
+
+
+def test_status_change_and_removed_runner():
+    prev = match(fancy={"m1": market(runner("r1", 1.5, 1.6), runner("r2", 3.0, 3.2))})
+    new = match(fancy={"m1": market(runner("r1", 1.5, 1.6), status="SUSPENDED")})
+    assert diff_match(prev, new)["markets"] == {
+        "fancy": {"m1": {"status": "SUSPENDED", "removed_runners": ["r2"]}},
+    }
+
+
+def test_added_and_removed_markets():
+    prev = match(sessions={"m1": market(runner("r1", 1.5, 1.6))})
+    new = match(sessions={"m2": market(runner("r1", 1.5, 1.6))})
+    delta = diff_match(prev, new)
+    assert delta["markets"] == {"sessions": {"m2": new.markets["sessions"]["m2"].to_dict()}}
+    assert delta["removed_markets"] == {"sessions": ["m1"]}
+
+
+def test_other_category_is_diffed():
+    prev = match(other={"m1": market(runner("r1", 1.5, 1.6))})
+    new = match(other={"m1": market(runner("r1", 1.4, 1.5))})
+    assert diff_match(prev, new)["markets"] == {"other": {"m1": {"runners": [runner("r1", 1.4, 1.5)]}}}
+
+
+def test_missing_prices_compare_equal():
+    prev = match(bookmaker={"m1": market(runner("r1", None, None))})
+    new = match(bookmaker={"m1": market(runner("r1", None, None))})
+    assert diff_match(prev, new) is None
+
+
+def test_feed_since():
+    feed = DeltaFeed(maxlen=3)
+    for version in range(1, 6):
+        feed.append(version - 1, version, [version])
+    assert feed.since(1) is None
+    assert feed.since(2) == [{"version": 3, "deltas": [3]}, {"version": 4, "deltas": [4]}, {"version": 5, "deltas": [5]}]
+    assert feed.since(3, until=4) == [{"version": 4, "deltas": [4]}]
+    assert feed.since(5) == []
+
+
+def test_feed_entry_covering_skipped_versions():
+    feed = DeltaFeed(maxlen=10)
+    feed.append(0, 1, ["a"])
+    feed.append(1, 5, ["b"])
+    assert feed.since(3) == [{"version": 5, "deltas": ["b"]}]
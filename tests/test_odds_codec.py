@@ -0,0 +1,70 @@
+# tests/test_odds_codec.py
+import random
+
+import pytest
+
+from app.services.match_model import MarketBook
+from app.services.odds_codec import MarketOdds, decode_market, parse_market
+from benchmarks.bench_odds_codec import legacy_parse_market_odds, make_edge_cases, make_market
+
+
+def as_legacy(market):
+    data = market.to_dict() if isinstance(market, MarketOdds) else market
+    if isinstance(data, dict) and "runners" in data:
+        for runner in data["runners"]:
+            runner.pop("name")
+    return data
+
+
+def test_decode_market():
+    market = decode_market("1.5|x|OPEN|0|0|0|True|11~ACTIVE~1.5:100:2~1.6:200:0,12~SUSPENDED~~")
+    assert market.status == "OPEN"
+    assert market.in_play is True
+    assert market.to_dict({"11": "Team A"})["runners"] == [
+        {"id": "11", "status": "ACTIVE", "back": {"price": 1.5, "volume": 100, "exposed": 2},
+         "lay": {"price": 1.6, "volume": 200, "exposed": 0}, "name": "Team A"},
+        {"id": "12", "status": "SUSPENDED", "back": {"price": None, "volume": 0, "exposed": 0},
+         "lay": {"price": None, "volume": 0, "exposed": 0}, "name": "Unknown"},
+    ]
+
+
+def test_malformed_numbers_fall_back_per_field():
+    (runner,) = decode_market("1.1|a|OPEN|b|c|d|true|1~S~x:5:z~2.5:y:3").runners
+    assert (runner.back_price, runner.back_volume, runner.back_exposed) == (None, 5, 0)
+    assert (runner.lay_price, runner.lay_volume, runner.lay_exposed) == (2.5, 0, 3)
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ('{"status": "OPEN"}', {"status": "OPEN"}),
+    ("not json", None),
+    ("", None),
+    (None, None),
+])
+def test_non_compact_values(raw, expected):
+    assert decode_market(raw) == expected
+    assert parse_market(raw) == expected
+
+
+def test_matches_legacy_parser():
+    rng = random.Random(7)
+    samples = [make_market(f"1.{i}", rng.randint(1, 6), rng) for i in range(200)] + make_edge_cases()
+    for raw in samples:
+        assert as_legacy(decode_market(raw)) == legacy_parse_market_odds(raw), raw
+
+
+def test_parse_market_caches_by_string():
+    raw = make_market("1.99", 3, random.Random(1))
+    market = parse_market(raw)
+    # Upstream sends a new string object with the same text every tick
+    assert parse_market("".join(list(raw))) is market
+    assert as_legacy(market) == as_legacy(decode_market(raw))
+
+
+def test_round_trip_through_market_book():
+    raw = make_market("1.7", 4, random.Random(3))
+    odds = decode_market(raw)
+    names = {r.id: f"Runner {r.id}" for r in odds.runners}
+    book = MarketBook.from_odds("1.7", "Match Odds", "cond", odds, names)
+    entry = book.to_dict()
+    assert entry["runners"] == odds.to_dict(names)["runners"]
+    assert MarketBook.from_dict("1.7", entry) == book
@@ -0,0 +1,81 @@
+# tests/test_odds_history.py
+import pytest
+
+from app.services.match_model import LiveMatch
+from app.services.odds_history import HISTORY_DROPPED, OddsHistory, downsample_ohlc
+from app.services.snapshot_store import SnapshotStore
+
+
+def live_match(match_id, back, lay=None):
+    return LiveMatch.from_dict({
+        "match_id": match_id, "match_name": "A v B", "last_updated": "t0",
+        "bookmaker": {"m1": {"name": "Match Odds", "status": "OPEN", "in_play": True, "runners": [
+            {"id": "r1", "name": "A", "status": "ACTIVE",
+             "back": {"price": back, "volume": 10, "exposed": 0},
+             "lay": {"price": lay, "volume": 0, "exposed": 0}},
+        ]}},
+    })
+
+
+@pytest.fixture
+def recorded(tmp_path):
+    history = OddsHistory(str(tmp_path), segment_bytes=1_000_000, segment_seconds=3600, retention=3600,
+                          max_pending=100)
+    history.start()
+    store = SnapshotStore(delta_buffer_size=10)
+    store.add_listener(history.on_snapshot)
+    return history, store
+
+
+def test_ticks_round_trip(recorded):
+    history, store = recorded
+    for back in (1.5, 1.5, 1.6):
+        store.publish([live_match("7", back, 1.7)])
+    assert history.flush() == 2
+    (series,) = history.query("7")
+    assert (series["market_id"], series["runner_id"]) == ("m1", "r1")
+    assert series["back"] == [1.5, 1.6]
+    assert series["lay"] == [1.7, 1.7]
+    assert history.query("7", runner_id="other") == []
+    assert history.query("8") == []
+
+
+@pytest.mark.parametrize("match_id", ["123\n", "../etc", "..", "a/b", ""])
+def test_unsafe_match_ids_are_rejected(recorded, match_id):
+    history, store = recorded
+    with pytest.raises(ValueError):
+        history.query(match_id)
+    store.publish([live_match(match_id, 1.5)])
+    assert history.flush() == 0
+
+
+def test_pending_queue_is_bounded(tmp_path):
+    history = OddsHistory(str(tmp_path), segment_bytes=1_000_000, segment_seconds=3600, retention=3600,
+                          max_pending=3)
+    history.start()
+    store = SnapshotStore(delta_buffer_size=10)
+    store.add_listener(history.on_snapshot)
+    dropped = HISTORY_DROPPED.value
+    for i in range(5):
+        store.publish([live_match("7", 1.0 + i / 10)])
+    assert HISTORY_DROPPED.value == dropped + 2
+    history.flush()
+    assert history.query("7")[0]["back"] == [1.2, 1.3, 1.4]
+
+
+def test_removed_match_is_forgotten_after_its_ticks(recorded):
+    history, store = recorded
+    store.publish([live_match("7", 1.5)])
+    store.publish([])
+    assert history.flush() == 1
+    assert "7" not in history._last
+    # Back again: the first tick is recorded even though the price did not move
+    store.publish([live_match("7", 1.5)])
+    assert history.flush() == 1
+
+
+def test_downsample_ohlc():
+    assert downsample_ohlc([0, 10, 20, 60, 70], [1.0, 3.0, None, 2.0, 1.5], 60) == [
+        [0, 1.0, 3.0, 1.0, 3.0],
+        [60, 2.0, 2.0, 1.5, 1.5],
+    ]
@@ -0,0 +1,124 @@
+# tests/test_refresh_scheduler.py
+from concurrent.futures import Future
+
+import pytest
+
+from app.core.config import SPORTS
+from app.services.catalogue_registry import CatalogueRegistry
+from app.services.circuit_breaker import CLOSED, EventUnavailable, HostThrottledError
+from app.services.live_match_service import LiveShard
+from app.services.match_model import LiveMatch
+from app.services.snapshot_store import SnapshotStore
+
+
+class ImmediateEngine:
+    """Runs each fetch coroutine to completion inside ``submit`` (the fakes never await)"""
+
+    def submit(self, coro):
+        future = Future()
+        try:
+            coro.send(None)
+        except StopIteration as e:
+            future.set_result(e.value)
+        except Exception as e:
+            future.set_exception(e)
+        else:
+            raise AssertionError("fetch awaited")
+        return future
+
+
+class MatchList:
+    def __init__(self, live):
+        self.live_matches = live
+
+    def live(self):
+        return self.live_matches
+
+    def peek_live(self):
+        return self.live_matches
+
+
+def live_match(event_id, price):
+    return LiveMatch.from_dict({
+        "match_id": event_id, "match_name": f"Match {event_id}", "last_updated": "t0",
+        # The raw odds are what the change fingerprint looks at
+        "odds": {"m1": f"{price}"},
+        "bookmaker": {"m1": {"name": "Match Odds", "status": "OPEN", "in_play": True, "runners": [
+            {"id": "r1", "name": "A", "status": "ACTIVE",
+             "back": {"price": price, "volume": 1, "exposed": 0},
+             "lay": {"price": price + 0.1, "volume": 1, "exposed": 0}},
+        ]}},
+    })
+
+
+class Upstream:
+    """Per event: a price to answer with, or an exception / None to fail with"""
+
+    def __init__(self):
+        self.responses = {}
+
+    async def fetch(self, match_info):
+        response = self.responses[match_info["event_id"]]
+        if isinstance(response, Exception):
+            raise response
+        return live_match(match_info["event_id"], response) if response is not None else None
+
+
+@pytest.fixture
+def shard(clock):
+    match_list = MatchList([{"event_id": "1", "match_name": "Match 1"}, {"event_id": "2", "match_name": "Match 2"}])
+    shard = LiveShard(SPORTS[0], match_list, SnapshotStore(), None, None, CatalogueRegistry())
+    shard.upstream = Upstream()
+    shard.scheduler.engine = ImmediateEngine()
+    shard.scheduler.fetch = shard.upstream.fetch
+    return shard
+
+
+def refresh(shard, clock, **responses):
+    """Answer the next fetch of each event as given and run the scheduler once every event is due"""
+    shard.upstream.responses.update(responses)
+    clock.now += shard.scheduler.quarantine + shard.scheduler.max_interval * 20
+    shard.tick()
+    return sorted(shard.store.current().by_id)
+
+
+@pytest.mark.parametrize("failure", [
+    None,
+    RuntimeError("timeout"),
+    HostThrottledError("host", 0.0, 429),
+])
+def test_failed_fetch_keeps_the_last_data(shard, clock, failure):
+    assert refresh(shard, clock, **{"1": 1.5, "2": 2.5}) == ["1", "2"]
+    version = shard.store.current().version
+    assert refresh(shard, clock, **{"1": failure, "2": 2.6}) == ["1", "2"]
+    assert shard.store.current().by_id["1"].markets["bookmaker"]["m1"].prices[0] == 1.5
+    _, changes = shard.store.changes_since(version)
+    assert [d["type"] for c in changes for d in c["deltas"]] == ["update"]
+
+
+def test_throttling_does_not_count_against_the_event(shard, clock):
+    refresh(shard, clock, **{"1": 1.5, "2": 2.5})
+    for _ in range(5):
+        refresh(shard, clock, **{"1": HostThrottledError("host", 0.0, 429)})
+    state = shard.scheduler._events["1"]
+    assert state.failures == 0
+    assert state.breaker.state == CLOSED
+
+
+def test_unavailable_event_is_removed(shard, clock):
+    refresh(shard, clock, **{"1": 1.5, "2": 2.5})
+    assert refresh(shard, clock, **{"1": EventUnavailable("1", "not found")}) == ["2"]
+    assert shard.scheduler.stats()["quarantined"] == ["1"]
+
+
+def test_event_leaving_the_list_is_removed(shard, clock):
+    refresh(shard, clock, **{"1": 1.5, "2": 2.5})
+    shard.match_list.live_matches = shard.match_list.live_matches[1:]
+    assert refresh(shard, clock) == ["2"]
+    assert shard.scheduler.stats()["events"] == 1
+
+
+def test_changed_odds_are_merged(shard, clock):
+    refresh(shard, clock, **{"1": 1.5, "2": 2.5})
+    refresh(shard, clock, **{"1": 1.7})
+    assert shard.store.current().by_id["1"].markets["bookmaker"]["m1"].prices[0] == 1.7
@@ -0,0 +1,66 @@
+# tests/test_response_cache.py
+import gzip
+
+import pytest
+
+from app.services import response_cache
+from app.services.response_cache import EncodedBody
+
+brotli = pytest.importorskip("brotli")
+
+BODY = b'{"live_matches":[' + b",".join(b'{"match_id":%d,"price":1.5}' % i for i in range(500)) + b"]}"
+
+
+def decompress(data, encoding):
+    return brotli.decompress(data) if encoding == "br" else gzip.decompress(data)
+
+
+@pytest.mark.parametrize("accept, expected", [
+    ("br, gzip", "br"),
+    ("gzip", "gzip"),
+    ("gzip;q=0, br;q=0.5", "br"),
+    ("br;q=0", None),
+    ("identity", None),
+    (None, None),
+])
+def test_variant_negotiation(accept, expected):
+    data, encoding = EncodedBody(BODY).variant(accept)
+    assert encoding == expected
+    assert (decompress(data, encoding) if encoding else data) == BODY
+
+
+def test_small_bodies_are_not_compressed():
+    assert EncodedBody(b"{}").precompress().variant("br") == (b"{}", None)
+
+
+def test_request_path_compresses_fast_and_precompress_at_full_level(monkeypatch):
+    calls = []
+    compress = response_cache._compress
+
+    def recording(encoding, body, fast=False):
+        calls.append((encoding, fast))
+        return compress(encoding, body, fast)
+
+    monkeypatch.setattr(response_cache, "_compress", recording)
+
+    lazy = EncodedBody(BODY)
+    lazy.variant("gzip")
+    lazy.variant("gzip")
+    assert calls == [("gzip", True)]
+
+    calls.clear()
+    eager = EncodedBody(BODY).precompress()
+    eager.variant("br")
+    eager.variant("gzip")
+    assert sorted(calls) == [("br", False), ("gzip", False)]
+
+
+def test_etag_depends_on_the_body_only():
+    assert EncodedBody(BODY).etag == EncodedBody(bytes(BODY)).etag
+    assert EncodedBody(BODY).etag != EncodedBody(BODY + b" ").etag
+
+
+def test_reuse_or_encode_keeps_unchanged_bodies():
+    first = response_cache.reuse_or_encode(None, {"a": 1})
+    assert response_cache.reuse_or_encode(first, {"a": 1}) is first
+    assert response_cache.reuse_or_encode(first, {"a": 2}) is not first
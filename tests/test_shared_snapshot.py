@@ -0,0 +1,57 @@
+# tests/test_shared_snapshot.py
+from app.services.match_model import LiveMatch
+from app.services.shared_snapshot import SharedSnapshotFile
+from app.services.snapshot_store import LiveSnapshot
+
+
+def live_match(match_id, price):
+    return LiveMatch.from_dict({
+        "match_id": match_id, "match_name": f"Match {match_id}", "last_updated": "t0", "competition": "IPL",
+        "bookmaker": {"m1": {"name": "Match Odds", "status": "OPEN", "in_play": True, "runners": [
+            {"id": "r1", "name": "A", "status": "ACTIVE",
+             "back": {"price": price, "volume": 1, "exposed": 0},
+             "lay": {"price": None, "volume": 0, "exposed": 0}},
+        ]}},
+    })
+
+
+def test_round_trip(tmp_path):
+    leader = SharedSnapshotFile(str(tmp_path / "live_snapshot.bin"))
+    follower = SharedSnapshotFile(leader.path)
+    matches = [live_match(1, 1.5), live_match(2, 2.5)]
+    assert leader.write(LiveSnapshot(3, matches, "now"))
+    version, updated_at, read = follower.read_if_changed(0)
+    assert (version, updated_at) == (3, "now")
+    assert [m.to_dict() for m in read] == [m.to_dict() for m in matches]
+    # Same file: nothing to read
+    assert follower.read_if_changed(0) is None
+    # Same version: nothing to write
+    assert not leader.write(LiveSnapshot(3, matches, "now"))
+
+
+def test_follower_reuses_unchanged_matches(tmp_path):
+    leader = SharedSnapshotFile(str(tmp_path / "live_snapshot.bin"))
+    follower = SharedSnapshotFile(leader.path)
+    one, two = live_match(1, 1.5), live_match(2, 2.5)
+    leader.write(LiveSnapshot(1, [one, two]))
+    _, _, first = follower.read_if_changed(0)
+
+    changed = live_match(2, 2.7)
+    leader.write(LiveSnapshot(2, [one, changed, live_match(3, 3.5)]))
+    _, _, second = follower.read_if_changed(1)
+    assert second[0] is first[0]
+    assert second[1] is not first[1]
+    assert second[1].to_dict() == changed.to_dict()
+    assert [m.match_id for m in second] == [1, 2, 3]
+
+
+def test_older_version_is_ignored(tmp_path):
+    leader = SharedSnapshotFile(str(tmp_path / "live_snapshot.bin"))
+    leader.write(LiveSnapshot(5, [live_match(1, 1.5)]))
+    assert SharedSnapshotFile(leader.path).read_if_changed(5) is None
+
+
+def test_bad_header_is_ignored(tmp_path):
+    path = tmp_path / "live_snapshot.bin"
+    path.write_bytes(b"XXXX" + bytes(16) + b"{}")
+    assert SharedSnapshotFile(str(path)).read_if_changed(0) is None
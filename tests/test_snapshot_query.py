@@ -0,0 +1,115 @@
+# tests/test_snapshot_query.py
+import json
+
+import pytest
+
+from app.services.match_model import LiveMatch
+from app.services.snapshot_query import (
+    QueryError, decode_cursor, encode_cursor, match_list_index, query_live, query_match_list,
+)
+from app.services.snapshot_store import LiveSnapshot
+
+
+def test_cursor_round_trip():
+    for item_id in ("1", "33241915", "event/ü", ""):
+        cursor = encode_cursor(item_id)
+        assert "=" not in cursor
+        assert decode_cursor(cursor) == item_id
+
+
+@pytest.mark.parametrize("cursor", ["!!", "a", "/+/+"])
+def test_invalid_cursor(cursor):
+    with pytest.raises(QueryError):
+        decode_cursor(cursor)
+
+
+def match_list(*event_ids, status="open"):
+    return [{"event_id": e, "competition": "IPL", "status": status, "live": False} for e in event_ids]
+
+
+def list_page(matches, **params):
+    body, next_cursor = query_match_list(matches, match_list_index(matches), **params)
+    return [m["event_id"] for m in json.loads(body.body)], next_cursor
+
+
+def test_match_list_pages_in_id_order():
+    matches = match_list(5, 3, 1, 4, 2)
+    ids, cursor = list_page(matches, limit=2)
+    assert ids == [1, 2]
+    seen = list(ids)
+    while cursor is not None:
+        ids, cursor = list_page(matches, cursor=cursor, limit=2)
+        seen.extend(ids)
+    assert seen == [1, 2, 3, 4, 5]
+
+
+def test_no_cursor_when_the_last_page_is_exactly_full():
+    matches = match_list(1, 2)
+    assert list_page(matches, limit=2) == ([1, 2], None)
+
+
+def test_no_cursor_when_the_filter_leaves_nothing_after_the_page():
+    matches = match_list(1, 2) + match_list(3, status="closed")
+    assert list_page(matches, statuses=["open"], limit=2) == ([1, 2], None)
+
+
+def test_unpaged_query_keeps_list_order():
+    matches = match_list(5, 3, 1)
+    assert list_page(matches) == ([5, 3, 1], None)
+
+
+def test_invalid_cursor_is_rejected_before_querying():
+    with pytest.raises(QueryError):
+        list_page(match_list(1), cursor="!!")
+
+
+def live_match(match_id, competition, **categories):
+    data = {"match_id": match_id, "match_name": f"Match {match_id}", "last_updated": "t0",
+            "competition": competition}
+    data.update(categories)
+    return LiveMatch.from_dict(data)
+
+
+def market(status="OPEN"):
+    return {"name": "Match Odds", "runners": [{"id": "r1", "name": "Team A"}], "status": status, "in_play": True}
+
+
+@pytest.fixture
+def snapshot():
+    return LiveSnapshot(7, [
+        live_match(1, "IPL", bookmaker={"m1": market()}),
+        live_match(2, "BBL", fancy={"m2": market("SUSPENDED")}),
+        live_match(3, "IPL", other={"m3": market()}),
+    ])
+
+
+def live_ids(snapshot, **params):
+    body, next_cursor = query_live(snapshot, **params)
+    data = json.loads(body.body)
+    assert data["version"] == 7
+    return [m["match_id"] for m in data["live_matches"]], next_cursor
+
+
+def test_live_filters(snapshot):
+    assert live_ids(snapshot) == ([1, 2, 3], None)
+    assert live_ids(snapshot, competitions=["ipl"]) == ([1, 3], None)
+    assert live_ids(snapshot, categories=["other"]) == ([3], None)
+    assert live_ids(snapshot, statuses=["suspended"]) == ([2], None)
+    assert live_ids(snapshot, match_ids=["2", "3"], competitions=["IPL"]) == ([3], None)
+
+
+def test_live_unknown_category(snapshot):
+    with pytest.raises(QueryError):
+        query_live(snapshot, categories=["nope"])
+
+
+def test_live_paging(snapshot):
+    ids, cursor = live_ids(snapshot, limit=2)
+    assert ids == [1, 2]
+    assert decode_cursor(cursor) == "2"
+    assert live_ids(snapshot, cursor=cursor, limit=2) == ([3], None)
+
+
+def test_live_projection(snapshot):
+    body, _ = query_live(snapshot, match_ids=["1"], fields=["match_id", "bookmaker"])
+    assert json.loads(body.body)["live_matches"] == [{"match_id": 1, "bookmaker": {"m1": market()}}]
@@ -0,0 +1,106 @@
+# tests/test_snapshot_store.py
+import json
+
+from app.services.match_model import LiveMatch
+from app.services.snapshot_store import SnapshotStore
+
+
+def live_match(match_id, price=1.5):
+    return LiveMatch.from_dict({
+        "match_id": match_id, "match_name": f"Match {match_id}", "last_updated": "t0",
+        "bookmaker": {"m1": {"name": "Match Odds", "status": "OPEN", "in_play": True, "runners": [
+            {"id": "r1", "name": "A", "status": "ACTIVE",
+             "back": {"price": price, "volume": 1, "exposed": 0},
+             "lay": {"price": None, "volume": 0, "exposed": 0}},
+        ]}},
+    })
+
+
+def ids(snapshot):
+    return [m.match_id for m in snapshot.matches]
+
+
+def delta_types(store, since):
+    _, changes = store.changes_since(since)
+    return [(c["version"], [(d["type"], d["match_id"]) for d in c["deltas"]]) for c in changes]
+
+
+def test_publish_versions_and_deltas():
+    store = SnapshotStore(delta_buffer_size=10)
+    assert store.current().version == 0
+    first = store.publish([live_match(1), live_match(2)])
+    assert (first.version, ids(first)) == (1, [1, 2])
+    store.publish([live_match(1), live_match(2, 1.6), live_match(3)])
+    store.publish([live_match(3)])
+    assert delta_types(store, 1) == [
+        (2, [("update", 2), ("match", 3)]),
+        (3, [("remove", 1), ("remove", 2)]),
+    ]
+    # Published snapshots never change
+    assert ids(first) == [1, 2]
+
+
+def test_merge_apply_and_remove():
+    store = SnapshotStore(delta_buffer_size=10)
+    store.publish([live_match(1), live_match(2)])
+    assert ids(store.merge(live_match(1, 1.7))) == [1, 2]
+    assert ids(store.merge(live_match(3))) == [1, 2, 3]
+    assert ids(store.apply([live_match(4)], removed=[2])) == [1, 3, 4]
+    unchanged = store.current()
+    assert store.apply([unchanged.by_id["4"]], removed=["99"]) is unchanged
+    assert store.remove(["99"]) is unchanged
+    assert ids(store.remove([1, "3"])) == [4]
+    assert delta_types(store, 1) == [
+        (2, [("update", 1)]),
+        (3, [("match", 3)]),
+        (4, [("match", 4), ("remove", 2)]),
+        (5, [("remove", 1), ("remove", 3)]),
+    ]
+
+
+def test_changes_since_falls_back_to_a_full_resync():
+    store = SnapshotStore(delta_buffer_size=2)
+    for price in (1.1, 1.2, 1.3, 1.4):
+        store.publish([live_match(1, price)])
+    snapshot, changes = store.changes_since(3)
+    assert snapshot.version == 4 and [c["version"] for c in changes] == [4]
+    assert store.changes_since(4)[1] == []
+    assert store.changes_since(1)[1] is None
+    assert store.changes_since(9)[1] is None
+
+
+def test_follower_versions():
+    store = SnapshotStore(delta_buffer_size=10)
+    store.publish([live_match(1)], version=5, updated_at="t5")
+    assert (store.current().version, store.current().updated_at) == (5, "t5")
+    assert store.publish([live_match(2)], version=5).version == 5
+    assert ids(store.current()) == [1]
+    store.publish([live_match(1, 1.6)], version=9)
+    # Versions 6-8 were skipped; the entry for 9 covers them
+    assert [c["version"] for c in store.changes_since(7)[1]] == [9]
+
+
+def test_listeners_see_every_version_in_order():
+    store = SnapshotStore(delta_buffer_size=10)
+    seen = []
+    store.add_listener(lambda snapshot, deltas: seen.append((snapshot.version, len(deltas))))
+    store.add_listener(lambda snapshot, deltas: 1 / 0)
+    store.publish([live_match(1)])
+    store.merge(live_match(1, 1.6))
+    store.publish([live_match(1, 1.6)])
+    assert seen == [(1, 1), (2, 1), (3, 0)]
+
+
+def test_encoded_body():
+    store = SnapshotStore(delta_buffer_size=10)
+    snapshot = store.publish([live_match(1), live_match(2)], updated_at="now")
+    body = json.loads(snapshot.encoded().body)
+    assert (body["count"], body["version"], body["updated_at"]) == (2, 1, "now")
+    assert body["live_matches"] == snapshot.as_dicts()
+    assert snapshot.encoded() is snapshot.encoded()
+
+
+def test_resync_body_is_the_encoded_body_flagged_full():
+    snapshot = SnapshotStore(delta_buffer_size=10).publish([live_match(1)], updated_at="now")
+    assert json.loads(snapshot.resync().body) == {"full": True, **json.loads(snapshot.encoded().body)}
+    assert snapshot.resync() is snapshot.resync()
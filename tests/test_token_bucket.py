@@ -0,0 +1,66 @@
+# tests/test_token_bucket.py
+import asyncio
+import time
+
+import pytest
+
+from app.services.scrape_engine import TokenBucket
+
+
+def test_delay_refills_at_rate(clock):
+    bucket = TokenBucket(rate=2, capacity=1)
+    assert bucket.delay() == 0.0
+    bucket._tokens = 0.0
+    assert bucket.delay() == pytest.approx(0.5)
+    clock.now += 0.25
+    assert bucket.delay() == pytest.approx(0.25)
+    clock.now += 0.25
+    assert bucket.delay() == 0.0
+
+
+def test_penalize_holds_the_bucket(clock):
+    bucket = TokenBucket(rate=10, capacity=5)
+    bucket.penalize(3)
+    bucket.penalize(1)
+    assert bucket.delay() == pytest.approx(3)
+    clock.now += 3
+    assert bucket.delay() == 0.0
+
+
+def test_zero_rate_is_unlimited():
+    bucket = TokenBucket(rate=0, capacity=1)
+    assert bucket.delay() == 0.0
+
+    async def burst():
+        for _ in range(100):
+            await bucket.acquire()
+
+    asyncio.run(asyncio.wait_for(burst(), 1))
+
+
+def test_acquire_allows_burst_then_rate():
+    bucket = TokenBucket(rate=20, capacity=2)
+
+    async def take(n):
+        start = time.monotonic()
+        for _ in range(n):
+            await bucket.acquire()
+        return time.monotonic() - start
+
+    # Two tokens are available at once, the next two take 1/20 s each
+    assert asyncio.run(take(2)) < 0.04
+    assert 0.08 <= asyncio.run(take(2)) < 0.5
+
+
+def test_acquire_resumes_with_a_single_probe_after_penalty():
+    bucket = TokenBucket(rate=10, capacity=5)
+    bucket.penalize(0.05)
+
+    async def take(n):
+        start = time.monotonic()
+        for _ in range(n):
+            await bucket.acquire()
+        return time.monotonic() - start
+
+    # The penalty, then one token instead of the full burst, then 1/10 s for the next
+    assert 0.14 <= asyncio.run(take(2)) < 0.6